@@ -0,0 +1,98 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+AsyncHTracker benchmark, concurrent check-off requests in batches
+against one HTracker call per request inside the event loop, with the
+longest stall of the event loop
+
+run from the application root directory:
+    python -m benchmark.bench_async [habits] [requests]
+
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from htracker.h_async import AsyncHTracker
+from htracker.h_data import Habit
+from htracker.h_data_manager import HDataManager
+from htracker.h_tracker import HTracker
+
+
+async def heartbeat(stalls: list) -> None:
+    """Measures how late the event loop wakes up a 1 ms sleep
+
+    :param stalls: the longest stall is kept in the first item
+    :type stalls: list
+
+    """
+    while True:
+        start_time = time.perf_counter()
+        await asyncio.sleep(0.001)
+        stalls[0] = max(stalls[0], time.perf_counter() - start_time)
+
+
+async def run(requests, check_off) -> (float, float):
+    """Sends the check-off requests at once
+
+    :param requests: (name, date) pairs
+    :param check_off: coroutine function of one request
+
+    :return: (seconds, longest event loop stall in seconds)
+
+    """
+    stalls = [0.0]
+    beat = asyncio.ensure_future(heartbeat(stalls))
+    await asyncio.sleep(0.01)
+    start_time = time.perf_counter()
+    await asyncio.gather(*(check_off(name, day) for name, day in requests))
+    elapsed = time.perf_counter() - start_time
+    # the heartbeat wakes up once more to see the last stall
+    await asyncio.sleep(0.01)
+    beat.cancel()
+    return elapsed, stalls[0]
+
+
+def main() -> None:
+    habits = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    start = date(2019, 1, 1)
+    requests = [(f"habit {idx % habits}",
+                 start + timedelta(days=1 + idx // habits))
+                for idx in range(count)]
+    with tempfile.TemporaryDirectory() as directory:
+        results = {}
+        for name in ("blocking", "async"):
+            path = os.path.join(directory, f"{name}.json")
+            HDataManager.save_database({
+                f"habit {idx}": Habit(f"habit {idx}", start, 1, [start])
+                for idx in range(habits)
+            }, path)
+            if name == "blocking":
+                tracker = HTracker(path)
+
+                async def check_off(habit, day):
+                    return tracker.add_check_off(habit, day)
+
+                results[name] = asyncio.run(run(requests, check_off))
+            else:
+                async def batched():
+                    async with AsyncHTracker(path) as async_tracker:
+                        return await run(requests, async_tracker.check_off)
+
+                results[name] = asyncio.run(batched())
+    print(f"{habits} habits, {count} concurrent check-offs")
+    for name, (elapsed, stall) in results.items():
+        print(f"{name:>9}: {elapsed:7.2f} s, "
+              f"longest event loop stall {stall * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
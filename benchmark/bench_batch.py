@@ -0,0 +1,70 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+Batch analytics benchmark over a directory of user databases, one
+worker process against one per CPU
+
+run from the application root directory:
+    python -m benchmark.bench_batch [databases] [habits] [check-offs]
+
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from htracker.h_batch import HBatchAnalytics
+from htracker.h_data import Habit
+from htracker.h_data_manager import HDataManager
+
+
+def make_stores(directory: str, stores: int, habits: int,
+                check_offs: int) -> None:
+    """Writes synthetic binary databases, one per user
+
+    :param directory: directory of the databases
+    :type directory: str
+    :param stores: number of databases
+    :type stores: int
+    :param habits: number of habits per database
+    :type habits: int
+    :param check_offs: number of check-offs per habit
+    :type check_offs: int
+
+    """
+    start = date.today() - timedelta(days=check_offs * 2)
+    # every third check-off is late, so the streaks break now and then
+    events = [start + timedelta(days=day * 2 + (day % 3 == 0))
+              for day in range(check_offs)]
+    for store in range(stores):
+        HDataManager.save_database({
+            f"habit {idx}": Habit(f"habit {idx}", start, 2, list(events))
+            for idx in range(habits)
+        }, os.path.join(directory, f"user{store:05d}.hbin"))
+
+
+def main() -> None:
+    stores = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    habits = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    check_offs = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    since = date.today() - timedelta(days=90)
+    with tempfile.TemporaryDirectory() as directory:
+        make_stores(directory, stores, habits, check_offs)
+        report_path = os.path.join(directory, "report.json")
+        for workers in sorted({1, os.cpu_count() or 1}):
+            start_time = time.perf_counter()
+            _, summary = HBatchAnalytics.run(directory, report_path,
+                                             since, workers)
+            elapsed = time.perf_counter() - start_time
+            print(f"{workers} workers: {summary['stores']} databases, "
+                  f"{elapsed:.2f} s, "
+                  f"{summary['stores'] / elapsed:.0f} databases/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+Bulk check-off benchmark, one load and one save for all check-offs
+
+run from the application root directory:
+    python -m benchmark.bench_bulk [habits] [check-offs]
+
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from htracker.h_data import Habit
+from htracker.h_data_manager import HDataManager
+from htracker.h_records import HRecords
+from htracker.h_session import HSession
+from htracker.h_tracker import HTracker
+
+
+def make_csv(habits: int, check_offs: int) -> str:
+    """Daily check-offs of every habit, in csv
+
+    :param habits: number of habits
+    :type habits: int
+    :param check_offs: number of check-offs per habit
+    :type check_offs: int
+
+    :return: str
+
+    """
+    start = date.today() - timedelta(days=check_offs)
+    days = [str(start + timedelta(days=day)) for day in range(check_offs)]
+    return "".join(f"habit {idx},{day}\n"
+                   for day in days for idx in range(habits))
+
+
+def main() -> None:
+    habits = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    check_offs = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    start = date.today() - timedelta(days=check_offs)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "habits.json")
+        HDataManager.save_database({
+            f"habit {idx}": Habit(f"habit {idx}", start, 1)
+            for idx in range(habits)
+        }, path)
+        records = make_csv(habits, check_offs)
+        h_tracker = HTracker()
+        h_tracker.session = HSession(path)
+        start_time = time.perf_counter()
+        _, results = h_tracker.check_off_many(
+            HRecords.read_check_offs(io.StringIO(records))
+        )
+        print(f"{sum(results.values())} rows: "
+              f"{time.perf_counter() - start_time:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
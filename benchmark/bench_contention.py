@@ -0,0 +1,92 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+Concurrent writers benchmark, processes checking-off the same habits of
+one database at the same time, with the throughput of the check-offs
+and the check-offs lost
+
+run from the application root directory:
+    python -m benchmark.bench_contention [habits] [check-offs per writer]
+
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from htracker import HErrorCode
+from htracker.h_data import Habit
+from htracker.h_data_manager import HDataManager
+from htracker.h_tracker import HTracker
+
+START = date(2019, 1, 1)
+WRITERS = (1, 2, 4, 8)
+
+
+def write(path: str, writer: int, writers: int, count: int) -> None:
+    """Check-offs of one writer process, a tracker per call like a CLI
+    process, every writer on its own dates of the same two habits
+
+    :param path: database path
+    :type path: str
+    :param writer: number of the writer
+    :type writer: int
+    :param writers: number of writers
+    :type writers: int
+    :param count: number of check-offs
+    :type count: int
+
+    """
+    for idx in range(count):
+        error_code, _ = HTracker(path).add_check_off(
+            f"habit {idx % 2}",
+            START + timedelta(days=(idx // 2) * writers + writer)
+        )
+        if error_code != HErrorCode.SUCCESS:
+            raise RuntimeError(error_code.value)
+
+
+def run(path: str, writers: int, count: int) -> (float, int):
+    """Runs the writers at once
+
+    :return: (check-offs per second, check-offs lost)
+
+    """
+    processes = [multiprocessing.Process(
+        target=write, args=(path, writer, writers, count)
+    ) for writer in range(writers)]
+    start_time = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start_time
+    _, habits = HDataManager.load_database(path)
+    stored = sum(habits[f"habit {idx}"].check_off_count for idx in (0, 1))
+    return writers * count / elapsed, writers * count - stored
+
+
+def main() -> None:
+    habits = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print(f"{habits} habits, {count} check-offs per writer")
+    with tempfile.TemporaryDirectory() as directory:
+        for writers in WRITERS:
+            path = os.path.join(directory, f"writers{writers}.json")
+            HDataManager.save_database({
+                f"habit {idx}": Habit(f"habit {idx}", START, 1, [])
+                for idx in range(habits)
+            }, path)
+            throughput, lost = run(path, writers, count)
+            print(f"{writers:>2} writers: {throughput:8.1f} check-offs/s, "
+                  f"{lost} lost")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+Console output benchmark, a habit list and a check-off list of many rows
+printed in chunks against one styled write per row, to a file and to a
+terminal, and written as json, ndjson and csv records
+
+run from the application root directory:
+    python -m benchmark.bench_display [rows]
+
+"""
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+import click
+
+from htracker import HDisplayCategory
+from htracker.h_data import Habit
+from htracker.h_display import HDisplay
+
+
+class Terminal(io.StringIO):
+    """Output which looks like a terminal, so the rows are coloured"""
+
+    def isatty(self) -> bool:
+        return True
+
+
+def per_row(habits: list[Habit], habit: Habit) -> None:
+    """Prints the habits and the check-offs one styled row at a time,
+    building the format strings per row, like HDisplay did before
+
+    :param habits: habits of the habit list
+    :type habits: list[Habit]
+    :param habit: habit of the check-off list
+    :type habit: Habit
+
+    """
+    HDisplay.print_header(HDisplayCategory.ALL)
+    for row_habit in habits:
+        cell_name = "{:^50}"
+        cell_date = "{:^18}"
+        cell_periodicity = "{:^14}"
+        cell_check_offs = "{:^13}"
+        cell_streaks = "{:^12}"
+        cell_struggle = "{:^11}"
+        cell_on_track = "{:^13}"
+        click.secho(
+            cell_name.format(row_habit.name) + "|"
+            + cell_date.format(str(row_habit.starting_date)) + "|"
+            + cell_periodicity.format(str(row_habit.periodicity)) + "|"
+            + cell_check_offs.format(row_habit.check_off_count) + "|"
+            + cell_streaks.format(str(row_habit.streak)) + "|"
+            + cell_struggle.format(str(row_habit.struggle)) + "|"
+            + cell_on_track.format(str(int(row_habit.on_track * 100))
+                                   + "%") + "|",
+            fg="white"
+        )
+    click.secho(HDisplayCategory.CHECK_OFFS.value + " " + habit.name,
+                fg="yellow", bold="true")
+    for check_off_date in habit.check_offs:
+        cell_date = "{:^18}"
+        click.secho(cell_date.format(str(check_off_date)) + "|",
+                    fg="white")
+
+
+def chunked(habits: list[Habit], habit: Habit) -> None:
+    """Prints the habits and the check-offs in chunks
+
+    :param habits: habits of the habit list
+    :type habits: list[Habit]
+    :param habit: habit of the check-off list
+    :type habit: Habit
+
+    """
+    HDisplay.display_habits(HDisplayCategory.ALL, habits)
+    HDisplay.print_check_offs(HDisplayCategory.CHECK_OFFS, habit)
+
+
+def records(output_format: str):
+    """Writes the habits and the check-offs as records
+
+    :param output_format: "json", "ndjson" or "csv"
+    :type output_format: str
+
+    :return: render function of the records
+
+    """
+    def render(habits: list[Habit], habit: Habit) -> None:
+        HDisplay.display_habits(HDisplayCategory.ALL, habits,
+                                output_format)
+        HDisplay.print_check_offs(HDisplayCategory.CHECK_OFFS, habit,
+                                  output_format)
+
+    return render
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    start = date(1800, 1, 1)
+    habits = [Habit(f"habit {idx}", start, 1 + idx % 7,
+                    [start + timedelta(days=day) for day in range(3)])
+              for idx in range(rows)]
+    daily = Habit("daily", start, 1, [start + timedelta(days=day)
+                                      for day in range(rows)])
+    print(f"{rows} habit rows and {rows} check-off rows")
+    for target in ("file", "terminal"):
+        for name, render in (("per row", per_row), ("chunked", chunked)):
+            if target == "file":
+                output = open(os.devnull, "w")
+            else:
+                output = Terminal()
+            start_time = time.perf_counter()
+            with output, redirect_stdout(output):
+                render(habits, daily)
+            elapsed = time.perf_counter() - start_time
+            print(f"{target:>8} {name:>8}: {elapsed:7.2f} s")
+    for output_format in ("json", "ndjson", "csv"):
+        start_time = time.perf_counter()
+        with open(os.devnull, "w") as output, redirect_stdout(output):
+            records(output_format)(habits, daily)
+        elapsed = time.perf_counter() - start_time
+        print(f"{'file':>8} {output_format:>8}: {elapsed:7.2f} s")
+
+
+if __name__ == '__main__':
+    main()
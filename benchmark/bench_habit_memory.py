@@ -0,0 +1,91 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+Memory benchmark of the Habit, CompactHabit and BitmapHabit layouts,
+and the time of the streak calculation
+
+run from the application root directory:
+    python -m benchmark.bench_habit_memory [habits] [check-offs]
+
+"""
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from htracker.h_data import BitmapHabit, CompactHabit, Habit
+from htracker.h_tracker import HTracker
+
+
+def measure(habit_class, habits: int, check_offs: int) -> int:
+    """Allocated bytes of the habits with the given class
+
+    the dates are created before measuring, like they are when the
+    habits are loaded from the json database
+
+    :param habit_class: Habit, CompactHabit or BitmapHabit
+    :param habits: number of habits
+    :type habits: int
+    :param check_offs: number of daily check-offs per habit
+    :type check_offs: int
+
+    :return: int
+
+    """
+    start = date(2000, 1, 1)
+    tracemalloc.start()
+    loaded = []
+    for idx in range(habits):
+        events = [start + timedelta(days=day) for day in range(check_offs)]
+        loaded.append(habit_class(f"habit {idx}", start, 1, events))
+        del events
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def time_streaks(habit_class, check_offs: int) -> float:
+    """Seconds of one streak calculation of a habit
+
+    :param habit_class: Habit, CompactHabit or BitmapHabit
+    :param check_offs: number of daily check-offs
+    :type check_offs: int
+
+    :return: float
+
+    """
+    start = date(2000, 1, 1)
+    habit = habit_class("habit", start, 1,
+                        [start + timedelta(days=day)
+                         for day in range(check_offs)])
+    tracker = HTracker()
+    repeat = 20
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        tracker._count_streaks(habit)
+    return (time.perf_counter() - begin) / repeat
+
+
+def main() -> None:
+    habits = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    check_offs = int(sys.argv[2]) if len(sys.argv) > 2 else 3650
+    print(f"{habits} habits with {check_offs} check-offs each")
+    sizes = {}
+    for habit_class in (Habit, CompactHabit, BitmapHabit):
+        sizes[habit_class] = measure(habit_class, habits, check_offs)
+        print(f"{habit_class.__name__:>14}: "
+              f"{sizes[habit_class] / 2 ** 20:8.1f} MiB, "
+              f"{sizes[habit_class] / (habits * check_offs):6.1f} "
+              f"bytes per check-off, streaks in "
+              f"{time_streaks(habit_class, check_offs) * 1000:7.3f} ms")
+    for habit_class in (CompactHabit, BitmapHabit):
+        print(f"{habit_class.__name__:>14}: "
+              f"{sizes[Habit] / sizes[habit_class]:8.1f}x smaller")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+Load time benchmark of the json and binary database decoding, and of
+the summary index the habit lists read
+
+run from the application root directory:
+    python -m benchmark.bench_load [habits] [check-offs]
+
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from htracker import h_data
+from htracker.h_data_manager import HDataManager
+
+
+def make_database(path: str, habits: int, check_offs: int) -> None:
+    """Writes a synthetic json database
+
+    :param path: database path
+    :type path: str
+    :param habits: number of habits
+    :type habits: int
+    :param check_offs: number of check-offs per habit
+    :type check_offs: int
+
+    """
+    start = date(2000, 1, 1)
+    events = [str(start + timedelta(days=day * 2))
+              for day in range(check_offs)]
+    with open(path, "w") as write_file:
+        json.dump({f"habit {idx}": {
+            "name": f"habit {idx}",
+            "starting_date": str(start),
+            "periodicity": 2,
+            "events": events,
+            "streak": check_offs - 1,
+            "on_track": 1.0,
+            "struggle": 0
+        } for idx in range(habits)}, write_file, indent=4)
+
+
+def load_strptime(path: str) -> dict:
+    """The decoding before the fast path, one strptime per check-off
+
+    :param path: database path
+    :type path: str
+
+    :return: dict
+
+    """
+    with open(path, "r") as read_file:
+        habits_json = json.load(read_file)
+    return {name: [datetime.strptime(event, '%Y-%m-%d').date()
+                   for event in habit["events"]]
+            for name, habit in habits_json.items()}
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    habits = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    check_offs = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "habits.json")
+        make_database(path, habits, check_offs)
+        print(f"{habits * check_offs} check-offs, "
+              f"{os.path.getsize(path) / 2 ** 20:.1f} MiB")
+        print(f"{'strptime':>14}: {timed(load_strptime, path):6.2f} s")
+        binary_path = os.path.join(directory, "habits.hbin")
+        HDataManager.migrate_database(path, binary_path)
+        for layout in ("list", "compact"):
+            h_data.HABIT_LAYOUT = layout
+            print(f"{layout:>14}: "
+                  f"{timed(HDataManager.load_database, path):6.2f} s")
+            print(f"{'binary ' + layout:>14}: "
+                  f"{timed(HDataManager.load_database, binary_path):6.2f}"
+                  f" s")
+        h_data.HABIT_LAYOUT = "list"
+        # the synthetic database has no summary index yet
+        print(f"{'summary build':>14}: "
+              f"{timed(HDataManager.load_summaries, path):6.2f} s")
+        print(f"{'summary':>14}: "
+              f"{timed(HDataManager.load_summaries, path):6.2f} s")
+        _, habits = HDataManager.load_database(path)
+        print(f"{'json write':>14}: "
+              f"{timed(HDataManager.save_database, habits, path):6.2f} s")
+        print(f"{'binary write':>14}: "
+              f"{timed(HDataManager.save_database, habits, binary_path):6.2f}"
+              f" s, {os.path.getsize(binary_path) / 2 ** 20:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+Query benchmark, a selective query through the secondary indexes
+against a scan of every habit
+
+run from the application root directory:
+    python -m benchmark.bench_query [habits] [queries]
+
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from htracker.h_data import HabitSummary
+from htracker.h_query import HQuery
+
+
+def main() -> None:
+    habits = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    shuffled = random.Random(1)
+    summaries = [HabitSummary(
+        f"habit {idx}",
+        date(2020, 1, 1) + timedelta(days=shuffled.randrange(1000)),
+        shuffled.randrange(1, 31),
+        shuffled.randrange(1000),
+        shuffled.randrange(200),
+        shuffled.random(),
+        shuffled.randrange(100)
+    ) for idx in range(habits)]
+
+    start_time = time.perf_counter()
+    query = HQuery(summaries)
+    build = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(queries):
+        scanned = [habit for habit in summaries
+                   if habit.periodicity == 7 and habit.streak >= 190]
+    scan = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(queries):
+        selected = list(query.select(periodicity=7, streak=(190, None)))
+    indexed = time.perf_counter() - start_time
+
+    assert selected == scanned
+    print(f"{habits} habits, {len(selected)} matches")
+    print(f"{'index build':>12}: {build:6.2f} s")
+    print(f"{'scan':>12}: {scan / queries * 1000:6.2f} ms per query")
+    print(f"{'indexed':>12}: {indexed / queries * 1000:6.2f} ms per query")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+Daemon benchmark, commands sent to a running daemon against commands
+which open the database themselves, like a new CLI process does
+
+run from the application root directory:
+    python -m benchmark.bench_server [habits] [calls]
+
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+from htracker.h_data import Habit
+from htracker.h_data_manager import HDataManager
+from htracker.h_server import HClient, HServer
+from htracker.h_tracker import HTracker
+
+
+def run_calls(tracker_of, calls: int) -> float:
+    """Seconds per call of a check-off followed by a ranking
+
+    :param tracker_of: gives the tracker of one call
+    :type tracker_of: callable
+    :param calls: number of calls
+    :type calls: int
+
+    :return: float
+
+    """
+    day = date(2020, 1, 1)
+    start_time = time.perf_counter()
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for call in range(calls):
+            tracker_of().check_off(f"habit {call}", day)
+            tracker_of().analyse_on_track("d", 10)
+    return (time.perf_counter() - start_time) / calls
+
+
+def main() -> None:
+    habits = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    start = date(2019, 1, 1)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "habits.json")
+        HDataManager.save_database({
+            f"habit {idx}": Habit(
+                f"habit {idx}", start, 1,
+                [start + timedelta(days=day) for day in range(0, 300, 3)]
+            ) for idx in range(habits)
+        }, path)
+        direct = run_calls(lambda: HTracker(path), calls)
+
+        server = HServer(path)
+        thread = threading.Thread(target=server.serve)
+        thread.start()
+        try:
+            client = HClient.connect(path)
+            served = run_calls(lambda: client, calls)
+        finally:
+            server.shutdown()
+            thread.join()
+    print(f"{habits} habits, {calls} check-offs and rankings")
+    print(f"{'direct':>8}: {direct * 1000:8.1f} ms per call")
+    print(f"{'daemon':>8}: {served * 1000:8.1f} ms per call")
+
+
+if __name__ == '__main__':
+    main()
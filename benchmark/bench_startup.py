@@ -0,0 +1,75 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+Cold start benchmark of the CLI, the import time of the about and --help
+commands measured with python -X importtime, against a budget
+
+run from the application root directory:
+    python -m benchmark.bench_startup [runs] [budget ms]
+
+exits with 1 if a command goes over the budget
+
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+COMMANDS = (["about"], ["--help"], ["analyse", "--help"])
+
+# milliseconds of imports a command may take
+BUDGET_MS = 100.0
+
+
+def import_times(args: list[str]) -> (float, float, dict):
+    """Runs a command once with -X importtime
+
+    :param args: command line arguments of htracker
+    :type args: list[str]
+
+    :return: (import ms, wall ms, cumulative ms per top-level module)
+
+    """
+    start_time = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "htracker"] + args,
+        capture_output=True, text=True, check=True
+    )
+    wall = (time.perf_counter() - start_time) * 1000
+    modules = {}
+    # import time: self [us] | cumulative | imported package
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        # the nested imports are indented, their time is in the parent
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            modules[name.strip()] = int(cumulative) / 1000
+    return sum(modules.values()), wall, modules
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else BUDGET_MS
+    over_budget = False
+    for args in COMMANDS:
+        results = [import_times(args) for _ in range(runs)]
+        imports = statistics.median(result[0] for result in results)
+        wall = statistics.median(result[1] for result in results)
+        slowest = sorted(results[-1][2].items(), key=lambda item: item[1],
+                         reverse=True)[:3]
+        print(f"{' '.join(args):>16}: imports {imports:6.1f} ms, "
+              f"process {wall:6.1f} ms, slowest: " +
+              ", ".join(f"{name} {ms:.1f} ms" for name, ms in slowest))
+        over_budget = over_budget or imports > budget
+    if over_budget:
+        print(f"over the {budget:.0f} ms import budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
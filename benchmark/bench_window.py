@@ -0,0 +1,95 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+Struggle window benchmark, the closed form breaks and missing
+check-offs against the loops stepping one period at a time
+
+run from the application root directory:
+    python -m benchmark.bench_window [habits] [check-offs] [idle days]
+
+"""
+import sys
+import time
+from datetime import date, timedelta
+
+from htracker.h_analytics import HAnalytics
+from htracker.h_data import Habit
+
+
+def loop_struggle(habit: Habit, in_date: date) -> int:
+    """The breaks scanned from the first check-off
+
+    :param habit: habit object storing attributes of a habit
+    :type habit: Habit
+    :param in_date: start of the window
+    :type in_date: date
+
+    :return: int
+
+    """
+    check_offs = habit.check_off_ordinals
+    in_ordinal = in_date.toordinal()
+    habit_break = 0
+    for idx in range(len(check_offs) - 1):
+        if check_offs[idx] < in_ordinal:
+            continue
+        if check_offs[idx + 1] - check_offs[idx] != habit.periodicity:
+            habit_break += 1
+    return habit_break
+
+
+def loop_missing(habit: Habit, in_date: date) -> int:
+    """The missing check-offs one period at a time till today
+
+    :param habit: habit object storing attributes of a habit
+    :type habit: Habit
+    :param in_date: start of the window
+    :type in_date: date
+
+    :return: int
+
+    """
+    delta_periodicity = timedelta(days=int(habit.periodicity))
+    habit_break = 0
+    last_date = date.fromordinal(habit.check_off_ordinals[-1])
+    while last_date < date.today():
+        last_date += delta_periodicity
+        if last_date < in_date:
+            continue
+        habit_break += 1
+    return habit_break
+
+
+def main() -> None:
+    habits = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    check_offs = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    idle = int(sys.argv[3]) if len(sys.argv) > 3 else 3 * 365
+    # daily habits, checked-off every other day, idle for years
+    start = date.today() - timedelta(days=idle + check_offs * 2)
+    events = [start + timedelta(days=day * 2) for day in range(check_offs)]
+    all_habits = [Habit(f"habit {idx}", start, 1, events)
+                  for idx in range(habits)]
+    in_date = date.today() - timedelta(days=idle + 30)
+
+    start_time = time.perf_counter()
+    expected = [(loop_struggle(habit, in_date), loop_missing(habit, in_date))
+                for habit in all_habits]
+    loops = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    results = [HAnalytics.struggle_window(habit, in_date)
+               for habit in all_habits]
+    closed_form = time.perf_counter() - start_time
+
+    assert results == expected
+    print(f"{habits} habits, {check_offs} check-offs, {idle} idle days")
+    print(f"{'loops':>12}: {loops:6.2f} s")
+    print(f"{'closed form':>12}: {closed_form:6.2f} s")
+
+
+if __name__ == '__main__':
+    main()
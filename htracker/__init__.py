@@ -20,11 +20,22 @@ Commands:
   about         :Prints application name and version number to the user.
   add-habit     :Add a new function to the habit list
   analyze       :Analyze habits sub-menu (with the following commands)
+      batch         :Analyse a directory of habits databases
+      query         :Print habits filtered and sorted by their values
       periodicity   :Print habits by periodicity
       streak        :Print habit(s) by streak
   check-off     :Check-off a habit.
+  check-off-bulk :Check-off many habits and dates from a csv or ndjson
+                  file.
+  export        :Write the habits to a csv or ndjson file.
+  import        :Replace the habits with a csv or ndjson file.
   list-habits   :Print all habits in database to the user.
+  migrate-database :Copy the habits into a json, binary or SQLite
+                    database.
   remove-habit  :Remove a habit from the habits list.
+  serve         :Keep the database in memory and serve the other
+                 commands over a Unix socket.
+  shell         :Run many commands on the habits kept in memory.
 
 """
 import os
@@ -35,10 +46,43 @@ from pathlib import Path
 __app_name__: str = "habit tracking app"
 __version__: str = "0.1.0"
 
-# we need a filepath to a folder what the user can write
-FILE_PATH = Path.home().joinpath(
-    "." + Path.home().stem + "_htracker.json"
-)
+# storage format of the default database and of database paths
+# without a known file extension (".json", ".hbin", ".db"): "json" or
+# "binary", set with the HTRACKER_FORMAT environment variable
+DATABASE_FORMAT: str = os.environ.get("HTRACKER_FORMAT", "json")
+
+# we need a filepath to a folder what the user can write, it can be
+# changed with the HTRACKER_DATABASE environment variable, e.g. to a
+# ".db" file for the SQLite storage
+FILE_PATH = Path(os.environ["HTRACKER_DATABASE"]) \
+    if os.environ.get("HTRACKER_DATABASE") \
+    else Path.home().joinpath(
+        "." + Path.home().stem + "_htracker" +
+        (".hbin" if DATABASE_FORMAT == "binary" else ".json")
+    )
+
+# journaled mode: check-offs, new and removed habits are appended to a
+# log next to the json database, which is folded back into the database
+# once it grows over one of the thresholds
+JOURNAL_MODE: bool = os.environ.get("HTRACKER_JOURNAL", "0") == "1"
+JOURNAL_MAX_ENTRIES: int = 1000
+JOURNAL_MAX_BYTES: int = 256 * 1024
+
+# daemon mode: seconds between two writes of the changes to disk
+FLUSH_INTERVAL: float = 5.0
+# daemon mode: seconds a command waits for the daemon to answer
+SERVER_TIMEOUT: float = 60.0
+# shell mode: number of changes kept in memory before they are written
+SHELL_FLUSH_CHANGES: int = 100
+
+# concurrent writers: seconds a process waits for the lock of the
+# database held by another writer before giving up
+LOCK_TIMEOUT: float = 30.0
+
+# memory layout of the loaded habits: "list" keeps the check-offs in a
+# list of dates, "compact" in an array of day ordinals, "bitmap" in a
+# bitset of days
+HABIT_LAYOUT: str = os.environ.get("HTRACKER_HABIT_LAYOUT", "list")
 
 # the path to the test data. We copy over the data upon user request
 TEST_FILE_PATH = os.path.join(
@@ -61,6 +105,11 @@ class HErrorCode(Enum):
     START_DATE_ERROR = "Input date is earlier than check-off date."
     SAME_DATE_ERROR = "Input date was already checked-off."
     FUTURE_DATE_ERROR = "Input date is in the future."
+    ROW_FORMAT_ERROR = "Input row is not a habit name and a YYYY-MM-DD date."
+    SERVER_RUNNING = "A habit tracker daemon is already serving the " \
+                     "database."
+    SERVER_LOST = "The habit tracker daemon did not answer, the command " \
+                  "may or may not have been applied."
 
 
 # define display categories for console output
@@ -70,3 +119,4 @@ class HDisplayCategory(Enum):
     STREAK = "Habits listed by longest streak:"
     CHECK_OFFS = "Listing all check-off for habit:"
     STRUGGLE = "Habits listed by most breaks:"
+    QUERY = "Habits matching the query:"
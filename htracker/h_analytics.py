@@ -0,0 +1,383 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+HAnalytics class to calculate streaks, breaks and on-track values for
+many habits at once
+
+NumPy is an optional dependency (pip install .[analytics]), without it
+the same calculations run as plain Python loops over the same arrays.
+
+"""
+import bisect
+from array import array
+from datetime import date
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from htracker.h_data import Habit
+
+
+class HAnalytics:
+    """ Analytics engine over day ordinal arrays.
+
+    The check-offs of all habits are stored in one contiguous integer
+    array of day ordinals (date.toordinal()), habit after habit, with an
+    offsets array telling where each habit starts. Every calculation
+    works on the whole array at once with diff, compare and cumulative
+    operations, so the cost is a few passes over the check-offs instead
+    of Python loops with timedelta objects per habit.
+
+    The results are sequences in the order of the names attribute.
+
+    The same window arithmetic for one habit, without packing, is
+    offered by count_breaks, count_missing and struggle_window.
+
+    """
+
+    def __init__(self, habits):
+        """Packs the habits into the ordinal arrays
+
+        :param habits: habits with sorted check-offs
+        :type habits: iterable of Habit
+
+        """
+        self.names = []
+        periodicity = array("q")
+        starting_dates = array("q")
+        offsets = array("q", [0])
+        # day ordinals fit in 32 bits, like the compact habit arrays
+        ordinals = array("i")
+        for habit in habits:
+            self.names.append(habit.name)
+            periodicity.append(int(habit.periodicity))
+            starting_dates.append(habit.starting_date.toordinal())
+            ordinals.extend(HAnalytics._ordinals(habit))
+            offsets.append(len(ordinals))
+        if numpy is not None:
+            periodicity = numpy.asarray(periodicity, dtype=numpy.int64)
+            starting_dates = numpy.asarray(starting_dates,
+                                           dtype=numpy.int64)
+            offsets = numpy.asarray(offsets, dtype=numpy.int64)
+            ordinals = numpy.asarray(ordinals, dtype=numpy.int64)
+        self.periodicity = periodicity
+        self.starting_dates = starting_dates
+        self.offsets = offsets
+        self.ordinals = ordinals
+        self._streaks = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def streaks(self) -> tuple:
+        """Longest and current streak of every habit
+
+        :return: (longest streaks, current streaks)
+
+        """
+        if self._streaks is None:
+            if numpy is not None:
+                self._streaks = self._numpy_streaks()
+            else:
+                self._streaks = self._python_streaks()
+        return self._streaks
+
+    def breaks_since(self, in_date: date):
+        """Number of breaks in the check-offs from in_date onwards
+
+        the same as HTracker._count_struggle for every habit
+
+        :param in_date: start of the window
+        :type in_date: date
+
+        :return: breaks per habit
+
+        """
+        since = in_date.toordinal()
+        if numpy is None:
+            return [self._python_breaks(idx, since)
+                    for idx in range(len(self))]
+        if len(self.ordinals) < 2:
+            return numpy.zeros(len(self), dtype=numpy.int64)
+        habit_of = self._habit_of()
+        broken = (habit_of[1:] == habit_of[:-1]) \
+            & (numpy.diff(self.ordinals) != self.periodicity[habit_of[:-1]]) \
+            & (self.ordinals[:-1] >= since)
+        return numpy.bincount(habit_of[:-1][broken], minlength=len(self))
+
+    def missing_since(self, in_date: date, today: date = None):
+        """Number of periods without check-off from the last check-off
+        till today, counting only the periods from in_date onwards
+
+        the same as HTracker._count_missing_check_offs for every habit
+
+        :param in_date: start of the window
+        :type in_date: date
+        :param today: end of the window, default today
+        :type today: date
+
+        :return: missing check-offs per habit
+
+        """
+        today = today or date.today()
+        if numpy is None:
+            return [self._python_missing(idx, in_date.toordinal(),
+                                         today.toordinal())
+                    for idx in range(len(self))]
+        return self._numpy_missing(in_date.toordinal(), today.toordinal())
+
+    def on_track(self, today: date = None):
+        """On-track value of every habit
+
+        the same as HTracker._calc_on_track with the longest streak
+        calculated from the check-offs
+
+        :param today: end of the window, default today
+        :type today: date
+
+        :return: on-track values in range of 0.0 - 1.0
+
+        """
+        today = today or date.today()
+        longest = self.streaks()[0]
+        if numpy is None:
+            values = []
+            for idx in range(len(self)):
+                periods = self.offsets[idx + 1] - self.offsets[idx] - 1 \
+                    + self._python_missing(idx, self.starting_dates[idx],
+                                           today.toordinal())
+                # a habit without a period to compare is on-track
+                values.append(longest[idx] / periods if periods > 0
+                              else 1.0)
+            return values
+        periods = numpy.diff(self.offsets) - 1 + self._numpy_missing(
+            self.starting_dates, today.toordinal()
+        )
+        values = numpy.ones(len(self))
+        numpy.divide(longest, periods, out=values, where=periods > 0)
+        return values
+
+    @staticmethod
+    def _ordinals(habit: Habit):
+        """Day ordinals of the check-offs of a habit
+
+        :param habit: habit object storing attributes of a habit
+        :type habit: Habit
+
+        :return: iterable of int
+
+        """
+        return habit.check_off_ordinals
+
+    def _habit_of(self):
+        """Index of the habit for every check-off in the ordinals
+
+        :return: numpy array
+
+        """
+        return numpy.repeat(numpy.arange(len(self)),
+                            numpy.diff(self.offsets))
+
+    def _numpy_streaks(self) -> tuple:
+        """Longest and current streak of every habit with NumPy
+
+        :return: (longest streaks, current streaks)
+
+        """
+        longest = numpy.zeros(len(self), dtype=numpy.int64)
+        current = numpy.zeros(len(self), dtype=numpy.int64)
+        if len(self.ordinals) < 2:
+            return longest, current
+        habit_of = self._habit_of()
+        # a gap continues the streak if it is one period inside a habit
+        hit = (habit_of[1:] == habit_of[:-1]) \
+            & (numpy.diff(self.ordinals) == self.periodicity[habit_of[:-1]])
+        # length of the streak ending at every gap: hits so far minus
+        # the hits before the last break
+        hits = numpy.cumsum(hit)
+        run = hits - numpy.maximum.accumulate(numpy.where(hit, 0, hits))
+        counts = numpy.diff(self.offsets)
+        has_gaps = counts >= 2
+        if has_gaps.any():
+            # the gap between two habits is a break, max is not changed
+            longest[has_gaps] = numpy.maximum.reduceat(
+                run, self.offsets[:-1][has_gaps]
+            )
+            current[has_gaps] = run[self.offsets[1:][has_gaps] - 2]
+        return longest, current
+
+    def _numpy_missing(self, since, today: int):
+        """Missing check-offs of every habit with NumPy
+
+        the loop stepping one period at a time is closed form: the
+        number of steps till today minus the steps before since
+
+        :param since: start of the window, one or one per habit
+        :type since: int or numpy array
+        :param today: end of the window
+        :type today: int
+
+        :return: numpy array
+
+        """
+        counts = numpy.diff(self.offsets)
+        last = self.ordinals[numpy.maximum(self.offsets[1:] - 1, 0)] \
+            if len(self.ordinals) else numpy.zeros(len(self),
+                                                   dtype=numpy.int64)
+        steps = numpy.maximum(-((last - today) // self.periodicity), 0)
+        first = numpy.maximum(-((last - since) // self.periodicity), 1)
+        missing = numpy.maximum(steps - first + 1, 0)
+        missing[counts == 0] = 0
+        return missing
+
+    def _python_streaks(self) -> tuple:
+        """Longest and current streak of every habit without NumPy
+
+        :return: (longest streaks, current streaks)
+
+        """
+        longest = []
+        current = []
+        ordinals = self.ordinals
+        for idx in range(len(self)):
+            periodicity = self.periodicity[idx]
+            longest_streak = 0
+            current_streak = 0
+            for pos in range(self.offsets[idx] + 1,
+                             self.offsets[idx + 1]):
+                if ordinals[pos] - ordinals[pos - 1] == periodicity:
+                    current_streak += 1
+                    if current_streak > longest_streak:
+                        longest_streak = current_streak
+                else:
+                    current_streak = 0
+            longest.append(longest_streak)
+            current.append(current_streak)
+        return longest, current
+
+    def _python_breaks(self, idx: int, since: int) -> int:
+        """Breaks of one habit from since onwards without NumPy
+
+        :param idx: habit index
+        :type idx: int
+        :param since: start of the window
+        :type since: int
+
+        :return: int
+
+        """
+        return HAnalytics.count_breaks(
+            self.ordinals, self.periodicity[idx], since,
+            self.offsets[idx], self.offsets[idx + 1]
+        )
+
+    def _python_missing(self, idx: int, since: int, today: int) -> int:
+        """Missing check-offs of one habit without NumPy
+
+        :param idx: habit index
+        :type idx: int
+        :param since: start of the window
+        :type since: int
+        :param today: end of the window
+        :type today: int
+
+        :return: int
+
+        """
+        if self.offsets[idx + 1] == self.offsets[idx]:
+            return 0
+        return HAnalytics.count_missing(
+            self.ordinals[self.offsets[idx + 1] - 1],
+            self.periodicity[idx], since, today
+        )
+
+    @staticmethod
+    def count_breaks(ordinals, periodicity: int, since: int,
+                     low: int = 0, high: int = None) -> int:
+        """Breaks in sorted check-offs from since onwards: gaps which
+        are not one period long, counted from the check-off they start
+
+        the check-offs before the window are skipped with a bisect
+
+        :param ordinals: sorted day ordinals of the check-offs
+        :type ordinals: sequence of int
+        :param periodicity: the reoccurring period in days
+        :type periodicity: int
+        :param since: day ordinal of the window start
+        :type since: int
+        :param low: first position of the habit in ordinals
+        :type low: int
+        :param high: end position of the habit in ordinals
+        :type high: int
+
+        :return: int
+
+        """
+        if high is None:
+            high = len(ordinals)
+        breaks = 0
+        for pos in range(bisect.bisect_left(ordinals, since, low, high),
+                         high - 1):
+            if ordinals[pos + 1] - ordinals[pos] != periodicity:
+                breaks += 1
+        return breaks
+
+    @staticmethod
+    def count_missing(last: int, periodicity: int, since: int,
+                      today: int) -> int:
+        """Periods without check-off after the last check-off till
+        today, only the periods ending from since onwards are counted
+
+        stepping one period at a time from the last check-off is closed
+        form: the number of steps till today minus the steps which end
+        before since
+
+        :param last: day ordinal of the last check-off
+        :type last: int
+        :param periodicity: the reoccurring period in days
+        :type periodicity: int
+        :param since: day ordinal of the window start
+        :type since: int
+        :param today: day ordinal of the window end
+        :type today: int
+
+        :return: int
+
+        """
+        # ceiling divisions: steps taken while the date is before today,
+        # the first step which is not before since
+        steps = max(-((last - today) // periodicity), 0)
+        first = max(-((last - since) // periodicity), 1)
+        return max(steps - first + 1, 0)
+
+    @staticmethod
+    def struggle_window(habit: Habit, in_date: date,
+                        today: date = None) -> tuple:
+        """Breaks and missing check-offs of one habit in the window from
+        in_date till today
+
+        :param habit: habit object storing attributes of a habit
+        :type habit: Habit
+        :param in_date: start of the window
+        :type in_date: date
+        :param today: end of the window, default today
+        :type today: date
+
+        :return: (breaks, missing check-offs)
+
+        """
+        ordinals = HAnalytics._ordinals(habit)
+        if not len(ordinals):
+            return 0, 0
+        since = in_date.toordinal()
+        return (
+            HAnalytics.count_breaks(ordinals, habit.periodicity, since),
+            HAnalytics.count_missing(ordinals[-1], habit.periodicity, since,
+                                     (today or date.today()).toordinal())
+        )
@@ -0,0 +1,310 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+AsyncHTracker class to use the habit tracker from an asyncio event loop
+without blocking it
+
+"""
+import asyncio
+import copy
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import date
+from functools import partial
+
+from htracker import FILE_PATH, HErrorCode
+from htracker.h_data import Habit, HabitSummary
+from htracker.h_tracker import HTracker
+
+
+class AsyncHTracker:
+    """ Asyncio facade of HTracker.
+
+    Every storage read and write runs in an executor, one at a time,
+    the event loop only waits for them. Reads of the same data asked for
+    while one is running share its result, so a burst of requests loads
+    the database once. Writes asked for while a batch is being written
+    are collected into the next batch, which is applied in one HTracker
+    unit of work and flushed to disk once. Nothing is printed, the
+    results are returned, the habits as copies the later batches don't
+    change:
+
+        async with AsyncHTracker(path) as tracker:
+            results = await asyncio.gather(*(
+                tracker.check_off(name, today) for name in names
+            ))
+
+    """
+
+    def __init__(self, path: str = FILE_PATH, executor: Executor = None):
+        """Habit tracker over one habits database
+
+        :param path: database path
+        :type path: str
+        :param executor: executor of the storage work, default a thread
+        :type executor: Executor
+
+        """
+        self.tracker = HTracker(path)
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="htracker"
+        )
+        # HTracker is not thread-safe, with more workers they queue here
+        self._lock = threading.Lock()
+        # running reads by what they read, and the writes of the next
+        # batch with the futures of their callers
+        self._reads = {}
+        self._batch = []
+        self._writer = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self) -> None:
+        """Waits for the pending writes, then stops the own executor
+
+        """
+        while self._writer is not None and not self._writer.done():
+            await self._writer
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+
+    async def load_habits(self) -> (HErrorCode, dict[Habit]):
+        """All habits with their check-offs
+
+        :return HErrorCode, dict[Habit]: {name: Habit} pairs
+
+        """
+        def habits():
+            error_code, loaded = self.tracker.load_habits_database()
+            # the batches change the loaded habits in the executor
+            return error_code, copy.deepcopy(loaded)
+
+        return await self._read("habits", habits)
+
+    async def load_habit(self, name: str) -> (HErrorCode, Habit):
+        """One habit, None if there is no habit with the name
+
+        :param name: habit name
+        :type name: str
+
+        :return: HErrorCode, Habit
+
+        """
+        def habit():
+            error_code, loaded = self.tracker.session.load_habit(name)
+            return error_code, copy.deepcopy(loaded)
+
+        return await self._read(("habit", name), habit)
+
+    async def load_summaries(self) -> (HErrorCode, dict[HabitSummary]):
+        """The summary values of all habits, without the check-offs
+
+        :return HErrorCode, dict[HabitSummary]: {name: HabitSummary}
+
+        """
+        return await self._read("summaries",
+                                self.tracker.session.load_summaries)
+
+    async def query(self, **predicates) -> (HErrorCode, list):
+        """Habits matching the predicates, see HTracker.query_habits,
+        e.g. the top streaks with order_by="streak", descending=True
+
+        :param predicates: keyword arguments of HQuery.select
+        :type predicates: dict
+
+        :raise ValueError: unknown sort attribute
+
+        :return HErrorCode, list[HabitSummary]: the matching habits
+
+        """
+        return await self._read(
+            ("query",) + tuple(sorted(predicates.items())),
+            partial(self.tracker.query_habits, **predicates)
+        )
+
+    async def rank_struggle(self, in_date: date, limit: int = None,
+                            offset: int = 0) -> (HErrorCode, list[Habit]):
+        """Habits ranked by their breaks from in_date till today
+
+        :param in_date: start of the window
+        :type in_date: date
+        :param limit: number of habits, default all
+        :type limit: int
+        :param offset: number of top habits to skip
+        :type offset: int
+
+        :return HErrorCode, list[Habit]: copies with the struggle of
+                                         the window
+
+        """
+        def ranked():
+            error_code, habits = self.tracker.rank_struggle(in_date, limit,
+                                                            offset)
+            # the copies of the ranking share the check-offs
+            return error_code, copy.deepcopy(list(habits))
+
+        return await self._read(("struggle", in_date, limit, offset),
+                                ranked)
+
+    async def add_habit(self, habit: Habit) -> HErrorCode:
+        """Adds a new habit
+
+        :param habit: the new habit
+        :type habit: Habit
+
+        :return: HErrorCode, NAME_EXISTS if the name is taken
+
+        """
+        def add():
+            error_code = self.tracker.check_habit_name_exists(habit.name)
+            if error_code == HErrorCode.NAME_EXISTS:
+                return error_code, None
+            return self.tracker.add_habit_to_database(habit), None
+
+        return (await self._write(add))[0]
+
+    async def remove_habit(self, name: str) -> HErrorCode:
+        """Removes a habit
+
+        :param name: habit name
+        :type name: str
+
+        :return: HErrorCode, NAME_ERROR if there is no such habit
+
+        """
+        def remove():
+            error_code = self.tracker.check_habit_name_exists(name)
+            if error_code != HErrorCode.NAME_EXISTS:
+                return error_code, None
+            return self.tracker.remove_habit_from_database(name), None
+
+        return (await self._write(remove))[0]
+
+    async def check_off(self, name: str,
+                        in_date: date) -> (HErrorCode, int):
+        """Adds a check-off date to a habit
+
+        :param name: habit name
+        :type name: str
+        :param in_date: date of check-off
+        :type in_date: date
+
+        :return HErrorCode, int: the current streak, None if the date
+                                 was not added
+
+        """
+        return await self._write(self.tracker.add_check_off, name, in_date)
+
+    async def _run(self, function, *args):
+        """Runs a function in the executor, one at a time
+
+        :param function: HTracker work
+        :type function: callable
+
+        :return: the result of the function
+
+        """
+        def locked():
+            with self._lock:
+                return function(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, locked
+        )
+
+    async def _read(self, key, function, *args):
+        """Runs a read, or joins the same read if it is running
+
+        :param key: what is read, hashable
+        :param function: HTracker read
+        :type function: callable
+
+        :return: the result of the read
+
+        """
+        future = self._reads.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._run(function, *args))
+            self._reads[key] = future
+            future.add_done_callback(
+                lambda done: self._reads.pop(key, None)
+                if self._reads.get(key) is done else None
+            )
+        # a cancelled caller must not cancel the read of the others
+        return await asyncio.shield(future)
+
+    async def _write(self, function, *args) -> tuple:
+        """Queues a write for the next batch and waits for its flush
+
+        :param function: HTracker write giving back (HErrorCode, value)
+        :type function: callable
+
+        :return: (HErrorCode, value)
+
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._batch.append((partial(function, *args), future))
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.ensure_future(self._write_batches())
+        return await future
+
+    async def _write_batches(self) -> None:
+        """Writes the batches until no more writes are waiting
+
+        """
+        while self._batch:
+            # the requests of the same loop iteration join the batch
+            await asyncio.sleep(0)
+            batch, self._batch = self._batch, []
+            try:
+                results = await self._run(self._apply, [
+                    write for write, _ in batch
+                ])
+            except Exception as error:
+                results = [error] * len(batch)
+            # reads started before the batch don't have its changes
+            self._reads.clear()
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _apply(self, writes: list) -> list:
+        """Applies the writes of a batch in one unit of work, in the
+        executor
+
+        :param writes: HTracker writes giving back (HErrorCode, value)
+        :type writes: list
+
+        :return: list of the results, (HErrorCode, value) each
+
+        """
+        results = []
+        session = self.tracker.unit_of_work()
+        with session:
+            for write in writes:
+                # a failing write fails only its own caller
+                try:
+                    results.append(write())
+                except Exception as error:
+                    results.append(error)
+            error_code = session.flush()
+        if error_code != HErrorCode.SUCCESS:
+            # the accepted changes did not get to the disk
+            results = [(error_code, None)
+                       if not isinstance(result, Exception) and
+                       result[0] == HErrorCode.SUCCESS else result
+                       for result in results]
+        return results
@@ -0,0 +1,218 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+HBatchAnalytics class to run the streak, on-track and struggle analysis
+over a directory of habits databases, one database per user, and write
+one aggregated report
+
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import partial
+from typing import Iterable, Iterator
+
+from htracker import HErrorCode
+from htracker.h_analytics import HAnalytics
+from htracker.h_binary_manager import BINARY_SUFFIXES, JSON_SUFFIXES
+from htracker.h_data_manager import HDataManager
+from htracker.h_sqlite_manager import SQLITE_SUFFIXES
+from htracker.h_summary_index import SUMMARY_SUFFIX
+
+# file extensions of the databases picked up from the directory, the
+# journal, index and summary files next to a database are not databases
+STORE_SUFFIXES = JSON_SUFFIXES + BINARY_SUFFIXES + SQLITE_SUFFIXES
+
+
+class HBatchAnalytics:
+    """ Analytics over many habits databases.
+
+    Every database is loaded and analysed in a worker process, only the
+    small per-habit results travel back to the parent, which streams
+    them into the report, so neither side holds more than a chunk of
+    databases at once.
+
+    """
+
+    @staticmethod
+    def find_stores(directory: str) -> list[str]:
+        """Lists the habits databases in a directory
+
+        :param directory: directory of the databases
+        :type directory: str
+
+        :return: list[str] database paths in name order
+
+        """
+        with os.scandir(directory) as entries:
+            return sorted(
+                entry.path for entry in entries
+                if entry.is_file() and os.path.splitext(
+                    entry.name)[1].lower() in STORE_SUFFIXES
+                and not entry.name.endswith(SUMMARY_SUFFIX)
+            )
+
+    @staticmethod
+    def analyse_store(path: str, since: date, today: date = None) -> dict:
+        """Analyses every habit of one database
+
+        the values are calculated from the check-offs, the same way as
+        the analyse commands do for one database
+
+        :param path: database path
+        :type path: str
+        :param since: start of the struggle window
+        :type since: date
+        :param today: end of the windows, default today
+        :type today: date
+
+        :return: dict with the path, the error message or None, and the
+                 streak, on-track and struggle values of the habits
+
+        """
+        error_code, habits = HDataManager.load_database(path)
+        if error_code != HErrorCode.SUCCESS:
+            return {"path": path, "error": error_code.value, "habits": []}
+        today = today or date.today()
+        analytics = HAnalytics(habits.values())
+        longest, current = analytics.streaks()
+        on_track = analytics.on_track(today)
+        breaks = analytics.breaks_since(since)
+        missing = analytics.missing_since(since, today)
+        return {
+            "path": path,
+            "error": None,
+            "habits": [{
+                "name": name,
+                "check_offs": habits[name].check_off_count,
+                "longest_streak": int(longest[idx]),
+                "current_streak": int(current[idx]),
+                "on_track": float(on_track[idx]),
+                "struggle": int(breaks[idx] + missing[idx])
+            } for idx, name in enumerate(analytics.names)]
+        }
+
+    @staticmethod
+    def analyse_stores(paths: list[str], since: date, today: date = None,
+                       workers: int = None) -> Iterator[dict]:
+        """Analyses the databases in worker processes
+
+        :param paths: database paths
+        :type paths: list[str]
+        :param since: start of the struggle window
+        :type since: date
+        :param today: end of the windows, default today
+        :type today: date
+        :param workers: number of processes, default the number of CPUs
+        :type workers: int
+
+        :return: iterator of analyse_store results in the paths order
+
+        """
+        # every worker must calculate with the same day
+        analyse = partial(HBatchAnalytics.analyse_store, since=since,
+                          today=today or date.today())
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(paths) < 2:
+            yield from map(analyse, paths)
+            return
+        # a few chunks per worker keep the processes busy till the end
+        # without paying the inter-process round trip per database
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(analyse, paths, chunksize=chunksize)
+
+    @staticmethod
+    def write_report(results: Iterable[dict], report_path: str,
+                     since: date) -> dict:
+        """Writes the store results one by one to a json report, with
+        the totals of all stores at the end
+
+        :param results: analyse_store results
+        :type results: iterable of dict
+        :param report_path: path of the json report
+        :type report_path: str
+        :param since: start of the struggle window
+        :type since: date
+
+        :return: dict the summary written to the report
+
+        """
+        summary = {
+            "since": str(since),
+            "stores": 0,
+            "failed_stores": 0,
+            "habits": 0,
+            "check_offs": 0,
+            "mean_on_track": 0.0,
+            "struggle": 0,
+            "longest_streak": None
+        }
+        on_track_sum = 0.0
+        tmp_path = str(report_path) + ".tmp"
+        with open(tmp_path, "w") as report:
+            report.write('{"stores": [')
+            for result in results:
+                if summary["stores"]:
+                    report.write(",")
+                report.write("\n" + json.dumps(result))
+                summary["stores"] += 1
+                if result["error"] is not None:
+                    summary["failed_stores"] += 1
+                for habit in result["habits"]:
+                    summary["habits"] += 1
+                    summary["check_offs"] += habit["check_offs"]
+                    summary["struggle"] += habit["struggle"]
+                    on_track_sum += habit["on_track"]
+                    best = summary["longest_streak"]
+                    if best is None or \
+                            habit["longest_streak"] > best["days"]:
+                        summary["longest_streak"] = {
+                            "path": result["path"],
+                            "name": habit["name"],
+                            "days": habit["longest_streak"]
+                        }
+            if summary["habits"]:
+                summary["mean_on_track"] = on_track_sum / summary["habits"]
+            report.write('\n], "summary": ' + json.dumps(summary) + "}\n")
+        os.replace(tmp_path, report_path)
+        return summary
+
+    @staticmethod
+    def run(directory: str, report_path: str, since: date,
+            workers: int = None) -> (HErrorCode, dict):
+        """Analyses every database of a directory into one report
+
+        :param directory: directory of the databases
+        :type directory: str
+        :param report_path: path of the json report
+        :type report_path: str
+        :param since: start of the struggle window
+        :type since: date
+        :param workers: number of processes, default the number of CPUs
+        :type workers: int
+
+        :return HErrorCode, dict: the summary of the report
+
+        """
+        try:
+            paths = HBatchAnalytics.find_stores(directory)
+        except OSError:
+            return HErrorCode.FILE_READ, {}
+        # a json report written into the directory is not a database
+        paths = [path for path in paths
+                 if os.path.abspath(path) != os.path.abspath(report_path)]
+        try:
+            return HErrorCode.SUCCESS, HBatchAnalytics.write_report(
+                HBatchAnalytics.analyse_stores(paths, since,
+                                               workers=workers),
+                report_path,
+                since
+            )
+        except OSError:
+            return HErrorCode.FILE_WRITE, {}
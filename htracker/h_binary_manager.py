@@ -0,0 +1,576 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+HBinaryManager class to store the habits in a compact binary file with
+the check-off dates delta-encoded as variable length integers
+
+file layout:
+    header      "HTRB", version byte, varint number of habits padded
+                to 5 bytes
+    habit       varint length of the record, followed by
+        name            varint length and utf-8 bytes
+        starting_date   varint day ordinal
+        periodicity     zigzag varint
+        streak          zigzag varint
+        struggle        zigzag varint
+        on_track        type byte, then zigzag varint for an int or
+                        8 bytes little-endian double for a float
+        events          varint count, varint length in bytes, zigzag
+                        varint days from starting_date for the first
+                        check-off, then from the previous check-off
+
+"""
+import mmap
+import os
+import struct
+import weakref
+from array import array
+from datetime import date
+from itertools import accumulate
+from typing import Iterable, Iterator
+
+from htracker import DATABASE_FORMAT, HErrorCode
+from htracker.h_data import BitmapHabit, CompactHabit, Habit, \
+    new_habit
+from htracker.h_sqlite_manager import SQLITE_SUFFIXES
+
+# file extensions handled by the binary storage engine
+BINARY_SUFFIXES = (".hbin",)
+JSON_SUFFIXES = (".json",)
+
+_MAGIC = b"HTRB"
+_VERSION = 1
+_DOUBLE = struct.Struct("<d")
+# type byte of on_track, json keeps 1 and 1.0 apart
+_INT = 0
+_FLOAT = 1
+# zigzag decoded values of the one byte varints, the usual check-off
+# delta of 1 or 7 days is one byte
+_ZIGZAG = [(value >> 1) ^ -(value & 1) for value in range(0x80)]
+
+# encoded records of the loaded and saved habits with the revision they
+# were made at, unchanged habits are saved without encoding them
+_RECORD_CACHE = weakref.WeakKeyDictionary()
+
+# errors of a truncated or corrupted file
+_DECODE_ERRORS = (IndexError, OverflowError, UnicodeDecodeError,
+                  ValueError, struct.error)
+
+
+class HBinaryManager:
+    """ Binary storage engine for the habits.
+
+    Offers the same load and save surface as HSQLiteManager. Every habit
+    is a length prefixed record, so one habit can be read or replaced
+    without decoding the others.
+
+    """
+
+    @staticmethod
+    def is_binary_path(path) -> bool:
+        """Checks if the database path belongs to the binary engine
+
+        the extension decides, paths without a known extension follow
+        the DATABASE_FORMAT setting
+
+        :param path: database path
+        :type path: str
+
+        :return: bool
+
+        """
+        suffix = os.path.splitext(str(path))[1].lower()
+        if suffix in BINARY_SUFFIXES:
+            return True
+        return DATABASE_FORMAT == "binary" and \
+            suffix not in SQLITE_SUFFIXES + JSON_SUFFIXES
+
+    @staticmethod
+    def load_database(path) -> (HErrorCode, dict[Habit]):
+        """Loads habits database from a binary file
+
+        :param path: load database path
+        :type path: str
+
+        :return HErrorCode, dict[Habit] :
+                            HErrorCode Enum, user-friendly
+                            error codes defined in __init__,
+                            dictionary {name(str):Habit} storing name
+                            and habit class objects pairs
+
+        """
+        new_habits = {}
+        error_code, data = HBinaryManager._read(path)
+        if error_code != HErrorCode.SUCCESS:
+            return error_code, new_habits
+        try:
+            for name, start, end in HBinaryManager._records(data):
+                habit = HBinaryManager._decode_habit(data, start, end)
+                new_habits[name] = habit
+                _RECORD_CACHE[habit] = (habit.revision, data[start:end])
+        except _DECODE_ERRORS:
+            return HErrorCode.JSON_ERROR, {}
+        return HErrorCode.SUCCESS, new_habits
+
+    @staticmethod
+    def load_habit(name: str, path) -> (HErrorCode, Habit):
+        """Loads one habit from a binary file, the other records are
+        skipped
+
+        :param name: habit name
+        :type name: str
+        :param path: load database path
+        :type path: str
+
+        :return HErrorCode, Habit: the habit is None if there is no
+                                   habit with the name
+
+        """
+        error_code, data = HBinaryManager._read(path)
+        if error_code != HErrorCode.SUCCESS:
+            return error_code, None
+        try:
+            for key, start, end in HBinaryManager._records(data):
+                if key == name:
+                    return HErrorCode.SUCCESS, \
+                        HBinaryManager._decode_habit(data, start, end)
+        except _DECODE_ERRORS:
+            return HErrorCode.JSON_ERROR, None
+        return HErrorCode.SUCCESS, None
+
+    @staticmethod
+    def iter_habits(path) -> Iterator[Habit]:
+        """Reads the habits one by one from the memory mapped file, only
+        one habit is decoded at a time
+
+        :param path: load database path
+        :type path: str
+
+        :raise FileNotFoundError: no database
+        :raise ValueError: database is corrupted
+
+        :return: iterator of Habit
+
+        """
+        with open(path, "rb") as read_file:
+            if os.fstat(read_file.fileno()).st_size == 0:
+                return
+            with mmap.mmap(read_file.fileno(), 0,
+                           access=mmap.ACCESS_READ) as data:
+                try:
+                    for _, start, end in HBinaryManager._records(data):
+                        yield HBinaryManager._decode_habit(data, start,
+                                                           end)
+                except _DECODE_ERRORS as error:
+                    raise ValueError(str(error))
+
+    @staticmethod
+    def save_database(habits: dict[Habit], path) -> HErrorCode:
+        """Replaces the whole binary database with the habits
+
+        :param habits: storing name and habit pairs
+        :type habits: dictionary of {name(str):Habit} pairs
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        return HBinaryManager.write_habits(habits.values(), path)
+
+    @staticmethod
+    def write_habits(habits: Iterable[Habit], path) -> HErrorCode:
+        """Replaces the whole binary database with the habits, the
+        habits can come one by one from a generator
+
+        :param habits: habits with unique names
+        :type habits: iterable of Habit
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        return HBinaryManager._write(
+            map(HBinaryManager._encode_habit, habits), path
+        )
+
+    @staticmethod
+    def insert_habit(habit: Habit, path) -> HErrorCode:
+        """Adds or replaces one habit
+
+        :param habit: Habit to be stored
+        :type habit: Habit
+        :param path: database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        return HBinaryManager._replace_record(habit.name, habit, path)
+
+    @staticmethod
+    def delete_habit(name: str, path) -> HErrorCode:
+        """Removes one habit
+
+        :param name: name of the habit to be removed
+        :type name: str
+        :param path: database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        return HBinaryManager._replace_record(name, None, path)
+
+    @staticmethod
+    def insert_check_off(habit: Habit, check_off_date: date,
+                         path) -> HErrorCode:
+        """Stores one check-off and the recalculated habit values
+
+        only the record of the habit is encoded again
+
+        :param habit: habit already updated with the check-off
+        :type habit: Habit
+        :param check_off_date: date of the new check-off
+        :type check_off_date: date
+        :param path: database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        return HBinaryManager._replace_record(habit.name, habit, path)
+
+    @staticmethod
+    def _read(path) -> (HErrorCode, bytes):
+        """Reads the whole database file
+
+        :param path: database path
+        :type path: str
+
+        :return HErrorCode, bytes:
+
+        """
+        try:
+            with open(path, "rb") as read_file:
+                return HErrorCode.SUCCESS, read_file.read()
+        except FileNotFoundError:
+            return HErrorCode.FILE_READ, b""
+        except OSError:
+            raise RuntimeError(
+                "Unable to handle error, program will terminate."
+            )
+
+    @staticmethod
+    def _write(records: Iterable[bytes], path) -> HErrorCode:
+        """Writes the header and the encoded habit records
+
+        the file is replaced at once, a crash leaves the old database.
+        The number of habits is known only at the end, it is written
+        over a placeholder of fixed length.
+
+        :param records: encoded habit records in database order
+        :type records: iterable of bytes
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        header = bytearray(_MAGIC)
+        header.append(_VERSION)
+        count = 0
+        try:
+            with open(str(path) + ".tmp", "wb") as write_file:
+                write_file.write(header + HBinaryManager._count_varint(0))
+                for record in records:
+                    write_file.write(record)
+                    count += 1
+                write_file.seek(len(header))
+                write_file.write(HBinaryManager._count_varint(count))
+            os.replace(str(path) + ".tmp", path)
+            return HErrorCode.SUCCESS
+        except OSError:
+            return HErrorCode.FILE_WRITE
+
+    @staticmethod
+    def _replace_record(name: str, habit: Habit, path) -> HErrorCode:
+        """Replaces, adds or removes one habit record
+
+        the other records are copied as bytes, without decoding
+
+        :param name: habit name
+        :type name: str
+        :param habit: the habit, None to remove it
+        :type habit: Habit
+        :param path: database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        error_code, data = HBinaryManager._read(path)
+        if error_code == HErrorCode.FILE_READ:
+            data = b""
+        records = []
+        found = False
+        try:
+            for key, start, end in HBinaryManager._records(data):
+                if key != name:
+                    records.append(data[start:end])
+                elif habit is not None:
+                    records.append(HBinaryManager._encode_habit(habit))
+                found = found or key == name
+        except _DECODE_ERRORS:
+            return HErrorCode.JSON_ERROR
+        if not found and habit is not None:
+            records.append(HBinaryManager._encode_habit(habit))
+        return HBinaryManager._write(records, path)
+
+    @staticmethod
+    def _records(data: bytes):
+        """Walks through the habit records of the database
+
+        an empty file is an empty database
+
+        :param data: database file content
+        :type data: bytes
+
+        :raise ValueError: not a valid database
+
+        :return: iterator of (name, start, end) of each record,
+                 including its length prefix
+
+        """
+        if not data:
+            return
+        if data[:len(_MAGIC)] != _MAGIC or \
+                data[len(_MAGIC)] != _VERSION:
+            raise ValueError("Not a habits binary database")
+        count, position = HBinaryManager._read_varint(
+            data, len(_MAGIC) + 1
+        )
+        for _ in range(count):
+            length, body_start = \
+                HBinaryManager._read_varint(data, position)
+            end = body_start + length
+            if end > len(data):
+                raise ValueError("Truncated habit record")
+            name_length, name_start = \
+                HBinaryManager._read_varint(data, body_start)
+            yield data[name_start:name_start + name_length].decode(
+                "utf-8"), position, end
+            position = end
+        if position != len(data):
+            raise ValueError("Unexpected data after the habit records")
+
+    @staticmethod
+    def _encode_habit(habit: Habit) -> bytes:
+        """Encodes a habit as a length prefixed record, the encoding
+        is cached until the habit changes
+
+        :param habit: Habit
+
+        :return: bytes
+
+        """
+        cached = _RECORD_CACHE.get(habit)
+        if cached is not None and cached[0] == habit.revision:
+            return cached[1]
+        write_varint = HBinaryManager._write_varint
+        zigzag = HBinaryManager._zigzag
+        body = bytearray()
+        name = habit.name.encode("utf-8")
+        write_varint(body, len(name))
+        body += name
+        starting_ordinal = habit.starting_date.toordinal()
+        write_varint(body, starting_ordinal)
+        write_varint(body, zigzag(habit.periodicity))
+        write_varint(body, zigzag(habit.streak))
+        write_varint(body, zigzag(habit.struggle))
+        if isinstance(habit.on_track, int):
+            body.append(_INT)
+            write_varint(body, zigzag(habit.on_track))
+        else:
+            body.append(_FLOAT)
+            body += _DOUBLE.pack(habit.on_track)
+        ordinals = habit.check_off_ordinals
+        deltas = [zigzag(ordinal - previous) for previous, ordinal in
+                  zip([starting_ordinal, *ordinals], ordinals)]
+        if not deltas or max(deltas) < 0x80:
+            events = bytes(deltas)
+        else:
+            events = bytearray()
+            for delta in deltas:
+                write_varint(events, delta)
+        write_varint(body, len(deltas))
+        write_varint(body, len(events))
+        body += events
+        record = bytearray()
+        write_varint(record, len(body))
+        record = bytes(record + body)
+        _RECORD_CACHE[habit] = (habit.revision, record)
+        return record
+
+    @staticmethod
+    def _decode_habit(data: bytes, start: int, end: int) -> Habit:
+        """Decodes one habit record
+
+        :param data: database file content
+        :type data: bytes
+        :param start: start of the record
+        :type start: int
+        :param end: end of the record
+        :type end: int
+
+        :raise ValueError: not a valid record
+
+        :return: Habit
+
+        """
+        read_varint = HBinaryManager._read_varint
+        unzigzag = HBinaryManager._unzigzag
+        # the length prefix was checked by _records
+        _, position = read_varint(data, start)
+        name_length, position = read_varint(data, position)
+        name = data[position:position + name_length].decode("utf-8")
+        position += name_length
+        starting_ordinal, position = read_varint(data, position)
+        periodicity, position = read_varint(data, position)
+        streak, position = read_varint(data, position)
+        struggle, position = read_varint(data, position)
+        on_track_type = data[position]
+        position += 1
+        if on_track_type == _INT:
+            on_track, position = read_varint(data, position)
+            on_track = unzigzag(on_track)
+        elif on_track_type == _FLOAT:
+            on_track = _DOUBLE.unpack_from(data, position)[0]
+            position += _DOUBLE.size
+        else:
+            raise ValueError("Unknown on_track type")
+        count, position = read_varint(data, position)
+        size, position = read_varint(data, position)
+        events = data[position:position + size]
+        if position + size != end or len(events) != size:
+            raise ValueError("Habit record length mismatch")
+        if count == size:
+            # one byte each, no varint decoding needed
+            deltas = map(_ZIGZAG.__getitem__, events)
+        else:
+            deltas = HBinaryManager._read_deltas(events, count)
+        ordinals = accumulate(deltas, initial=starting_ordinal)
+        next(ordinals)
+        habit = new_habit(name, date.fromordinal(starting_ordinal),
+                          unzigzag(periodicity), None, unzigzag(streak),
+                          on_track, unzigzag(struggle))
+        if isinstance(habit, CompactHabit):
+            habit.check_off_ordinals = array("i", ordinals)
+        elif isinstance(habit, BitmapHabit):
+            habit.check_off_ordinals = ordinals
+        else:
+            habit.check_offs = list(map(date.fromordinal, ordinals))
+        return habit
+
+    @staticmethod
+    def _read_deltas(events: bytes, count: int) -> list[int]:
+        """Decodes the zigzag varint check-off deltas
+
+        :param events: encoded deltas
+        :type events: bytes
+        :param count: number of check-offs
+        :type count: int
+
+        :raise ValueError: not a valid record
+
+        :return: list[int]
+
+        """
+        deltas = []
+        position = 0
+        for _ in range(count):
+            delta, position = HBinaryManager._read_varint(events, position)
+            deltas.append(HBinaryManager._unzigzag(delta))
+        if position != len(events):
+            raise ValueError("Check-off count mismatch")
+        return deltas
+
+    @staticmethod
+    def _write_varint(out: bytearray, value: int) -> None:
+        """Appends a non-negative int as a LEB128 varint
+
+        :param out: output buffer
+        :type out: bytearray
+        :param value: non-negative int
+        :type value: int
+
+        """
+        while value > 0x7f:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+        out.append(value)
+
+    @staticmethod
+    def _count_varint(value: int) -> bytes:
+        """Encodes the number of habits as a varint of fixed length,
+        padded with continuation bytes
+
+        :param value: non-negative int below 2**35
+        :type value: int
+
+        :return: bytes
+
+        """
+        return bytes((value >> shift & 0x7f) | (0x80 if shift < 28 else 0)
+                     for shift in range(0, 35, 7))
+
+    @staticmethod
+    def _read_varint(data: bytes, position: int) -> (int, int):
+        """Reads a LEB128 varint
+
+        :param data: encoded data
+        :type data: bytes
+        :param position: start of the varint
+        :type position: int
+
+        :raise IndexError: truncated data
+
+        :return int, int: value and the position after the varint
+
+        """
+        value = 0
+        shift = 0
+        while True:
+            byte = data[position]
+            position += 1
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return value, position
+            shift += 7
+
+    @staticmethod
+    def _zigzag(value: int) -> int:
+        """Maps signed to unsigned ints: 0, -1, 1, -2 to 0, 1, 2, 3
+
+        :param value: int
+
+        :return: int
+
+        """
+        return value << 1 if value >= 0 else (-value << 1) - 1
+
+    @staticmethod
+    def _unzigzag(value: int) -> int:
+        """Inverse of _zigzag
+
+        :param value: int
+
+        :return: int
+
+        """
+        return (value >> 1) ^ -(value & 1)
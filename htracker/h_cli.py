@@ -9,28 +9,122 @@ Handle user command line input
 
 """
 
+import shlex
+import signal
 from datetime import datetime, date
 
 import click
 
-from htracker import HErrorCode, TEST_FILE_PATH
+from htracker import FILE_PATH, FLUSH_INTERVAL, HErrorCode, \
+    SHELL_FLUSH_CHANGES, TEST_FILE_PATH
 from htracker import __app_name__, __version__
 from htracker.h_data import Habit
-from htracker.h_tracker import HTracker
 
-# the component that handles the habit tracking logic
-h_tracker = HTracker()
+# the modules behind the commands are imported by the commands which
+# use them, so e.g. about or --help only load click
+
+# the component that handles the habit tracking logic, created by the
+# first command which needs it, see tracker()
+h_tracker = None
+# the habits database of the commands, set by main_menu
+database_path = FILE_PATH
+# output of the list and analyse commands, set by main_menu
+output_format = "table"
+
+# one page of a ranked habit list, shared by the analyse commands
+limit_option = click.option(
+    "--limit",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Show only this many habits of the ranking, all by default."
+)
+offset_option = click.option(
+    "--offset",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Skip this many habits from the top of the ranking."
+)
+
+
+def tracker():
+    """The habit tracker of the database, created on first use
+
+    a proxy of the daemon if one is serving the database, see serve
+
+    :return: HTracker or HClient
+
+    """
+    global h_tracker
+    if h_tracker is None:
+        from htracker.h_server import HClient
+        h_tracker = HClient.connect(database_path)
+        if h_tracker is None:
+            from htracker.h_tracker import HTracker
+            h_tracker = HTracker(database_path)
+    return h_tracker
+
+
+def _bounds(low, high):
+    """Range of a query filter, None if neither end is given
+
+    :param low: minimum or None
+    :param high: maximum or None
+
+    :return: (low, high) or None
+
+    """
+    return None if low is None and high is None else (low, high)
+
+
+def _echo_result(error_code: HErrorCode) -> None:
+    """Prints the result of a list or analyse command, to stderr when
+    stdout has the records of another output format than the table
+
+    :param error_code: result of the command
+    :type error_code: HErrorCode
+
+    """
+    # different color based on error category
+    fg_color = "green" if error_code == HErrorCode.SUCCESS else "red"
+    click.secho(error_code.value, fg=fg_color,
+                err=output_format != "table")
 
 
 @click.group(help="""-- Welcome to the habit tracker app! -- \n
 "Excellence, is not an act, but a habit." ~ Aristotle """)
-def main_menu() -> None:
+@click.option(
+    "--database",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Path of the habits database, by default HTRACKER_DATABASE or "
+         "the json file in your home folder."
+)
+@click.option(
+    "--format", "records_format",
+    type=click.Choice(["table", "json", "ndjson", "csv"]),
+    default="table",
+    help="Output of the list and analyse commands: a table, or one "
+         "record per habit or check-off in json, ndjson or csv for "
+         "other programs."
+)
+def main_menu(database: str, records_format: str) -> None:
     """Main menu start
 
-     dummy method for click group
+    picks the habits database and the output format the commands work
+    with
 
-     """
-    pass
+    :param database: database path
+    :type database: str
+    :param records_format: "table", "json", "ndjson" or "csv"
+    :type records_format: str
+
+    """
+    global h_tracker, database_path, output_format
+    output_format = records_format
+    path = FILE_PATH if database is None else database
+    if str(path) != str(database_path):
+        database_path = path
+        h_tracker = None
 
 
 # @click.command(name="info: get about notes")
@@ -81,7 +175,7 @@ def add_habit(name: str, period: int, start_date: str) -> None:
 
     """
     # duplicated names need to be checked
-    name_error_code = h_tracker.check_habit_name_exists(name)
+    name_error_code = tracker().check_habit_name_exists(name)
     if (name_error_code == HErrorCode.NAME_ERROR) or \
             (name_error_code == HErrorCode.FILE_READ):
         # handle not correct date input format
@@ -94,7 +188,7 @@ def add_habit(name: str, period: int, start_date: str) -> None:
                 # we assume the start date is the first check-off date
                 [datetime.strptime(start_date, '%Y-%m-%d').date()]
             )
-            file_error_code = h_tracker.add_habit_to_database(new_habit)
+            file_error_code = tracker().add_habit_to_database(new_habit)
             # different color based on error category
             fg_color = "green" if \
                 file_error_code == HErrorCode.SUCCESS else "red"
@@ -141,9 +235,9 @@ def remove_habit(name, confirm) -> None:
         click.secho(HErrorCode.ABORTED.value, fg="red")
         return
     # check if the habit really exists in db
-    name_error_code = h_tracker.check_habit_name_exists(name)
+    name_error_code = tracker().check_habit_name_exists(name)
     if name_error_code == HErrorCode.NAME_EXISTS:
-        file_error_code = h_tracker.remove_habit_from_database(name)
+        file_error_code = tracker().remove_habit_from_database(name)
         # different color based on error category
         fg_color = "green" if file_error_code == HErrorCode.SUCCESS \
             else "red"
@@ -178,11 +272,11 @@ def check_off(name, check_date) -> None:
 
     """
     # check if the habit really exists in db
-    name_error_code = h_tracker.check_habit_name_exists(name)
+    name_error_code = tracker().check_habit_name_exists(name)
     if name_error_code == HErrorCode.NAME_EXISTS:
         # handle not correct date input format
         try:
-            error_code = h_tracker.check_off(
+            error_code = tracker().check_off(
                 name,
                 datetime.strptime(check_date, '%Y-%m-%d').date()
             )
@@ -202,15 +296,56 @@ def check_off(name, check_date) -> None:
         click.secho(name_error_code.value, fg="red")
 
 
+@main_menu.command(
+    help="-> Adds many check-off dates from a csv or ndjson file."
+)
+@click.option(
+    "-f", "--file", "records",
+    type=click.File("r"),
+    default="-",
+    help="csv (name,YYYY-MM-DD) or ndjson ({\"name\": .., \"date\": ..}) "
+         "file, stdin by default."
+)
+@click.option(
+    "--input-format",
+    type=click.Choice(["csv", "ndjson"]),
+    default=None,
+    help="Format of the check-offs, by default from the file extension "
+         "or the first line."
+)
+def check_off_bulk(records, input_format: str) -> None:
+    """Checks-off many events of many habits at once, the database is
+    loaded and saved once
+
+    :param records: open csv or ndjson file
+    :type records: TextIO
+    :param input_format: "csv" or "ndjson"
+    :type input_format: str
+
+    """
+    from htracker.h_records import HRecords
+    if input_format is None:
+        input_format = HRecords.detect_format(records.name)
+    error_code, results = tracker().check_off_many(
+        HRecords.read_check_offs(records, input_format)
+    )
+    click.secho(f"{results[HErrorCode.SUCCESS]} check-offs added.",
+                fg="green")
+    for result, count in results.items():
+        if result != HErrorCode.SUCCESS:
+            click.secho(f"{count} rejected: {result.value}", fg="red")
+    # different color based on error category
+    fg_color = "green" if error_code == HErrorCode.SUCCESS else "red"
+    click.secho(error_code.value, fg=fg_color)
+
+
 # todo move to h_tracker
 @main_menu.command(help="-> Lists all of your habits in database.")
 def list_habits() -> None:
     """Prints to console all habits in database to the user.
 
     """
-    error_code = h_tracker.list_all_habits()
-    fg_color = "green" if error_code == HErrorCode.SUCCESS else "red"
-    click.secho(error_code.value, fg=fg_color)
+    _echo_result(tracker().list_all_habits(output_format))
 
 
 # todo move to h_tracker
@@ -228,13 +363,7 @@ def list_check_offs(name: str) -> None:
     :type name: str
 
     """
-    error_code = h_tracker.list_all_check_off(name)
-    # different color based on error category
-    if error_code == HErrorCode.SUCCESS:
-        fg_color = "green"
-    else:
-        fg_color = "red"
-    click.secho(error_code.value, fg=fg_color)
+    _echo_result(tracker().list_all_check_off(name, output_format))
 
 
 @main_menu.command(help="-> Deletes all of your habits.")
@@ -258,7 +387,7 @@ def remove_all_habits(confirm) -> None:
     if confirm.lower() == "n":
         click.secho(HErrorCode.ABORTED.value, fg="red")
         return
-    error_code = h_tracker.delete_habit_database()
+    error_code = tracker().delete_habit_database()
     # different color based on error category
     fg_color = "green" if error_code == HErrorCode.SUCCESS else "red"
     click.secho(error_code.value, fg=fg_color)
@@ -285,23 +414,26 @@ def analyse() -> None:
     help="Display longest streak of habit(s).",
     default=""
 )
-def streak(name: str) -> None:
+@limit_option
+@offset_option
+def streak(name: str, limit: int, offset: int) -> None:
     """Prints to the console the given habit's longest streak,
     or if no name is given than all habit's longest streaks.
 
     :param name: Habit name to be checked-off
     :type name: str
+    :param limit: number of habits to show
+    :type limit: int
+    :param offset: number of top habits to skip
+    :type offset: int
 
     """
-    name_error_code = h_tracker.check_habit_name_exists(name)
+    name_error_code = tracker().check_habit_name_exists(name)
     if name_error_code == HErrorCode.NAME_EXISTS or name == "":
-        error_code = h_tracker.analyse_streak(name)
-        # different color based on error category
-        fg_color = "green" if error_code == HErrorCode.SUCCESS \
-            else "red"
-        click.secho(error_code.value, fg=fg_color)
+        _echo_result(tracker().analyse_streak(name, limit, offset,
+                                              output_format))
     else:
-        click.secho(name_error_code.value, fg="red")
+        _echo_result(name_error_code)
 
 
 @analyse.command(
@@ -320,10 +452,7 @@ def periodicity(period: int) -> None:
     :type period: int
 
     """
-    error_code = h_tracker.analyse_periodicity(period)
-    # different color based on error category
-    fg_color = "green" if error_code == HErrorCode.SUCCESS else "red"
-    click.secho(error_code.value, fg=fg_color)
+    _echo_result(tracker().analyse_periodicity(period, output_format))
 
 
 @analyse.command(
@@ -339,19 +468,23 @@ def periodicity(period: int) -> None:
     help="Display habits based on on-track.",
     default='A'
 )
-def on_track(sort: str) -> None:
+@limit_option
+@offset_option
+def on_track(sort: str, limit: int, offset: int) -> None:
     """Calculates an on-track value based on streaks and breaks.
     The order of habits can be changes to show the most success or
     least success habit first
 
     :param sort: ascending or descending order
     :type sort: str
+    :param limit: number of habits to show
+    :type limit: int
+    :param offset: number of top habits to skip
+    :type offset: int
 
     """
-    error_code = h_tracker.analyse_on_track(sort.lower())
-    # different color based on error category
-    fg_color = "green" if error_code == HErrorCode.SUCCESS else "red"
-    click.secho(error_code.value, fg=fg_color)
+    _echo_result(tracker().analyse_on_track(sort.lower(), limit, offset,
+                                            output_format))
 
 
 @analyse.command(
@@ -364,7 +497,9 @@ def on_track(sort: str) -> None:
     help="Analyse struggle by habits between today and a given date.",
     default=str(date.today())
 )
-def struggle(in_date: str) -> None:
+@limit_option
+@offset_option
+def struggle(in_date: str, limit: int, offset: int) -> None:
     """Analyse struggle by habits between today and a given date
 
     It calculates the breaks and the missed check-offs till today.
@@ -372,6 +507,10 @@ def struggle(in_date: str) -> None:
 
     :param in_date: date in past
     :type in_date: date
+    :param limit: number of habits to show
+    :type limit: int
+    :param offset: number of top habits to skip
+    :type offset: int
 
     """
     # handle not correct date input format
@@ -379,23 +518,170 @@ def struggle(in_date: str) -> None:
         # need to convert the str to date format for easy compare
         past_date = datetime.strptime(in_date, '%Y-%m-%d').date()
         # util function to calc breaks and missing check-off
-        error_code = h_tracker.analyse_struggle(past_date)
-        # different color based on error category
-        if error_code == HErrorCode.SUCCESS:
-            fg_color = "green"
-        else:
-            fg_color = "red"
-        click.secho(error_code.value, fg=fg_color)
+        _echo_result(tracker().analyse_struggle(past_date, limit, offset,
+                                                output_format))
     except ValueError:
         click.secho(f"Wrong date format. "
                     + HErrorCode.RUNTIME.value,
-                    fg="red")
+                    fg="red", err=output_format != "table")
         # fix: currently not known how to call back the date input again
         # so exit
         ctx = click.Context(analyse)
         click.Context.exit(ctx)
 
 
+@analyse.command(
+    help="-> Prints the habits matching all the given filters."
+)
+@click.option("--periodicity", type=click.IntRange(min=1), default=None,
+              help="Periodicity in days.")
+@click.option("--name-prefix", type=str, default=None,
+              help="Start of the habit name.")
+@click.option("--started-after", type=click.DateTime(["%Y-%m-%d"]),
+              default=None, help="Earliest starting date (YYYY-MM-DD).")
+@click.option("--started-before", type=click.DateTime(["%Y-%m-%d"]),
+              default=None, help="Latest starting date (YYYY-MM-DD).")
+@click.option("--min-streak", type=int, default=None,
+              help="Shortest longest streak.")
+@click.option("--max-streak", type=int, default=None,
+              help="Longest longest streak.")
+@click.option("--min-on-track", type=click.FloatRange(0, 100),
+              default=None, help="Lowest on-track in percent.")
+@click.option("--max-on-track", type=click.FloatRange(0, 100),
+              default=None, help="Highest on-track in percent.")
+@click.option("--min-struggle", type=int, default=None,
+              help="Fewest breaks.")
+@click.option("--max-struggle", type=int, default=None,
+              help="Most breaks.")
+@click.option(
+    "--sort-by",
+    type=click.Choice(["name", "starting-date", "periodicity", "streak",
+                       "on-track", "struggle"]),
+    default=None,
+    help="Value to sort the habits by, database order by default."
+)
+@click.option("--desc", is_flag=True, default=False,
+              help="Highest value first.")
+@limit_option
+@offset_option
+def query(periodicity: int, name_prefix: str, started_after: datetime,
+          started_before: datetime, min_streak: int, max_streak: int,
+          min_on_track: float, max_on_track: float, min_struggle: int,
+          max_struggle: int, sort_by: str, desc: bool, limit: int,
+          offset: int) -> None:
+    """Filters and sorts the habits by their stored values, the
+    filters are combined, a habit has to match all of them
+
+    :param periodicity: periodicity in days
+    :type periodicity: int
+    :param name_prefix: start of the habit name
+    :type name_prefix: str
+    :param started_after: earliest starting date
+    :type started_after: datetime
+    :param started_before: latest starting date
+    :type started_before: datetime
+    :param min_streak: lowest longest streak
+    :type min_streak: int
+    :param max_streak: highest longest streak
+    :type max_streak: int
+    :param min_on_track: lowest on-track in percent
+    :type min_on_track: float
+    :param max_on_track: highest on-track in percent
+    :type max_on_track: float
+    :param min_struggle: fewest breaks
+    :type min_struggle: int
+    :param max_struggle: most breaks
+    :type max_struggle: int
+    :param sort_by: value to sort by
+    :type sort_by: str
+    :param desc: highest value first
+    :type desc: bool
+    :param limit: number of habits to show
+    :type limit: int
+    :param offset: number of habits to skip
+    :type offset: int
+
+    """
+    error_code = tracker().analyse_query(
+        output_format,
+        periodicity=periodicity,
+        name_prefix=name_prefix,
+        started=_bounds(started_after and started_after.date(),
+                        started_before and started_before.date()),
+        streak=_bounds(min_streak, max_streak),
+        on_track=_bounds(
+            None if min_on_track is None else min_on_track / 100,
+            None if max_on_track is None else max_on_track / 100
+        ),
+        struggle=_bounds(min_struggle, max_struggle),
+        order_by=sort_by and sort_by.replace("-", "_"),
+        descending=desc,
+        limit=limit,
+        offset=offset
+    )
+    _echo_result(error_code)
+
+
+@analyse.command(
+    help="-> Analyses every habits database of a directory into one "
+         "report."
+)
+@click.option(
+    "-d", "--directory",
+    type=click.Path(exists=True, file_okay=False),
+    prompt="Enter the directory of the habits databases",
+    help="Directory of the .json, .hbin and .db habits databases."
+)
+@click.option(
+    "-o", "--output", "report",
+    type=click.Path(dir_okay=False),
+    default="htracker_report.json",
+    help="Path of the json report."
+)
+@click.option(
+    "-s", "--since",
+    type=str,
+    default=str(date.today()),
+    help="Start date (YYYY-MM-DD) of the struggle window, today by "
+         "default."
+)
+@click.option(
+    "-j", "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes, the number of CPUs by default."
+)
+def batch(directory: str, report: str, since: str, jobs: int) -> None:
+    """Analyses the streaks, on-track and struggle values of the habits
+    of many users, one database per user, in parallel
+
+    :param directory: directory of the databases
+    :type directory: str
+    :param report: path of the json report
+    :type report: str
+    :param since: start date of the struggle window
+    :type since: str
+    :param jobs: number of worker processes
+    :type jobs: int
+
+    """
+    try:
+        since_date = datetime.strptime(since, '%Y-%m-%d').date()
+    except ValueError:
+        click.secho(f"Wrong date format. " + HErrorCode.RUNTIME.value,
+                    fg="red", err=output_format != "table")
+        return
+    from htracker.h_batch import HBatchAnalytics
+    error_code, summary = HBatchAnalytics.run(directory, report,
+                                              since_date, jobs)
+    if error_code == HErrorCode.SUCCESS:
+        click.secho(f"{summary['stores']} databases and "
+                    f"{summary['habits']} habits analysed, "
+                    f"{summary['failed_stores']} databases failed.",
+                    fg="green", err=output_format != "table")
+    _echo_result(error_code)
+
+
 @main_menu.command(
     help="-> Overwrites your habits with pre-defined test habits."
 )
@@ -421,7 +707,240 @@ def load_test_habits(
     if confirm.lower() == "n":
         click.secho(HErrorCode.ABORTED.value, fg="red")
         return
-    error_code = h_tracker.import_database(TEST_FILE_PATH)
+    error_code = tracker().import_database(TEST_FILE_PATH)
+    # different color based on error category
+    fg_color = "green" if error_code == HErrorCode.SUCCESS else "red"
+    click.secho(error_code.value, fg=fg_color)
+
+
+@main_menu.command(
+    help="-> Copies your habits into a new json, binary or SQLite "
+         "database."
+)
+@click.option(
+    "-t", "--target",
+    type=str,
+    prompt="Enter the path of the new database (.json, .hbin or .db)",
+    help="Path of the new database, the extension picks the storage."
+)
+def migrate_database(target: str) -> None:
+    """Copies the habits database into a new database file
+
+    To use the new database set the HTRACKER_DATABASE environment
+    variable to its path.
+
+    :param target: path of the new database
+    :type target: str
+
+    """
+    error_code = tracker().migrate_database(target)
     # different color based on error category
     fg_color = "green" if error_code == HErrorCode.SUCCESS else "red"
     click.secho(error_code.value, fg=fg_color)
+
+
+@main_menu.command(
+    name="export",
+    help="-> Writes your habits to a csv or ndjson file."
+)
+@click.option(
+    "-f", "--file", "records",
+    type=click.File("w"),
+    default="-",
+    help="ndjson file with one habit per line, or csv file with one "
+         "check-off per line, stdout by default."
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(["csv", "ndjson"]),
+    default=None,
+    help="Format of the habits, by default from the file extension, "
+         "ndjson for stdout."
+)
+def export_habits(records, output_format: str) -> None:
+    """Writes the habits one by one to a file
+
+    :param records: open csv or ndjson file
+    :type records: TextIO
+    :param output_format: "csv" or "ndjson"
+    :type output_format: str
+
+    """
+    from htracker.h_records import HRecords
+    output_format = output_format or \
+        HRecords.detect_format(records.name) or "ndjson"
+    error_code, count = tracker().export_habits(records, output_format)
+    # the status goes to stderr, stdout can be the exported habits
+    fg_color = "green" if error_code == HErrorCode.SUCCESS else "red"
+    click.secho(f"{count} habits exported. {error_code.value}",
+                fg=fg_color, err=True)
+
+
+@main_menu.command(
+    name="import",
+    help="-> Replaces your habits with the habits of a csv or ndjson "
+         "file."
+)
+@click.option(
+    "-f", "--file", "records",
+    type=click.File("r"),
+    default="-",
+    help="ndjson file with one habit per line, or csv file with one "
+         "check-off per line, stdin by default."
+)
+@click.option(
+    "--input-format",
+    type=click.Choice(["csv", "ndjson"]),
+    default=None,
+    help="Format of the habits, by default from the file extension "
+         "or the first line."
+)
+@click.option(
+    "-c", "--confirm",
+    type=str,
+    prompt="Are you sure you want to replace all of your habits? Y/N",
+    help="Enter Y for yes, or N for no.",
+    default="N"
+)
+def import_habits(records, input_format: str, confirm: str) -> None:
+    """Replaces the habits database with the habits of a file, the
+    habits are read and written one by one
+
+    :param records: open csv or ndjson file
+    :type records: TextIO
+    :param input_format: "csv" or "ndjson"
+    :type input_format: str
+    :param confirm: user confirmation
+    :type confirm: str
+
+    """
+    # input is set to non-case-sensitive
+    if confirm.lower() != "y":
+        click.secho(HErrorCode.ABORTED.value, fg="red")
+        return
+    from htracker.h_records import HRecords
+    error_code, results = tracker().import_habits(HRecords.read_habits(
+        records, input_format or HRecords.detect_format(records.name)
+    ))
+    click.secho(f"{results[HErrorCode.SUCCESS]} habits imported.",
+                fg="green")
+    for result, count in results.items():
+        if result != HErrorCode.SUCCESS:
+            click.secho(f"{count} rejected: {result.value}", fg="red")
+    # different color based on error category
+    fg_color = "green" if error_code == HErrorCode.SUCCESS else "red"
+    click.secho(error_code.value, fg=fg_color)
+
+
+@main_menu.command(
+    help="-> Keeps your habits in memory and serves the other commands "
+         "until stopped with Ctrl+C."
+)
+@click.option(
+    "-i", "--flush-interval",
+    type=click.FloatRange(min=0, min_open=True),
+    default=FLUSH_INTERVAL,
+    show_default=True,
+    help="Seconds between two writes of the changes to the database."
+)
+def serve(flush_interval: float) -> None:
+    """Runs the daemon of the database, the commands started meanwhile
+    send their work to it over a Unix socket
+
+    :param flush_interval: seconds between two writes to disk
+    :type flush_interval: float
+
+    """
+    from htracker.h_server import HServer
+    try:
+        server = HServer(database_path, flush_interval)
+    except FileExistsError:
+        click.secho(HErrorCode.SERVER_RUNNING.value, fg="red")
+        return
+    except OSError as error:
+        click.secho(f"Socket cannot be created: {error}", fg="red")
+        return
+    click.secho(f"Serving {server.path} on {server.server_address}, "
+                f"press Ctrl+C to stop.", fg="green")
+    # a kill stops the daemon like Ctrl+C, the changes are written
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    server.serve()
+    click.secho(HErrorCode.SUCCESS.value, fg="green")
+
+
+@main_menu.command(
+    help="-> Runs many commands in a row on your habits kept in memory."
+)
+@click.option(
+    "-w", "--flush-every",
+    type=click.IntRange(min=1),
+    default=SHELL_FLUSH_CHANGES,
+    show_default=True,
+    help="Write the changes to the database after this many of them."
+)
+def shell(flush_every: int) -> None:
+    """Reads commands one by one and runs them on the habits loaded
+    once, the changes are written on save, on exit or after flush_every
+    changes
+
+    :param flush_every: number of changes kept in memory
+    :type flush_every: int
+
+    """
+    global h_tracker, database_path
+    shell_tracker, shell_path = tracker(), database_path
+    # with a daemon the daemon keeps the habits and writes them
+    session = getattr(shell_tracker, "unit_of_work", lambda: None)()
+    click.secho(f"Habits of {shell_path} loaded. Enter a command, e.g. "
+                f"list-habits, --help for the commands, save to write "
+                f"the changes, exit to leave.", fg="green")
+    if session is not None:
+        session.__enter__()
+    try:
+        while True:
+            try:
+                line = input("htracker> ")
+            except EOFError:
+                click.echo()
+                break
+            except KeyboardInterrupt:
+                click.echo()
+                continue
+            try:
+                args = shlex.split(line)
+            except ValueError as error:
+                click.secho(str(error), fg="red")
+                continue
+            if not args:
+                continue
+            if args[0] in ("exit", "quit"):
+                break
+            if args[0] == "save":
+                error_code = HErrorCode.SUCCESS if session is None \
+                    else session.flush()
+                fg_color = "green" if error_code == HErrorCode.SUCCESS \
+                    else "red"
+                click.secho(error_code.value, fg=fg_color)
+                continue
+            if args[0] in ("shell", "serve"):
+                click.secho(f"{args[0]} can't run inside the shell.",
+                            fg="red")
+                continue
+            try:
+                # the same database, unless the line asks for another
+                main_menu.main(["--database", str(shell_path)] + args,
+                               prog_name="htracker",
+                               standalone_mode=False)
+            except click.ClickException as error:
+                error.show()
+            except click.Abort:
+                click.secho("Aborted!", fg="red")
+            finally:
+                h_tracker, database_path = shell_tracker, shell_path
+            if session is not None and session.pending >= flush_every:
+                session.flush()
+    finally:
+        if session is not None:
+            # the last changes are written on the way out
+            session.__exit__(None, None, None)
+    click.secho(HErrorCode.SUCCESS.value, fg="green")
@@ -5,13 +5,26 @@
 #
 
 """
-Habit class to store one habit and relevant information
+Habit class to store one habit and relevant information, the
+CompactHabit and BitmapHabit variants for habits with long check-off
+histories, and the HabitSummary of the summary index
 
 """
 
+import bisect
+from array import array
 from datetime import date
 from typing import List
 
+from htracker import HABIT_LAYOUT
+
+# offsets of the set bits of every byte value
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1)
+                   for byte in range(256))
+
+# int.bit_count is new in python 3.10
+_popcount = getattr(int, "bit_count", lambda bits: bin(bits).count("1"))
+
 
 class Habit:
     def __init__(
@@ -39,6 +52,8 @@ class Habit:
         :param struggle: no. of breaks from beginning of habit
         :type struggle: int
         """
+        # counts the changes of the habit, see __setattr__
+        object.__setattr__(self, "revision", 0)
         self.name = name
         self.starting_date = starting_date
         self.periodicity = periodicity
@@ -46,3 +61,547 @@ class Habit:
         self.streak = streak
         self.on_track = on_track
         self.struggle = struggle
+
+    def __setattr__(self, name, value) -> None:
+        """Sets an attribute and counts the change in revision
+
+        a copy of the habit made at a given revision, e.g. its json
+        encoding, is up-to-date while the revision stays the same.
+        Check-offs changed in place have to go through insert_check_off.
+
+        """
+        object.__setattr__(self, name, value)
+        if name != "revision":
+            self.revision += 1
+
+    @property
+    def check_off_ordinals(self) -> List[int]:
+        """The check-off dates as day ordinals
+
+        :return: list of int
+
+        """
+        return [event.toordinal() for event in self.check_offs]
+
+    @property
+    def check_off_count(self) -> int:
+        """Number of check-offs
+
+        :return: int
+
+        """
+        return len(self.check_offs)
+
+    def has_check_off(self, check_off_date: date) -> bool:
+        """Checks if the date is already checked-off
+
+        :param check_off_date: date to look for
+        :type check_off_date: date
+
+        :return: bool
+
+        """
+        return check_off_date in self.check_offs
+
+    def insert_check_off(self, check_off_date: date) -> None:
+        """Adds a check-off date keeping the check-offs sorted
+
+        a date after the last one is appended, a backdated one moves
+        the later dates by one, a memmove in C
+
+        :param check_off_date: date of check-off
+        :type check_off_date: date
+
+        """
+        bisect.insort(self.check_offs, check_off_date)
+        self.revision += 1
+
+
+class CompactHabit:
+    """ Habit with a small memory footprint.
+
+    Same attributes and methods as Habit, but without an instance
+    dictionary, and the check-offs are kept in an array of day ordinals
+    (4 bytes per check-off). The check_offs date list is only created
+    when it is asked for, e.g. by the display.
+
+    """
+
+    __slots__ = (
+        "name",
+        "starting_date",
+        "periodicity",
+        "check_off_ordinals",
+        "streak",
+        "on_track",
+        "struggle",
+        "revision",
+        "__weakref__"
+    )
+
+    def __init__(
+            self,
+            name="name",
+            starting_date=None,
+            periodicity=1,
+            check_offs=None,
+            streak=0,
+            on_track=1.0,
+            struggle=0
+    ):
+        """Storing a habit data
+
+        :param name: habit's name
+        :type name: str
+        :param starting_date: date the habit was entered into database
+        :type starting_date: date
+        :param periodicity: the reoccurring period in days
+        :type periodicity: int
+        :param check_offs: a list of dates for check-off events
+        :type check_offs: list of dates
+        :param streak: longest calculated streak
+        :type streak: int
+        :param struggle: no. of breaks from beginning of habit
+        :type struggle: int
+        """
+        # counts the changes of the habit, see __setattr__
+        object.__setattr__(self, "revision", 0)
+        self.name = name
+        self.starting_date = starting_date or date.today()
+        self.periodicity = periodicity
+        self.check_offs = check_offs if check_offs else []
+        self.streak = streak
+        self.on_track = on_track
+        self.struggle = struggle
+
+    def __setattr__(self, name, value) -> None:
+        """Sets an attribute and counts the change in revision
+
+        a copy of the habit made at a given revision, e.g. its json
+        encoding, is up-to-date while the revision stays the same.
+        Check-offs changed in place have to go through insert_check_off.
+
+        """
+        object.__setattr__(self, name, value)
+        if name != "revision":
+            # copy sets the slots of a new habit one by one, the
+            # revision can be still missing
+            self.revision = getattr(self, "revision", 0) + 1
+
+    @property
+    def check_offs(self) -> List[date]:
+        """A new list of the check-off dates
+
+        changing the list does not change the habit, use
+        insert_check_off
+
+        :return: list of dates
+
+        """
+        return [date.fromordinal(ordinal)
+                for ordinal in self.check_off_ordinals]
+
+    @check_offs.setter
+    def check_offs(self, check_offs: List[date]) -> None:
+        self.check_off_ordinals = array(
+            "i", [event.toordinal() for event in check_offs]
+        )
+
+    @property
+    def check_off_count(self) -> int:
+        """Number of check-offs
+
+        :return: int
+
+        """
+        return len(self.check_off_ordinals)
+
+    def has_check_off(self, check_off_date: date) -> bool:
+        """Checks if the date is already checked-off
+
+        :param check_off_date: date to look for
+        :type check_off_date: date
+
+        :return: bool
+
+        """
+        ordinal = check_off_date.toordinal()
+        idx = bisect.bisect_left(self.check_off_ordinals, ordinal)
+        return idx < len(self.check_off_ordinals) and \
+            self.check_off_ordinals[idx] == ordinal
+
+    def insert_check_off(self, check_off_date: date) -> None:
+        """Adds a check-off date keeping the check-offs sorted
+
+        a date after the last one is appended, a backdated one moves
+        the later ordinals by one, a memmove in C
+
+        :param check_off_date: date of check-off
+        :type check_off_date: date
+
+        """
+        bisect.insort(self.check_off_ordinals, check_off_date.toordinal())
+        self.revision += 1
+
+
+class BitmapHabit:
+    """ Habit with the check-offs in a bitset of days.
+
+    Same attributes and methods as Habit, the check-offs are the set
+    bits of a Python int, bit i is the day check_off_base + i, where
+    the base is the starting date or the first check-off before it. A
+    day needs one bit, a check-off test is one bit test, the number of
+    check-offs in a window is a popcount and the streaks are found by
+    shifting the whole bitset instead of walking the check-offs. A day
+    can be checked-off only once, duplicates are dropped.
+
+    """
+
+    __slots__ = (
+        "name",
+        "starting_date",
+        "periodicity",
+        "check_off_bits",
+        "check_off_base",
+        "streak",
+        "on_track",
+        "struggle",
+        "revision",
+        "__weakref__"
+    )
+
+    def __init__(
+            self,
+            name="name",
+            starting_date=None,
+            periodicity=1,
+            check_offs=None,
+            streak=0,
+            on_track=1.0,
+            struggle=0
+    ):
+        """Storing a habit data
+
+        :param name: habit's name
+        :type name: str
+        :param starting_date: date the habit was entered into database
+        :type starting_date: date
+        :param periodicity: the reoccurring period in days
+        :type periodicity: int
+        :param check_offs: a list of dates for check-off events
+        :type check_offs: list of dates
+        :param streak: longest calculated streak
+        :type streak: int
+        :param struggle: no. of breaks from beginning of habit
+        :type struggle: int
+        """
+        # counts the changes of the habit, see __setattr__
+        object.__setattr__(self, "revision", 0)
+        self.name = name
+        self.starting_date = starting_date or date.today()
+        self.periodicity = periodicity
+        self.check_offs = check_offs if check_offs else []
+        self.streak = streak
+        self.on_track = on_track
+        self.struggle = struggle
+
+    def __setattr__(self, name, value) -> None:
+        """Sets an attribute and counts the change in revision
+
+        a copy of the habit made at a given revision, e.g. its json
+        encoding, is up-to-date while the revision stays the same.
+        Check-offs changed in place have to go through insert_check_off.
+
+        """
+        object.__setattr__(self, name, value)
+        if name != "revision":
+            # copy sets the slots of a new habit one by one, the
+            # revision can be still missing
+            self.revision = getattr(self, "revision", 0) + 1
+
+    @property
+    def check_offs(self) -> List[date]:
+        """A new list of the check-off dates
+
+        changing the list does not change the habit, use
+        insert_check_off
+
+        :return: list of dates
+
+        """
+        return [date.fromordinal(ordinal)
+                for ordinal in self.check_off_ordinals]
+
+    @check_offs.setter
+    def check_offs(self, check_offs: List[date]) -> None:
+        self.check_off_ordinals = [event.toordinal()
+                                   for event in check_offs]
+
+    @property
+    def check_off_ordinals(self) -> List[int]:
+        """The check-off dates as sorted day ordinals
+
+        :return: list of int
+
+        """
+        bits = self.check_off_bits
+        base = self.check_off_base
+        ordinals = []
+        # the set bits byte by byte, empty bytes are skipped
+        for idx, byte in enumerate(
+                bits.to_bytes((bits.bit_length() + 7) // 8, "little")):
+            if byte:
+                day = base + idx * 8
+                ordinals.extend(day + bit for bit in _BYTE_BITS[byte])
+        return ordinals
+
+    @check_off_ordinals.setter
+    def check_off_ordinals(self, ordinals) -> None:
+        ordinals = list(ordinals)
+        base = self.starting_date.toordinal()
+        if ordinals:
+            base = min(base, min(ordinals))
+        days = bytearray((max(ordinals, default=base) - base) // 8 + 1)
+        for ordinal in ordinals:
+            offset = ordinal - base
+            days[offset >> 3] |= 1 << (offset & 7)
+        self.check_off_base = base
+        self.check_off_bits = int.from_bytes(days, "little")
+
+    @property
+    def check_off_count(self) -> int:
+        """Number of check-offs
+
+        :return: int
+
+        """
+        return _popcount(self.check_off_bits)
+
+    @property
+    def last_check_off(self) -> int:
+        """Day ordinal of the last check-off, None without check-offs
+
+        :return: int
+
+        """
+        if not self.check_off_bits:
+            return None
+        return self.check_off_base + self.check_off_bits.bit_length() - 1
+
+    def has_check_off(self, check_off_date: date) -> bool:
+        """Checks if the date is already checked-off
+
+        :param check_off_date: date to look for
+        :type check_off_date: date
+
+        :return: bool
+
+        """
+        offset = check_off_date.toordinal() - self.check_off_base
+        return offset >= 0 and bool(self.check_off_bits >> offset & 1)
+
+    def insert_check_off(self, check_off_date: date) -> None:
+        """Sets the bit of a check-off date
+
+        :param check_off_date: date of check-off
+        :type check_off_date: date
+
+        """
+        offset = check_off_date.toordinal() - self.check_off_base
+        if offset < 0:
+            # an earlier day becomes the base
+            self.check_off_bits <<= -offset
+            self.check_off_base += offset
+            offset = 0
+        self.check_off_bits |= 1 << offset
+
+    def count_check_offs(self, since: int, until: int = None) -> int:
+        """Number of check-offs in a window, by a popcount
+
+        :param since: first day ordinal of the window
+        :type since: int
+        :param until: last day ordinal of the window, default no end
+        :type until: int
+
+        :return: int
+
+        """
+        bits = self.check_off_bits
+        if until is not None:
+            if until < self.check_off_base:
+                return 0
+            bits &= (1 << (until - self.check_off_base + 1)) - 1
+        return _popcount(bits >> max(since - self.check_off_base, 0))
+
+    def streaks(self) -> (int, int):
+        """The longest and the current streak
+
+        a check-off followed by the next one exactly one period later
+        is a hit, a streak is a chain of hits one period apart. The
+        chains of 2, 4, 8... hits are found by shifting and masking the
+        hits, and the longest and the last chain are put together from
+        them like a binary number, with O(log streak) operations on the
+        bitset.
+
+        :return: (int, int)
+
+        """
+        levels = self._hit_levels()
+        if not levels:
+            return 0, 0
+        period = int(self.periodicity)
+        # the longest: extend the starts of the longest chains found
+        # so far with shorter and shorter chains
+        longest = 1 << (len(levels) - 1)
+        starts = levels[-1]
+        for level in range(len(levels) - 2, -1, -1):
+            longer = starts & (levels[level] >> (period * longest))
+            if longer:
+                starts = longer
+                longest += 1 << level
+        # the current: chains ending at the last check-off
+        end = self.check_off_bits.bit_length() - 1
+        current = 0
+        for level in range(len(levels) - 1, -1, -1):
+            start = end - period * (1 << level)
+            if start >= 0 and levels[level] >> start & 1:
+                end = start
+                current += 1 << level
+        return longest, current
+
+    def count_breaks(self, since: int) -> int:
+        """Breaks from since onwards: check-offs in the window, except
+        the last one, which are not hits
+
+        :param since: day ordinal of the window start
+        :type since: int
+
+        :return: int
+
+        """
+        check_offs = self.count_check_offs(since)
+        if not check_offs:
+            return 0
+        hits = self._hits() >> max(since - self.check_off_base, 0)
+        return check_offs - 1 - _popcount(hits)
+
+    def _hits(self) -> int:
+        """Check-offs followed by the next one exactly one period later
+
+        :return: int bitset of the hits
+
+        """
+        bits = self.check_off_bits
+        period = int(self.periodicity)
+        if period < 1:
+            return 0
+        # no check-off in the days between the two
+        between = _shift_or(bits >> 1, period - 1)
+        return bits & (bits >> period) & ~between
+
+    def _hit_levels(self) -> List[int]:
+        """Starts of the chains of 1, 2, 4, 8... hits
+
+        :return: list of int bitsets, empty without hits
+
+        """
+        period = int(self.periodicity)
+        levels = []
+        chains = self._hits()
+        while chains:
+            levels.append(chains)
+            chains &= chains >> (period << (len(levels) - 1))
+        return levels
+
+
+class HabitSummary:
+    """ Per-habit values of the summary index.
+
+    The values the habit lists show, with the number of check-offs
+    instead of the check-offs themselves, so a list can be printed
+    without decoding any check-off date.
+
+    """
+
+    __slots__ = (
+        "name",
+        "starting_date",
+        "periodicity",
+        "check_off_count",
+        "streak",
+        "on_track",
+        "struggle"
+    )
+
+    def __init__(self, name, starting_date, periodicity, check_off_count,
+                 streak, on_track, struggle):
+        """Storing the summary of a habit
+
+        :param name: habit's name
+        :type name: str
+        :param starting_date: date the habit was entered into database
+        :type starting_date: date
+        :param periodicity: the reoccurring period in days
+        :type periodicity: int
+        :param check_off_count: number of check-offs
+        :type check_off_count: int
+        :param streak: longest calculated streak
+        :type streak: int
+        :param on_track: on-track value in range of 0.0 - 1.0
+        :type on_track: float
+        :param struggle: no. of breaks from beginning of habit
+        :type struggle: int
+        """
+        self.name = name
+        self.starting_date = starting_date
+        self.periodicity = periodicity
+        self.check_off_count = check_off_count
+        self.streak = streak
+        self.on_track = on_track
+        self.struggle = struggle
+
+
+def _shift_or(bits: int, count: int) -> int:
+    """Bitwise or of bits >> 0, bits >> 1 ... bits >> (count - 1)
+
+    the shifts are doubled like in a binary number, so only
+    O(log count) shifts are needed
+
+    :param bits: bitset
+    :type bits: int
+    :param count: number of shifts
+    :type count: int
+
+    :return: int
+
+    """
+    result = 0
+    shift = 0
+    # or of the shifts 0 .. width - 1
+    window = bits
+    width = 1
+    while count:
+        if count & 1:
+            result |= window >> shift
+            shift += width
+        window |= window >> width
+        width <<= 1
+        count >>= 1
+    return result
+
+
+# the habit classes which can be picked with HTRACKER_HABIT_LAYOUT
+HABIT_CLASSES = {
+    "list": Habit,
+    "compact": CompactHabit,
+    "bitmap": BitmapHabit
+}
+
+
+def new_habit(*args, **kwargs) -> Habit:
+    """Creates a habit with the class of the configured layout
+
+    :return: Habit, CompactHabit or BitmapHabit
+
+    """
+    return HABIT_CLASSES.get(HABIT_LAYOUT, Habit)(*args, **kwargs)
@@ -6,16 +6,44 @@
 
 """
 HDataManager class to handle database functionalities:
-load, save and convert from and to json format
+load, save and convert from and to json format. Database paths with
+a SQLite file extension are handed over to HSQLiteManager, binary
+database paths to HBinaryManager. In
+journaled mode the json database changes go to HJournal first. Single
+habits are read and written through the HJsonIndex byte offsets. Every
+write keeps the HSummaryIndex of the database up-to-date.
 
 """
 import json
 import os
-from datetime import datetime
+import threading
+import weakref
+from array import array
+from datetime import date, datetime
+from typing import Iterable, Iterator
 
-from htracker import FILE_PATH
+from htracker import JOURNAL_MODE
 from htracker import HErrorCode
-from htracker.h_data import Habit
+from htracker.h_binary_manager import HBinaryManager
+from htracker.h_data import BitmapHabit, CompactHabit, Habit, \
+    HabitSummary, new_habit
+from htracker.h_journal import HJournal
+from htracker.h_json_index import HJsonIndex
+from htracker.h_lock import HStoreLock
+from htracker.h_sqlite_manager import HSQLiteManager
+from htracker.h_summary_index import HSummaryIndex
+
+# only one json database write at a time, compaction runs in a thread
+_SNAPSHOT_LOCK = threading.Lock()
+
+# decoded check-off dates, the same dates repeat in every habit
+_DATE_CACHE: dict[str, date] = {}
+_ORDINAL_CACHE: dict[str, int] = {}
+_DATE_CACHE_SIZE = 100000
+
+# json encoding of the loaded and saved habits with the revision it was
+# made at, entries go away with the habits
+_FRAGMENT_CACHE = weakref.WeakKeyDictionary()
 
 
 class HDataManager:
@@ -27,24 +55,29 @@ class HDataManager:
     """
 
     @staticmethod
-    def delete_database() -> HErrorCode:
+    def delete_database(path: str) -> HErrorCode:
         """Deleting the database
 
         Database can be corrupted returns True if file was deleted
 
+        :param path: database path
+        :type path: str
+
         :return: HErrorCode
 
         """
         # file can be read-only
         try:
-            print(FILE_PATH)
-            os.remove(FILE_PATH)
+            os.remove(path)
+            HJournal.remove(path)
+            HJsonIndex.remove(path)
+            HSummaryIndex.remove(path)
             return HErrorCode.SUCCESS
         except OSError:
             return HErrorCode.FILE_WRITE
 
     @staticmethod
-    def load_database(path: str = FILE_PATH) \
+    def load_database(path: str) \
             -> (HErrorCode, dict[Habit]):
         """Loads habits database from disk
 
@@ -61,56 +94,724 @@ class HDataManager:
                             and habit class objects pairs
 
        """
+        if HSQLiteManager.is_sqlite_path(path):
+            return HSQLiteManager.load_database(path)
+        if HBinaryManager.is_binary_path(path):
+            return HBinaryManager.load_database(path)
+        error_code, new_habits = HDataManager._load_snapshot(path)
+        if error_code == HErrorCode.JSON_ERROR or \
+                not HJournal.exists(path):
+            return error_code, new_habits
+        # the changes since the last compaction are in the journal
+        for journal_path in (HJournal.compacting_path(path),
+                             HJournal.journal_path(path)):
+            journal_error, records = HJournal.read_records(journal_path)
+            if journal_error != HErrorCode.SUCCESS:
+                return journal_error, new_habits
+            try:
+                HDataManager._replay_journal(new_habits, records)
+            except (KeyError, TypeError, ValueError):
+                return HErrorCode.JSON_ERROR, new_habits
+        return HErrorCode.SUCCESS, new_habits
+
+    @staticmethod
+    def load_habit(name: str, path: str) -> (HErrorCode, Habit):
+        """Loads one habit from disk without decoding the others
+
+        :param name: habit name
+        :type name: str
+        :param path: load database path
+        :type path: str
+
+        :return HErrorCode, Habit: the habit is None if there is no
+                                   habit with the name
+
+        """
+        if HSQLiteManager.is_sqlite_path(path):
+            return HSQLiteManager.load_habit(name, path)
+        if HBinaryManager.is_binary_path(path):
+            return HBinaryManager.load_habit(name, path)
+        habits = {}
+        try:
+            json_data = HJsonIndex.read_fragment(path, name)
+            if json_data is not None:
+                habits[name] = HDataManager.json_to_habit(json_data)
+            error_code = HErrorCode.SUCCESS
+        except FileNotFoundError:
+            error_code = HErrorCode.FILE_READ
+        except (KeyError, TypeError, ValueError):
+            return HErrorCode.JSON_ERROR, None
+        except OSError:
+            raise RuntimeError(
+                "Unable to handle error, program will terminate."
+            )
+        if HJournal.exists(path):
+            # only the records of this habit are replayed
+            for journal_path in (HJournal.compacting_path(path),
+                                 HJournal.journal_path(path)):
+                journal_error, records = \
+                    HJournal.read_records(journal_path)
+                if journal_error != HErrorCode.SUCCESS:
+                    return journal_error, None
+                try:
+                    HDataManager._replay_journal(habits, [
+                        record for record in records
+                        if record.get("name", name) == name and
+                        record.get("habit", {}).get("name", name) == name
+                    ])
+                except (AttributeError, KeyError, TypeError, ValueError):
+                    return HErrorCode.JSON_ERROR, None
+            error_code = HErrorCode.SUCCESS
+        return error_code, habits.get(name)
+
+    @staticmethod
+    def load_summaries(path: str) -> (HErrorCode, dict[HabitSummary]):
+        """Loads the summary values of the habits, without the
+        check-offs, from the summary index next to the database
+
+        a missing or stale index is rebuilt from the database
+
+        :param path: load database path
+        :type path: str
+
+        :return HErrorCode, dict[HabitSummary] :
+                            HErrorCode Enum, user-friendly
+                            error codes defined in __init__,
+                            dictionary {name(str):HabitSummary} in
+                            database order
+
+        """
+        stamp = HDataManager.database_stamp(path)
+        summaries = HSummaryIndex.load(path, stamp)
+        if summaries is not None:
+            return HErrorCode.SUCCESS, summaries
+        error_code, habits = HDataManager.load_database(path)
+        summaries = {name: HSummaryIndex.summarise(habit)
+                     for name, habit in habits.items()}
+        # the database could change while it was read
+        if error_code == HErrorCode.SUCCESS and \
+                stamp == HDataManager.database_stamp(path):
+            HSummaryIndex.write(path, summaries, stamp)
+        return error_code, summaries
+
+    @staticmethod
+    def _load_snapshot(path: str) -> (HErrorCode, dict[Habit]):
+        """Loads the json database without its journal
+
+        :param path: load database path
+        :type path: str
+
+        :return HErrorCode, dict[Habit]:
+
+        """
         # make an empty dict to give it back if no db exists
         new_habits = {}
         try:
-            with open(path, "r") as \
-                    read_file:
-                try:
-                    habits_json = json.load(read_file)
-                    for json_habit_key in habits_json:
-                        new_habits[json_habit_key] = \
-                            HDataManager._json_to_habit(
-                                habits_json[json_habit_key]
-                            )
-                except json.decoder.JSONDecodeError:
-                    return HErrorCode.JSON_ERROR, new_habits
-            return HErrorCode.SUCCESS, new_habits
+            with open(path, "rb") as read_file:
+                raw = read_file.read()
+                offsets = HJsonIndex.load_offsets(path, raw, store=False,
+                                                  read_file=read_file)
         except FileNotFoundError:
             return HErrorCode.FILE_READ, new_habits
+        # a database which is not a json object
+        except ValueError:
+            return HErrorCode.JSON_ERROR, new_habits
         except OSError:
             raise RuntimeError(
                 "Unable to handle error, program will terminate."
             )
+        try:
+            for json_habit_key, (start, end) in offsets.items():
+                fragment = raw[start:end]
+                habit = HDataManager.json_to_habit(json.loads(fragment))
+                new_habits[json_habit_key] = habit
+                # saved again without encoding while it is not changed
+                _FRAGMENT_CACHE[habit] = (habit.revision, fragment)
+        # a missing key or a bad date is a corrupted database
+        except (KeyError, TypeError, ValueError):
+            return HErrorCode.JSON_ERROR, new_habits
+        return HErrorCode.SUCCESS, new_habits
+
+    @staticmethod
+    def iter_habits(path: str) -> Iterator[Habit]:
+        """Reads the habits one by one, for databases too big to load
+
+        a json database is read habit by habit through its offset index,
+        only with a journal the whole database is loaded
+
+        :param path: load database path
+        :type path: str
+
+        :raise FileNotFoundError: no database
+        :raise ValueError: database is corrupted
+
+        :return: iterator of Habit
+
+        """
+        if HSQLiteManager.is_sqlite_path(path):
+            yield from HSQLiteManager.iter_habits(path)
+            return
+        if HBinaryManager.is_binary_path(path):
+            yield from HBinaryManager.iter_habits(path)
+            return
+        if HJournal.exists(path):
+            error_code, habits = HDataManager.load_database(path)
+            if error_code == HErrorCode.FILE_READ:
+                raise FileNotFoundError(path)
+            if error_code != HErrorCode.SUCCESS:
+                raise ValueError(error_code.value)
+            yield from habits.values()
+            return
+        with open(path, "rb") as read_file:
+            offsets = HJsonIndex.load_offsets(path, read_file=read_file)
+            for start, end in offsets.values():
+                read_file.seek(start)
+                try:
+                    yield HDataManager.json_to_habit(
+                        json.loads(read_file.read(end - start))
+                    )
+                except (KeyError, TypeError) as error:
+                    raise ValueError(str(error))
+
+    @staticmethod
+    def write_habits(habits: Iterable[Habit],
+                     path: str) -> HErrorCode:
+        """Replaces the database with habits coming one by one, e.g.
+        from a generator, without holding them in memory
+
+        :param habits: habits with unique names
+        :type habits: iterable of Habit
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        summaries = {}
+
+        def summarised_habits():
+            # the summaries are small, they are collected on the way
+            for habit in habits:
+                summaries[habit.name] = HSummaryIndex.summarise(habit)
+                yield habit
+
+        error_code = HDataManager._write_habits(summarised_habits(), path)
+        if error_code == HErrorCode.SUCCESS:
+            HSummaryIndex.write(path, summaries,
+                                HDataManager.database_stamp(path))
+        return error_code
+
+    @staticmethod
+    def _write_habits(habits: Iterable[Habit], path: str) -> HErrorCode:
+        """Replaces the database with habits coming one by one
+
+        :param habits: habits with unique names
+        :type habits: iterable of Habit
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        if HSQLiteManager.is_sqlite_path(path):
+            return HSQLiteManager.write_habits(habits, path)
+        if HBinaryManager.is_binary_path(path):
+            return HBinaryManager.write_habits(habits, path)
+        try:
+            with _SNAPSHOT_LOCK:
+                # the old database stays until the new one is complete
+                HJsonIndex.write_database(
+                    ((habit.name, HDataManager._habit_fragment(habit))
+                     for habit in habits),
+                    str(path) + ".tmp",
+                    HJsonIndex.index_path(str(path) + ".tmp")
+                )
+                os.replace(str(path) + ".tmp", path)
+                os.replace(HJsonIndex.index_path(str(path) + ".tmp"),
+                           HJsonIndex.index_path(path))
+                HJournal.remove(path)
+            return HErrorCode.SUCCESS
+        except OSError:
+            return HErrorCode.FILE_WRITE
 
     @staticmethod
-    def save_database(habits: dict[Habit]) -> HErrorCode:
+    def save_database(habits: dict[Habit],
+                      path: str) -> HErrorCode:
         """Saves a habit dictionary to the disk
 
         :param habits: storing name and habit pairs
         :type habits: dictionary of {name(str):Habit} pairs
+        :param path: save database path
+        :type path: str
 
         :return: HErrorCode
 
         """
+        error_code = HDataManager._save_database(habits, path)
+        if error_code == HErrorCode.SUCCESS:
+            HSummaryIndex.write(path, {
+                name: HSummaryIndex.summarise(habit)
+                for name, habit in habits.items()
+            }, HDataManager.database_stamp(path))
+        return error_code
+
+    @staticmethod
+    def _save_database(habits: dict[Habit], path: str) -> HErrorCode:
+        """Saves a habit dictionary with the storage engine of the path
+
+        :param habits: storing name and habit pairs
+        :type habits: dictionary of {name(str):Habit} pairs
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        if HSQLiteManager.is_sqlite_path(path):
+            return HSQLiteManager.save_database(habits, path)
+        if HBinaryManager.is_binary_path(path):
+            return HBinaryManager.save_database(habits, path)
         try:
-            json_data = {}
-            for habit_key in habits:
-                json_data[habit_key] = HDataManager. \
-                    _habit_to_json(habits[habit_key])
-            with open(FILE_PATH, "w") as write_file:
-                json.dump(json_data, indent=4, fp=write_file)
+            with _SNAPSHOT_LOCK:
+                HJsonIndex.write_database(
+                    ((habit_key, HDataManager._habit_fragment(
+                        habits[habit_key])) for habit_key in habits),
+                    path
+                )
+                # the habits were loaded with the journal replayed
+                HJournal.remove(path)
             return HErrorCode.SUCCESS
         except OSError:
             return HErrorCode.FILE_WRITE
 
     @staticmethod
-    def _habit_to_json(habit: Habit) -> dict:
-        """Convert Habit to json data
+    def insert_habit(habits: dict[Habit], habit: Habit,
+                     path: str) -> HErrorCode:
+        """Stores a habit which was just added to the habits
+
+        :param habits: storing name and habit pairs, including habit
+        :type habits: dictionary of {name(str):Habit} pairs
+        :param habit: the new habit
+        :type habit: Habit
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        old_stamp = HDataManager.database_stamp(path)
+        error_code = HDataManager._insert_habit(habits, habit, path)
+        if error_code == HErrorCode.SUCCESS:
+            HSummaryIndex.update(path, old_stamp,
+                                 HDataManager.database_stamp(path),
+                                 habit.name, habit)
+        return error_code
+
+    @staticmethod
+    def _insert_habit(habits: dict[Habit], habit: Habit,
+                      path: str) -> HErrorCode:
+        """Stores a new habit with the storage engine of the path
+
+        :param habits: storing name and habit pairs, including habit
+        :type habits: dictionary of {name(str):Habit} pairs
+        :param habit: the new habit
+        :type habit: Habit
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        if HSQLiteManager.is_sqlite_path(path):
+            return HSQLiteManager.insert_habit(habit, path)
+        if HBinaryManager.is_binary_path(path):
+            return HBinaryManager.insert_habit(habit, path)
+        if JOURNAL_MODE:
+            return HDataManager._append_journal(path, {
+                "op": "add",
+                "habit": HDataManager.habit_to_json(habit)
+            })
+        return HDataManager._save_fragment(habit.name, habit, path)
+
+    @staticmethod
+    def delete_habit(habits: dict[Habit], name: str,
+                     path: str) -> HErrorCode:
+        """Stores the removal of a habit already popped from the habits
+
+        :param habits: storing name and habit pairs, without the habit
+        :type habits: dictionary of {name(str):Habit} pairs
+        :param name: name of the removed habit
+        :type name: str
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        old_stamp = HDataManager.database_stamp(path)
+        error_code = HDataManager._delete_habit(habits, name, path)
+        if error_code == HErrorCode.SUCCESS:
+            HSummaryIndex.update(path, old_stamp,
+                                 HDataManager.database_stamp(path),
+                                 name, None)
+        return error_code
+
+    @staticmethod
+    def _delete_habit(habits: dict[Habit], name: str,
+                      path: str) -> HErrorCode:
+        """Stores the removal of a habit with the storage engine of the
+        path
+
+        :param habits: storing name and habit pairs, without the habit
+        :type habits: dictionary of {name(str):Habit} pairs
+        :param name: name of the removed habit
+        :type name: str
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        if HSQLiteManager.is_sqlite_path(path):
+            return HSQLiteManager.delete_habit(name, path)
+        if HBinaryManager.is_binary_path(path):
+            return HBinaryManager.delete_habit(name, path)
+        if JOURNAL_MODE:
+            return HDataManager._append_journal(path, {
+                "op": "remove",
+                "name": name
+            })
+        return HDataManager._save_fragment(name, None, path)
+
+    @staticmethod
+    def insert_check_off(habits: dict[Habit], name: str,
+                         check_off_date: date,
+                         path: str) -> HErrorCode:
+        """Stores a new check-off and the recalculated habit values
+
+        the entry of the habit in the summary index is updated as well
+
+        :param habits: storing name and habit pairs, already updated
+        :type habits: dictionary of {name(str):Habit} pairs
+        :param name: name of the checked-off habit
+        :type name: str
+        :param check_off_date: date of the new check-off
+        :type check_off_date: date
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        old_stamp = HDataManager.database_stamp(path)
+        error_code = HDataManager._insert_check_off(
+            habits, name, check_off_date, path
+        )
+        if error_code == HErrorCode.SUCCESS:
+            HSummaryIndex.update(path, old_stamp,
+                                 HDataManager.database_stamp(path),
+                                 name, habits[name])
+        return error_code
+
+    @staticmethod
+    def _insert_check_off(habits: dict[Habit], name: str,
+                          check_off_date: date,
+                          path: str) -> HErrorCode:
+        """Stores a new check-off with the storage engine of the path
+
+        In the json file only the habit is encoded again, SQLite only
+        inserts the new check-off row and in journaled mode one record
+        is appended to the journal.
+
+        :param habits: storing name and habit pairs, already updated
+        :type habits: dictionary of {name(str):Habit} pairs
+        :param name: name of the checked-off habit
+        :type name: str
+        :param check_off_date: date of the new check-off
+        :type check_off_date: date
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        if HSQLiteManager.is_sqlite_path(path):
+            return HSQLiteManager.insert_check_off(
+                habits[name], check_off_date, path
+            )
+        if HBinaryManager.is_binary_path(path):
+            return HBinaryManager.insert_check_off(
+                habits[name], check_off_date, path
+            )
+        if JOURNAL_MODE:
+            habit = habits[name]
+            return HDataManager._append_journal(path, {
+                "op": "check_off",
+                "name": name,
+                "date": str(check_off_date),
+                "streak": habit.streak,
+                "on_track": habit.on_track,
+                "struggle": habit.struggle
+            })
+        return HDataManager._save_fragment(name, habits[name], path)
+
+    @staticmethod
+    def apply_changes(habits: dict[Habit], changes: list[tuple],
+                      path: str) -> HErrorCode:
+        """Stores a list of changes already made on the habits
+
+        a json or binary database is written once for many changes,
+        when the habits hold the whole database, the other storages
+        store the changes one by one
+
+        :param habits: storing name and habit pairs, already updated
+        :type habits: dictionary of {name(str):Habit} pairs
+        :param changes: ("add", habit), ("remove", name) or
+                        ("check_off", name, date) tuples in order
+        :type changes: list[tuple]
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        if len(changes) > 1 and (
+                HBinaryManager.is_binary_path(path) or
+                not JOURNAL_MODE and
+                not HSQLiteManager.is_sqlite_path(path)):
+            return HDataManager.save_database(habits, path)
+        for change in changes:
+            if change[0] == "add":
+                error_code = HDataManager.insert_habit(
+                    habits, change[1], path
+                )
+            elif change[0] == "remove":
+                error_code = HDataManager.delete_habit(
+                    habits, change[1], path
+                )
+            else:
+                error_code = HDataManager.insert_check_off(
+                    habits, change[1], change[2], path
+                )
+            if error_code != HErrorCode.SUCCESS:
+                return error_code
+        return HErrorCode.SUCCESS
+
+    @staticmethod
+    def database_stamp(path: str) -> tuple:
+        """Modification time and size of the database files
+
+        it changes whenever the database is written, so it tells if a
+        loaded database is still up-to-date
+
+        :param path: database path
+        :type path: str
+
+        :return: tuple
+
+        """
+        stamp = []
+        for file_path in (path, HJournal.compacting_path(path),
+                          HJournal.journal_path(path)):
+            try:
+                stat = os.stat(file_path)
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    @staticmethod
+    def compact_journal(path: str) -> HErrorCode:
+        """Folds the journal back into the json database
+
+        The journal is moved aside first, so records appended during
+        the compaction stay in the new journal.
+
+        :param path: database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        # the writers of other processes must not write the database
+        # between the load of the snapshot and its replacement
+        lock = HStoreLock(path)
+        error_code = lock.acquire()
+        if error_code != HErrorCode.SUCCESS:
+            return error_code
+        try:
+            return HDataManager._compact_journal(path)
+        finally:
+            lock.release()
+
+    @staticmethod
+    def _compact_journal(path: str) -> HErrorCode:
+        """Folds the journal back into the json database, while the
+        database is locked
+
+        :param path: database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        with _SNAPSHOT_LOCK:
+            try:
+                HJournal.rotate(path)
+            except OSError:
+                return HErrorCode.FILE_WRITE
+            compacting_path = HJournal.compacting_path(path)
+            error_code, habits = HDataManager._load_snapshot(path)
+            if error_code == HErrorCode.JSON_ERROR:
+                return error_code
+            error_code, records = HJournal.read_records(compacting_path)
+            if error_code != HErrorCode.SUCCESS:
+                return error_code
+            try:
+                HDataManager._replay_journal(habits, records)
+            except (KeyError, TypeError, ValueError):
+                return HErrorCode.JSON_ERROR
+            try:
+                # a crash must not leave a half written database behind
+                # while the journal is already gone
+                HJsonIndex.write_database(
+                    ((habit_key, HDataManager._habit_fragment(
+                        habits[habit_key])) for habit_key in habits),
+                    str(path) + ".tmp",
+                    HJsonIndex.index_path(str(path) + ".tmp")
+                )
+                os.replace(str(path) + ".tmp", path)
+                os.replace(HJsonIndex.index_path(str(path) + ".tmp"),
+                           HJsonIndex.index_path(path))
+                os.remove(compacting_path)
+            except OSError:
+                return HErrorCode.FILE_WRITE
+            # same habits, but the stamp of the database files changed
+            HSummaryIndex.write(path, {
+                name: HSummaryIndex.summarise(habit)
+                for name, habit in habits.items()
+            }, HDataManager.database_stamp(path))
+        return HErrorCode.SUCCESS
+
+    @staticmethod
+    def _save_fragment(name: str, habit: Habit, path: str) -> HErrorCode:
+        """Writes one habit into the json database, the other habits are
+        copied without decoding them
+
+        :param name: habit name
+        :type name: str
+        :param habit: the habit, None to remove it
+        :type habit: Habit
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        if HJournal.exists(path):
+            # the journal is newer than the json database, fold it in
+            error_code, habits = HDataManager.load_database(path)
+            if error_code == HErrorCode.JSON_ERROR:
+                return error_code
+            if habit is None:
+                habits.pop(name, None)
+            else:
+                habits[name] = habit
+            return HDataManager.save_database(habits, path)
+        try:
+            with _SNAPSHOT_LOCK:
+                HJsonIndex.replace_fragment(
+                    path, name, None if habit is None
+                    else HDataManager._habit_fragment(habit)
+                )
+            return HErrorCode.SUCCESS
+        except OSError:
+            return HErrorCode.FILE_WRITE
+        except ValueError:
+            return HErrorCode.JSON_ERROR
+
+    @staticmethod
+    def _append_journal(path: str, record: dict) -> HErrorCode:
+        """Appends a change to the journal, starts a compaction in the
+        background once the journal is over its threshold
+
+        :param path: database path
+        :type path: str
+        :param record: change record
+        :type record: dict
+
+        :return: HErrorCode
+
+        """
+        error_code = HJournal.append(path, record)
+        if error_code == HErrorCode.SUCCESS and \
+                HJournal.needs_compaction(path) and \
+                not _SNAPSHOT_LOCK.locked():
+            # not a daemon thread: the program waits for it before exit
+            threading.Thread(
+                target=HDataManager.compact_journal,
+                args=(path,),
+                name="htracker-compaction"
+            ).start()
+        return error_code
+
+    @staticmethod
+    def _replay_journal(habits: dict[Habit], records: list[dict]) -> None:
+        """Applies journal records on the habits in order
+
+        applying a record twice gives the same habits, so an
+        interrupted compaction can be replayed again
+
+        :param habits: storing name and habit pairs
+        :type habits: dictionary of {name(str):Habit} pairs
+        :param records: journal records
+        :type records: list[dict]
+
+        """
+        for record in records:
+            if record["op"] == "add":
+                habit = HDataManager.json_to_habit(record["habit"])
+                habits[habit.name] = habit
+            elif record["op"] == "remove":
+                habits.pop(record["name"], None)
+            elif record["op"] == "check_off" and record["name"] in habits:
+                habit = habits[record["name"]]
+                check_off_date = HDataManager.parse_date(record["date"])
+                if not habit.has_check_off(check_off_date):
+                    habit.insert_check_off(check_off_date)
+                habit.streak = record["streak"]
+                habit.on_track = record["on_track"]
+                habit.struggle = record["struggle"]
+
+    @staticmethod
+    def migrate_database(source: str, target: str) -> HErrorCode:
+        """Copies every habit from one database into another
+
+        the storage engine of both sides is picked by the file
+        extension, e.g. json to SQLite migration
+
+        :param source: path of the database to read
+        :type source: str
+        :param target: path of the database to be written
+        :type target: str
+
+        :return: HErrorCode
+
+        """
+        error_code, habits = HDataManager.load_database(source)
+        if error_code != HErrorCode.SUCCESS:
+            return error_code
+        return HDataManager.save_database(habits, target)
+
+    @staticmethod
+    def habit_to_json(habit: Habit) -> dict:
+        """Convert Habit to json data, as it is stored in the json
+        database and written as a json or ndjson record
 
         :param habit: Habit
 
-        :return: dictionary of {name(str):Habit} pairs
+        :return: dictionary of the habit fields, the dates as
+                 YYYY-MM-DD strings
 
         """
         return {
@@ -124,22 +825,124 @@ class HDataManager:
         }
 
     @staticmethod
-    def _json_to_habit(json_data) -> Habit:
-        """Convert json data to Habit obj
+    def json_to_habit(json_data) -> Habit:
+        """Convert json data to Habit obj, the reverse of habit_to_json
+
+        the habit is created in the check-off layout of the application
 
         :param json_data: json data of one Habit
+        :type json_data: dict
+
+        :raise KeyError: a field of the habit is missing
+        :raise ValueError: not a valid date
 
         :return: Habit
 
         """
-        habit = Habit()
+        habit = new_habit()
         habit.name = json_data["name"]
-        habit.starting_date = datetime.strptime(
-            json_data["starting_date"], '%Y-%m-%d').date()
+        habit.starting_date = HDataManager.parse_date(
+            json_data["starting_date"])
         habit.periodicity = json_data["periodicity"]
-        habit.check_offs = [datetime.strptime(event, '%Y-%m-%d').date()
-                            for event in json_data["events"]]
+        events = json_data["events"]
+        if isinstance(habit, CompactHabit):
+            # straight to day ordinals, no date objects at all
+            try:
+                habit.check_off_ordinals = array(
+                    "i", map(_ORDINAL_CACHE.__getitem__, events))
+            except KeyError:
+                habit.check_off_ordinals = array(
+                    "i", map(HDataManager._parse_ordinal, events))
+        elif isinstance(habit, BitmapHabit):
+            try:
+                habit.check_off_ordinals = list(
+                    map(_ORDINAL_CACHE.__getitem__, events))
+            except KeyError:
+                habit.check_off_ordinals = list(
+                    map(HDataManager._parse_ordinal, events))
+        else:
+            try:
+                habit.check_offs = list(map(_DATE_CACHE.__getitem__, events))
+            except KeyError:
+                habit.check_offs = list(map(HDataManager.parse_date, events))
         habit.streak = json_data["streak"]
         habit.on_track = json_data["on_track"]
         habit.struggle = json_data["struggle"]
         return habit
+
+    @staticmethod
+    def parse_date(text: str) -> date:
+        """Convert a YYYY-MM-DD string to date
+
+        date.fromisoformat is much faster than strptime, the decoded
+        dates are cached as the same dates occur in many habits. Other
+        formats strptime accepts, like 2023-1-5, still go to strptime.
+
+        :param text: date in YYYY-MM-DD format
+        :type text: str
+
+        :raise ValueError: not a valid date
+
+        :return: date
+
+        """
+        try:
+            return _DATE_CACHE[text]
+        except KeyError:
+            pass
+        if len(text) == 10 and text[4] == "-" and text[7] == "-":
+            value = date.fromisoformat(text)
+        else:
+            value = datetime.strptime(text, '%Y-%m-%d').date()
+        if len(_DATE_CACHE) >= _DATE_CACHE_SIZE:
+            _DATE_CACHE.clear()
+        _DATE_CACHE[text] = value
+        return value
+
+    # the former private names of the codec, kept for existing callers
+    _habit_to_json = habit_to_json
+    _json_to_habit = json_to_habit
+    _parse_date = parse_date
+
+    @staticmethod
+    def _habit_fragment(habit: Habit) -> bytes:
+        """Encode a habit as it is indented in the json database
+
+        the encoding is cached until the habit changes, so saving a
+        database encodes only the changed habits
+
+        :param habit: Habit
+
+        :return: bytes
+
+        """
+        cached = _FRAGMENT_CACHE.get(habit)
+        if cached is not None and cached[0] == habit.revision:
+            return cached[1]
+        fragment = json.dumps(
+            HDataManager.habit_to_json(habit), indent=4
+        ).replace("\n", "\n    ").encode()
+        _FRAGMENT_CACHE[habit] = (habit.revision, fragment)
+        return fragment
+
+    @staticmethod
+    def _parse_ordinal(text: str) -> int:
+        """Convert a YYYY-MM-DD string to day ordinal
+
+        :param text: date in YYYY-MM-DD format
+        :type text: str
+
+        :raise ValueError: not a valid date
+
+        :return: int
+
+        """
+        try:
+            return _ORDINAL_CACHE[text]
+        except KeyError:
+            pass
+        value = HDataManager.parse_date(text).toordinal()
+        if len(_ORDINAL_CACHE) >= _DATE_CACHE_SIZE:
+            _ORDINAL_CACHE.clear()
+        _ORDINAL_CACHE[text] = value
+        return value
@@ -8,39 +8,67 @@
 HDisplay class to handle print out data to console
 
 """
+import sys
+from itertools import islice
+from typing import Iterable, Iterator
 
 import click
 
 from htracker import HDisplayCategory
 from htracker.h_data import Habit
+from htracker.h_records import HRecords
+
+# the cells of a habit row and of a check-off row, the format strings
+# are parsed once, not per row
+_HABIT_ROW = "{:^50}|{:^18}|{:^14}|{:^13}|{:^12}|{:^11}|{:^13}|".format
+_CHECK_OFF_ROW = "{:^18}|".format
+_HABIT_HEADER = _HABIT_ROW("Habit name:", "Starting date:", "Periodicity:",
+                           "Check-offs:", "Streaks:", "Breaks:",
+                           "On-track:")
+_CHECK_OFF_HEADER = _CHECK_OFF_ROW("Check-offs:")
+
+# rows rendered into one string and written to the console at once
+_CHUNK_ROWS = 2048
 
 
 class HDisplay:
 
     @staticmethod
     def display_habits(category: HDisplayCategory,
-                       habits: list[Habit]
+                       habits: Iterable[Habit],
+                       output_format: str = "table"
                        ) -> None:
         """Prints report to the console
 
+        the habits are printed as they come, e.g. from a generator, in
+        chunks of rows written at once
+
         :param category: category enum class
         :type category: HDisplayCategory
-        :param habits: ordered list of habit
-        :type habits: list[Habits]
+        :param habits: ordered habits
+        :type habits: iterable of Habit
+        :param output_format: "table", or records for other programs in
+                              "json", "ndjson" or "csv"
+        :type output_format: str
 
         """
-        if len(habits) == 0:
+        if output_format != "table":
+            HRecords.write_summaries(habits, sys.stdout, output_format)
+            return
+        rows = map(HDisplay._habit_row, habits)
+        first_row = next(rows, None)
+        if first_row is None:
             click.secho("No habits matching the criteria.", fg="yellow",
                         bold="true")
             return
         # print habit header first to display category, then data rows
         HDisplay.print_header(category)
-        for habit in habits:
-            HDisplay.print_habit_row(habit)
+        HDisplay._echo_rows(rows, first_row)
 
     @staticmethod
     def print_check_offs(category: HDisplayCategory,
-                         habit: Habit) -> None:
+                         habit: Habit,
+                         output_format: str = "table") -> None:
         """Prints check-offs to the console of one Habit
 
         check-offs are a list in the habit list and do not fit into the
@@ -50,25 +78,20 @@ class HDisplay:
         :type category: HDisplayCategory
         :param habit: contains the check-off list
         :type habit: Habit
+        :param output_format: "table", or records for other programs in
+                              "json", "ndjson" or "csv"
+        :type output_format: str
 
         """
+        if output_format != "table":
+            HRecords.write_check_offs(habit, sys.stdout, output_format)
+            return
         # show the user the check-offs are from which habit
-        cell_check_offs = "{:^18}"
-        click.secho(category.value + " " + habit.name, fg="yellow",
-                    bold="true")
-        click.secho(
-            cell_check_offs.format("Check-offs:") + "|",
-            fg="white",
-            bold="true"
-        )
-        click.secho(19 * "=", fg="blue", bold="true")
+        HDisplay._echo_header(category.value + " " + habit.name,
+                              _CHECK_OFF_HEADER)
         # we like to print the check-offs in a column
-        for check_off_date in habit.check_offs:
-            cell_date = "{:^18}"
-            click.secho(
-                cell_date.format(str(check_off_date)) + "|",
-                fg="white"
-            )
+        HDisplay._echo_rows(_CHECK_OFF_ROW(check_off_date.isoformat())
+                            for check_off_date in habit.check_offs)
 
     @staticmethod
     def print_streak(streak: int) -> None:
@@ -101,26 +124,7 @@ class HDisplay:
         :type category: HDisplayCategory
 
         """
-        cell_name = "{:^50}"
-        cell_date = "{:^18}"
-        cell_periodicity = "{:^14}"
-        cell_check_offs = "{:^13}"
-        cell_streaks = "{:^12}"
-        cell_struggle = "{:^11}"
-        cell_on_track = "{:^13}"
-        click.secho(category.value, fg="yellow", bold="true")
-        click.secho(
-            cell_name.format("Habit name:") + "|"
-            + cell_date.format("Starting date:") + "|"
-            + cell_periodicity.format("Periodicity:") + "|"
-            + cell_check_offs.format("Check-offs:") + "|"
-            + cell_streaks.format("Streaks:") + "|"
-            + cell_struggle.format("Breaks:") + "|"
-            + cell_on_track.format("On-track:") + "|",
-            fg="white",
-            bold="true"
-        )
-        click.secho(138 * "=", fg="blue", bold="true")
+        HDisplay._echo_header(category.value, _HABIT_HEADER)
 
     @staticmethod
     def print_habit_row(
@@ -132,21 +136,73 @@ class HDisplay:
         :type habit: Habit
 
         """
-        cell_name = "{:^50}"
-        cell_date = "{:^18}"
-        cell_periodicity = "{:^14}"
-        cell_check_offs = "{:^13}"
-        cell_streaks = "{:^12}"
-        cell_struggle = "{:^11}"
-        cell_on_track = "{:^13}"
-        click.secho(
-            cell_name.format(habit.name) + "|"
-            + cell_date.format(str(habit.starting_date)) + "|"
-            + cell_periodicity.format(str(habit.periodicity)) + "|"
-            + cell_check_offs.format(len(habit.check_offs)) + "|"
-            + cell_streaks.format(str(habit.streak)) + "|"
-            + cell_struggle.format(str(habit.struggle)) + "|"
-            + cell_on_track.format(str(int(habit.on_track * 100))
-                                   + "%") + "|",
-            fg="white"
-        )
+        click.secho(HDisplay._habit_row(habit), fg="white")
+
+    @staticmethod
+    def _habit_row(habit: Habit) -> str:
+        """Renders a habit data in a row aligned like to the header
+
+        :param habit: one habit
+        :type habit: Habit
+
+        :return: str
+
+        """
+        return _HABIT_ROW(habit.name, habit.starting_date.isoformat(),
+                          str(habit.periodicity), habit.check_off_count,
+                          str(habit.streak), str(habit.struggle),
+                          str(int(habit.on_track * 100)) + "%")
+
+    @staticmethod
+    def _echo_header(title: str, header: str) -> None:
+        """Prints the title and the column names of a table at once
+
+        :param title: title of the table
+        :type title: str
+        :param header: column names
+        :type header: str
+
+        """
+        colour = HDisplay._colour()
+        click.echo("\n".join((
+            click.style(title, fg="yellow", bold=True),
+            click.style(header, fg="white", bold=True),
+            click.style(len(header) * "=", fg="blue", bold=True)
+        )) if colour else "\n".join((title, header, len(header) * "=")),
+            color=colour)
+
+    @staticmethod
+    def _echo_rows(rows: Iterator[str], first_row: str = None) -> None:
+        """Prints rows in chunks, one write and one colour code per
+        chunk
+
+        :param rows: rendered rows
+        :type rows: iterator of str
+        :param first_row: a row taken from the rows already
+        :type first_row: str
+
+        """
+        colour = HDisplay._colour()
+        rows = iter(rows)
+        chunk = [] if first_row is None else [first_row]
+        while True:
+            chunk.extend(islice(rows, _CHUNK_ROWS - len(chunk)))
+            if not chunk:
+                return
+            text = "\n".join(chunk)
+            click.echo(click.style(text, fg="white") if colour else text,
+                       color=colour)
+            chunk = []
+
+    @staticmethod
+    def _colour() -> bool:
+        """Tells if the output is coloured: on a terminal only, unless
+        the colour is switched on or off for the click command
+
+        :return: bool
+
+        """
+        context = click.get_current_context(silent=True)
+        if context is not None and context.color is not None:
+            return context.color
+        return sys.stdout.isatty()
@@ -0,0 +1,160 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+HJournal class to handle the append-only change log stored next to the
+json database
+
+"""
+import json
+import os
+
+from htracker import HErrorCode, JOURNAL_MAX_BYTES, JOURNAL_MAX_ENTRIES
+
+
+class HJournal:
+    """ Append-only journal of habit changes.
+
+    Every line is one json record: a habit added, a habit removed or a
+    new check-off. The records are folded back into the json database
+    by HDataManager.compact_journal, before that they are moved aside to
+    a compacting file, so new records never get lost during compaction.
+
+    """
+
+    @staticmethod
+    def journal_path(path) -> str:
+        """Path of the journal that belongs to a database
+
+        :param path: database path
+        :type path: str
+
+        :return: str
+
+        """
+        return str(path) + ".journal"
+
+    @staticmethod
+    def compacting_path(path) -> str:
+        """Path of the journal which is being compacted
+
+        :param path: database path
+        :type path: str
+
+        :return: str
+
+        """
+        return str(path) + ".journal.compacting"
+
+    @staticmethod
+    def exists(path) -> bool:
+        """Checks if there is any journal record for the database
+
+        :param path: database path
+        :type path: str
+
+        :return: bool
+
+        """
+        return os.path.exists(HJournal.journal_path(path)) or \
+            os.path.exists(HJournal.compacting_path(path))
+
+    @staticmethod
+    def append(path, record: dict) -> HErrorCode:
+        """Appends one record to the end of the journal
+
+        :param path: database path
+        :type path: str
+        :param record: json serializable change record
+        :type record: dict
+
+        :return: HErrorCode
+
+        """
+        try:
+            with open(HJournal.journal_path(path), "a") as journal_file:
+                journal_file.write(json.dumps(record) + "\n")
+            return HErrorCode.SUCCESS
+        except OSError:
+            return HErrorCode.FILE_WRITE
+
+    @staticmethod
+    def read_records(journal_path: str) -> (HErrorCode, list[dict]):
+        """Reads all records of one journal file
+
+        a last line without line end was not written completely, so it
+        is not part of the journal
+
+        :param journal_path: path of a journal file
+        :type journal_path: str
+
+        :return: HErrorCode, list[dict]
+
+        """
+        records = []
+        try:
+            with open(journal_path, "r") as journal_file:
+                for line in journal_file:
+                    if not line.endswith("\n"):
+                        break
+                    records.append(json.loads(line))
+        except FileNotFoundError:
+            pass
+        except json.decoder.JSONDecodeError:
+            return HErrorCode.JSON_ERROR, records
+        return HErrorCode.SUCCESS, records
+
+    @staticmethod
+    def needs_compaction(path) -> bool:
+        """Checks if the journal passed its size or entry threshold
+
+        :param path: database path
+        :type path: str
+
+        :return: bool
+
+        """
+        journal_path = HJournal.journal_path(path)
+        try:
+            if os.path.getsize(journal_path) >= JOURNAL_MAX_BYTES:
+                return True
+            # the file is smaller than the byte threshold, cheap to scan
+            with open(journal_path, "rb") as journal_file:
+                return journal_file.read().count(b"\n") >= \
+                    JOURNAL_MAX_ENTRIES
+        except OSError:
+            return False
+
+    @staticmethod
+    def rotate(path) -> None:
+        """Moves the journal aside to be compacted
+
+        if an earlier compaction was interrupted its file is compacted
+        first, the journal stays in place until the next compaction
+
+        :param path: database path
+        :type path: str
+
+        """
+        if not os.path.exists(HJournal.compacting_path(path)) and \
+                os.path.exists(HJournal.journal_path(path)):
+            os.replace(HJournal.journal_path(path),
+                       HJournal.compacting_path(path))
+
+    @staticmethod
+    def remove(path) -> None:
+        """Deletes the journal files of a database
+
+        :param path: database path
+        :type path: str
+
+        """
+        for journal_path in (HJournal.compacting_path(path),
+                             HJournal.journal_path(path)):
+            try:
+                os.remove(journal_path)
+            except FileNotFoundError:
+                pass
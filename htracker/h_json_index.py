@@ -0,0 +1,264 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+HJsonIndex class to write the json database habit by habit and to keep
+the byte offsets of every habit in a sidecar index file
+
+"""
+import json
+import os
+
+# same layout as json.dump(indent=4) of the habits dictionary
+_INDENT = b"    "
+
+
+class HJsonIndex:
+    """ Byte offset index of the json database.
+
+    The index file next to the database stores where the json value of
+    each habit starts and ends, together with the modification time and
+    size of the database it belongs to. One habit can be read by seeking
+    to its offsets, and one habit can be replaced by copying the bytes
+    of the other habits, without decoding them. When the database was
+    changed by someone else the index is rebuilt by scanning the file.
+
+    """
+
+    @staticmethod
+    def index_path(path) -> str:
+        """Path of the index that belongs to a database
+
+        :param path: database path
+        :type path: str
+
+        :return: str
+
+        """
+        return str(path) + ".idx"
+
+    @staticmethod
+    def write_database(fragments, path, index_path=None) -> None:
+        """Writes the json database from encoded habits and its index
+
+        the output is the same as json.dump(habits, indent=4)
+
+        :param fragments: (name, json value of the habit indented one
+                          level as bytes) pairs in database order
+        :type fragments: iterable of (str, bytes)
+        :param path: database path
+        :type path: str
+        :param index_path: index path, default next to the database
+        :type index_path: str
+
+        :raise OSError: database cannot be written
+
+        """
+        offsets = {}
+        position = 0
+        # readers of other processes never see a half written database
+        with open(str(path) + ".tmp", "wb") as write_file:
+            for name, fragment in fragments:
+                head = (b",\n" if offsets else b"{\n") + _INDENT \
+                    + json.dumps(name).encode() + b": "
+                write_file.write(head)
+                write_file.write(fragment)
+                position += len(head)
+                offsets[name] = [position, position + len(fragment)]
+                position += len(fragment)
+            write_file.write(b"\n}" if offsets else b"{}")
+        os.replace(str(path) + ".tmp", path)
+        HJsonIndex._write_index(
+            path, offsets, index_path or HJsonIndex.index_path(path)
+        )
+
+    @staticmethod
+    def load_offsets(path, raw: bytes = None, store: bool = True,
+                     read_file=None) -> dict:
+        """Gives back the habit offsets of the database
+
+        :param path: database path
+        :type path: str
+        :param raw: database content if it was already read
+        :type raw: bytes
+        :param store: write the index if it had to be rebuilt
+        :type store: bool
+        :param read_file: the database opened for reading, its offsets
+                          are given even if another process replaced
+                          the database since it was opened
+        :type read_file: BinaryIO
+
+        :raise FileNotFoundError: no database
+        :raise ValueError: database is not valid json
+
+        :return: dict of {name(str): [start, end]}
+
+        """
+        stat = os.stat(path) if read_file is None \
+            else os.fstat(read_file.fileno())
+        try:
+            with open(HJsonIndex.index_path(path), "r") as index_file:
+                index = json.load(index_file)
+            if index["stamp"] == [stat.st_mtime_ns, stat.st_size]:
+                return index["offsets"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        if raw is None and read_file is not None:
+            read_file.seek(0)
+            raw = read_file.read()
+        elif raw is None:
+            with open(path, "rb") as database_file:
+                raw = database_file.read()
+        offsets = HJsonIndex._scan(raw)
+        if store:
+            try:
+                HJsonIndex._write_index(path, offsets,
+                                        HJsonIndex.index_path(path), stat)
+            except OSError:
+                # read-only folder, the index is rebuilt next time
+                pass
+        return offsets
+
+    @staticmethod
+    def read_fragment(path, name: str):
+        """Reads the json value of one habit
+
+        :param path: database path
+        :type path: str
+        :param name: habit name
+        :type name: str
+
+        :raise FileNotFoundError: no database
+        :raise ValueError: database is not valid json
+
+        :return: dict or None if there is no such habit
+
+        """
+        with open(path, "rb") as read_file:
+            offsets = HJsonIndex.load_offsets(path, read_file=read_file)
+            if name not in offsets:
+                return None
+            start, end = offsets[name]
+            read_file.seek(start)
+            return json.loads(read_file.read(end - start))
+
+    @staticmethod
+    def replace_fragment(path, name: str, fragment) -> None:
+        """Replaces, adds or removes one habit in the database
+
+        the other habits are copied as bytes, without decoding
+
+        :param path: database path
+        :type path: str
+        :param name: habit name
+        :type name: str
+        :param fragment: new json value of the habit indented one level,
+                         None to remove the habit
+        :type fragment: bytes
+
+        :raise OSError: database cannot be written
+        :raise ValueError: database is not valid json
+
+        """
+        try:
+            offsets = HJsonIndex.load_offsets(path)
+            with open(path, "rb") as read_file:
+                raw = read_file.read()
+        except FileNotFoundError:
+            offsets, raw = {}, b""
+
+        def fragments():
+            for key, (start, end) in offsets.items():
+                if key != name:
+                    yield key, raw[start:end]
+                elif fragment is not None:
+                    yield key, fragment
+            if name not in offsets and fragment is not None:
+                yield name, fragment
+
+        HJsonIndex.write_database(fragments(), path)
+
+    @staticmethod
+    def remove(path) -> None:
+        """Deletes the index of a database
+
+        :param path: database path
+        :type path: str
+
+        """
+        try:
+            os.remove(HJsonIndex.index_path(path))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _write_index(path, offsets: dict, index_path: str,
+                     stat: os.stat_result = None) -> None:
+        """Writes the offsets with the stamp of the database
+
+        :param path: database path
+        :type path: str
+        :param offsets: {name(str): [start, end]}
+        :type offsets: dict
+        :param index_path: index path
+        :type index_path: str
+        :param stat: stat of the database the offsets were read of,
+                     default the database at the path
+        :type stat: os.stat_result
+
+        """
+        stat = stat or os.stat(path)
+        with open(index_path, "w") as index_file:
+            json.dump({
+                "stamp": [stat.st_mtime_ns, stat.st_size],
+                "offsets": offsets
+            }, index_file)
+
+    @staticmethod
+    def _scan(raw: bytes) -> dict:
+        """Finds the habit offsets by scanning the database
+
+        :param raw: database content
+        :type raw: bytes
+
+        :raise ValueError: database is not valid json
+
+        :return: dict of {name(str): [start, end]}
+
+        """
+        # latin-1 keeps one character per byte, so the positions of the
+        # decoder are byte offsets, the keys are decoded as utf-8
+        text = raw.decode("latin-1")
+        decoder = json.JSONDecoder()
+        offsets = {}
+
+        def skip(position):
+            while position < len(text) and text[position] in " \t\r\n":
+                position += 1
+            return position
+
+        position = skip(0)
+        if text[position:position + 1] != "{":
+            raise ValueError("Database is not a json object")
+        position = skip(position + 1)
+        if text[position:position + 1] == "}":
+            return offsets
+        while True:
+            key_start = position
+            _, position = decoder.raw_decode(text, position)
+            name = json.loads(raw[key_start:position].decode("utf-8"))
+            position = skip(position)
+            if text[position:position + 1] != ":":
+                raise ValueError("Missing ':' in database")
+            start = skip(position + 1)
+            _, position = decoder.raw_decode(text, start)
+            offsets[name] = [start, position]
+            position = skip(position)
+            if text[position:position + 1] == "}":
+                return offsets
+            if text[position:position + 1] != ",":
+                raise ValueError("Missing ',' in database")
+            position = skip(position + 1)
@@ -0,0 +1,163 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+HStoreLock class to serialize the writers of a habits database between
+processes, with the version counter of the database
+
+"""
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from htracker import HErrorCode, LOCK_TIMEOUT
+
+# width of the version counter in the lock file, it is always written
+# in place with the same length, so a reader never sees a short file
+_VERSION_WIDTH = 20
+
+
+class HStoreLock:
+    """ Advisory lock and version counter of a habits database.
+
+    The lock file next to the database is locked with flock by the
+    process writing the database, the other writers wait for it. The
+    file holds the version of the database as well, every write bumps
+    it, so a session can tell if another process wrote the database
+    since it loaded it:
+
+        lock = HStoreLock(path)
+        if lock.acquire() == HErrorCode.SUCCESS:
+            try:
+                if lock.version != loaded_version:
+                    ...  # load again and apply the changes on it
+                ...  # write the database
+                loaded_version = lock.bump()
+            finally:
+                lock.release()
+
+    Where fcntl is not available the version is still counted, but the
+    writers are not locked out.
+
+    """
+
+    def __init__(self, path, timeout: float = LOCK_TIMEOUT):
+        """Lock of a habits database, not acquired yet
+
+        :param path: database path
+        :type path: str
+        :param timeout: seconds to wait for the other writers
+        :type timeout: float
+
+        """
+        self.path = HStoreLock.lock_path(path)
+        self.timeout = timeout
+        self.version = None
+        self._fd = None
+
+    @staticmethod
+    def lock_path(path) -> str:
+        """Path of the lock file that belongs to a database
+
+        :param path: database path
+        :type path: str
+
+        :return: str
+
+        """
+        return str(path) + ".lock"
+
+    @staticmethod
+    def read_version(path) -> int:
+        """Version of a database without locking it, 0 if it was never
+        written with a lock
+
+        read it before loading the database, a write in between only
+        makes the loaded habits look older than they are
+
+        :param path: database path
+        :type path: str
+
+        :return: int
+
+        """
+        try:
+            with open(HStoreLock.lock_path(path), "rb") as lock_file:
+                return HStoreLock._parse_version(lock_file.read())
+        except OSError:
+            return 0
+
+    def acquire(self) -> HErrorCode:
+        """Waits for the lock of the database and reads its version
+
+        the lock is tried again and again with a growing pause till
+        the timeout
+
+        :return: HErrorCode, FILE_WRITE if the lock file cannot be
+                 opened or the other writers hold it too long
+
+        """
+        try:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError:
+            return HErrorCode.FILE_WRITE
+        if fcntl is not None:
+            deadline = time.monotonic() + self.timeout
+            pause = 0.001
+            while True:
+                try:
+                    fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        self.release()
+                        return HErrorCode.FILE_WRITE
+                    time.sleep(pause)
+                    pause = min(pause * 2, 0.05)
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        self.version = HStoreLock._parse_version(
+            os.read(self._fd, _VERSION_WIDTH + 1)
+        )
+        return HErrorCode.SUCCESS
+
+    def bump(self) -> int:
+        """Counts a write of the database, while the lock is held
+
+        :return: int, the new version
+
+        """
+        self.version += 1
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, b"%0*d\n" % (_VERSION_WIDTH, self.version))
+        return self.version
+
+    def release(self) -> None:
+        """Lets the other writers in
+
+        """
+        if self._fd is not None:
+            # closing the file releases the flock
+            os.close(self._fd)
+            self._fd = None
+
+    @staticmethod
+    def _parse_version(content: bytes) -> int:
+        """Version counter of the lock file content
+
+        :param content: lock file content
+        :type content: bytes
+
+        :return: int
+
+        """
+        try:
+            return int(content.strip() or 0)
+        except ValueError:
+            return 0
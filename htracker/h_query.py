@@ -0,0 +1,226 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+HQuery class to filter and sort the habits by their summary values
+through secondary indexes
+
+"""
+import bisect
+import heapq
+from itertools import islice
+from typing import Iterable, Iterator
+
+from htracker.h_data import HabitSummary
+
+# attributes with a sorted index, the query can sort by any of them
+SORTED_FIELDS = ("name", "starting_date", "streak", "on_track",
+                 "struggle")
+QUERY_FIELDS = SORTED_FIELDS + ("periodicity",)
+
+# sorts after every character, closes the range of a name prefix
+_MAX_CHAR = chr(0x10FFFF)
+
+# a predicate with at most this many times the habits of the most
+# selective one is intersected with it, a bigger one is checked
+_INTERSECT_RATIO = 4
+
+
+class HQuery:
+    """ Query engine over the summaries of a habits database.
+
+    The indexes are built once when the habits are loaded: the habit
+    positions grouped by periodicity, and for the name, starting date,
+    streak, on-track and struggle the positions sorted by the value,
+    with the values in a parallel list. A predicate finds its habits
+    with a dictionary lookup or two bisects. A query starts from the
+    habits of its most selective predicate, intersects them with the
+    habits of the predicates of a similar size and checks the others
+    habit by habit, so a selective query over many habits does not
+    touch every habit.
+
+        query = HQuery(summaries)
+        query.select(periodicity=1, streak=(10, None),
+                     order_by="on_track", descending=True, limit=10)
+
+    """
+
+    def __init__(self, habits: Iterable[HabitSummary]):
+        """Builds the indexes
+
+        :param habits: habit summaries in database order
+        :type habits: iterable of HabitSummary
+
+        """
+        self.habits = list(habits)
+        self._by_periodicity = {}
+        for position, habit in enumerate(self.habits):
+            self._by_periodicity.setdefault(habit.periodicity,
+                                            []).append(position)
+        self._sorted = {field: self._sorted_index(field)
+                        for field in SORTED_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.habits)
+
+    def select(self, periodicity: int = None, name_prefix: str = None,
+               started: tuple = None, streak: tuple = None,
+               on_track: tuple = None, struggle: tuple = None,
+               order_by: str = None, descending: bool = False,
+               limit: int = None, offset: int = 0) \
+            -> Iterator[HabitSummary]:
+        """Gives back the habits matching all the given predicates
+
+        the ranges are (minimum, maximum) pairs, both inclusive, None
+        leaves that end open
+
+        :param periodicity: exact periodicity in days
+        :type periodicity: int
+        :param name_prefix: start of the habit name
+        :type name_prefix: str
+        :param started: range of the starting date
+        :type started: (date, date)
+        :param streak: range of the longest streak
+        :type streak: (int, int)
+        :param on_track: range of the on-track value, 0.0 - 1.0
+        :type on_track: (float, float)
+        :param struggle: range of the breaks
+        :type struggle: (int, int)
+        :param order_by: one of QUERY_FIELDS, default database order
+        :type order_by: str
+        :param descending: highest value first
+        :type descending: bool
+        :param limit: page size, default all habits
+        :type limit: int
+        :param offset: number of habits before the page
+        :type offset: int
+
+        :return: iterator of HabitSummary
+
+        """
+        # (number of matching habits, positions, check of one habit)
+        candidates = []
+        if periodicity is not None:
+            positions = self._by_periodicity.get(periodicity, [])
+            candidates.append((len(positions), positions,
+                               lambda habit: habit.periodicity ==
+                               periodicity))
+        if name_prefix is not None:
+            candidates.append(self._range(
+                "name", (name_prefix, name_prefix + _MAX_CHAR)
+            ))
+        for field, bounds in (("starting_date", started),
+                              ("streak", streak),
+                              ("on_track", on_track),
+                              ("struggle", struggle)):
+            if bounds is not None:
+                candidates.append(self._range(field, bounds))
+        if candidates:
+            candidates.sort(key=lambda candidate: candidate[0])
+            positions = candidates[0][1]
+            checks = []
+            for count, other_positions, check in candidates[1:]:
+                # a set intersection costs the size of both sides,
+                # checking the habits one by one only the smaller one
+                if count <= _INTERSECT_RATIO * candidates[0][0]:
+                    positions = set(positions).intersection(
+                        other_positions
+                    )
+                else:
+                    checks.append(check)
+            # the positions in database order, like without predicates
+            matches = [self.habits[position]
+                       for position in sorted(positions)
+                       if all(check(self.habits[position])
+                              for check in checks)]
+        else:
+            matches = self.habits
+        if order_by is None:
+            return islice(matches, offset,
+                          None if limit is None else offset + limit)
+        if order_by not in QUERY_FIELDS:
+            raise ValueError(f"Habits can't be sorted by {order_by}")
+        if not candidates and order_by in SORTED_FIELDS and \
+                not descending:
+            # the index is the ranking already
+            positions = self._sorted[order_by][1]
+            return (self.habits[position] for position in positions[
+                offset:None if limit is None else offset + limit
+            ])
+        return HQuery.rank(matches,
+                           lambda habit: getattr(habit, order_by),
+                           descending, limit, offset)
+
+    @staticmethod
+    def rank(habits: Iterable, key, descending: bool,
+             limit: int = None, offset: int = 0) -> Iterator:
+        """Gives back one page of the habits ranked by a key
+
+        with a limit only the top offset + limit habits are selected
+        with a heap, O(n log k) instead of sorting all of them. Habits
+        with the same key keep their database order on every page.
+
+        :param habits: habits in database order
+        :type habits: iterable
+        :param key: ranking value of a habit
+        :type key: callable
+        :param descending: highest value first
+        :type descending: bool
+        :param limit: page size, default all habits
+        :type limit: int
+        :param offset: number of habits before the page
+        :type offset: int
+
+        :return: iterator of the habits of the page in rank order
+
+        """
+        if limit is None:
+            ranked = sorted(habits, key=key, reverse=descending)
+        elif descending:
+            ranked = heapq.nlargest(offset + limit, habits, key=key)
+        else:
+            ranked = heapq.nsmallest(offset + limit, habits, key=key)
+        return islice(ranked, offset, None)
+
+    def _sorted_index(self, field: str) -> tuple:
+        """Positions of the habits sorted by an attribute
+
+        :param field: habit attribute
+        :type field: str
+
+        :return: (sorted values, positions) lists
+
+        """
+        # sorted is stable: equal values keep the database order
+        positions = sorted(range(len(self.habits)),
+                           key=lambda position:
+                           getattr(self.habits[position], field))
+        return [getattr(self.habits[position], field)
+                for position in positions], positions
+
+    def _range(self, field: str, bounds: tuple) -> tuple:
+        """Habits with an attribute inside a range, by two bisects
+
+        :param field: habit attribute with a sorted index
+        :type field: str
+        :param bounds: (minimum, maximum), None for an open end
+        :type bounds: tuple
+
+        :return: (number of habits, positions, check of one habit)
+
+        """
+        low, high = bounds
+        values, positions = self._sorted[field]
+        start = 0 if low is None else bisect.bisect_left(values, low)
+        end = len(values) if high is None \
+            else bisect.bisect_right(values, high)
+
+        def check(habit) -> bool:
+            value = getattr(habit, field)
+            return (low is None or value >= low) and \
+                (high is None or value <= high)
+
+        return max(end - start, 0), positions[start:end], check
@@ -0,0 +1,412 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+HRecords class to read and write habit records line by line in csv or
+ndjson files, e.g. check-offs for the bulk check-off, or whole habits
+for the import and export
+
+"""
+import csv
+import json
+import os
+from datetime import date
+from typing import Iterable, Iterator, Optional, TextIO
+
+from htracker.h_data import Habit, HabitSummary, new_habit
+from htracker.h_data_manager import HDataManager
+
+# file extensions of the record formats
+RECORD_FORMATS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson"
+}
+
+# long-form csv of habits, one line per check-off
+HABIT_CSV_HEADER = ["name", "starting_date", "periodicity", "date"]
+
+# values of a habit list record, the same as of a HabitSummary
+SUMMARY_FIELDS = ["name", "starting_date", "periodicity", "check_off_count",
+                  "streak", "on_track", "struggle"]
+# a check-off list record, the check-off-bulk command reads it back
+CHECK_OFF_FIELDS = ["name", "date"]
+
+# record formats of the list and analyse commands
+OUTPUT_FORMATS = ["json", "ndjson", "csv"]
+
+# stored habit values, an import calculates them again
+_DERIVED_DEFAULTS = {"streak": 0, "on_track": 1.0, "struggle": 0}
+
+
+class HRecords:
+    """ Line by line reader of habit records.
+
+    Records are read lazily, so a file with millions of lines is never
+    held in memory at once.
+
+    """
+
+    @staticmethod
+    def detect_format(path: str, first_line: str = None) -> str:
+        """Tells the record format from the file extension or from the
+        first line of the records
+
+        :param path: file path
+        :type path: str
+        :param first_line: first line of the records, if known
+        :type first_line: str
+
+        :return: str "csv" or "ndjson", None if the extension is unknown
+                 and there is no first line
+
+        """
+        suffix = os.path.splitext(str(path))[1].lower()
+        if suffix in RECORD_FORMATS:
+            return RECORD_FORMATS[suffix]
+        if first_line is None:
+            return None
+        return "ndjson" if first_line.lstrip().startswith("{") else "csv"
+
+    @staticmethod
+    def read_check_offs(stream: TextIO, record_format: str = None) \
+            -> Iterator[tuple[Optional[str], Optional[date]]]:
+        """Reads (habit name, check-off date) pairs
+
+        csv lines are "name,YYYY-MM-DD" with an optional "name,date"
+        header, ndjson lines are {"name": ..., "date": "YYYY-MM-DD"}.
+        A line which can't be read gives (name, None), or (None, None)
+        if even the name is missing, so the caller can count it.
+
+        :param stream: open text file or stdin
+        :type stream: TextIO
+        :param record_format: "csv" or "ndjson", detected from the first
+                              line if not given
+        :type record_format: str
+
+        :return: iterator of (str, date) pairs
+
+        """
+        first_line = stream.readline()
+        if not first_line:
+            return
+        if record_format is None:
+            record_format = HRecords.detect_format("", first_line)
+        if record_format == "ndjson":
+            lines = HRecords._chain(first_line, stream)
+            yield from HRecords._ndjson_check_offs(lines)
+        else:
+            rows = csv.reader(HRecords._chain(first_line, stream))
+            yield from HRecords._csv_check_offs(rows)
+
+    @staticmethod
+    def _chain(first_line: str, stream: TextIO) -> Iterator[str]:
+        """Gives the already read first line back in front of the rest
+
+        :param first_line: first line of the stream
+        :type first_line: str
+        :param stream: open text file or stdin
+        :type stream: TextIO
+
+        :return: iterator of str
+
+        """
+        yield first_line
+        yield from stream
+
+    @staticmethod
+    def _csv_check_offs(rows) \
+            -> Iterator[tuple[Optional[str], Optional[date]]]:
+        """Reads check-offs from csv rows
+
+        :param rows: csv reader
+        :type rows: iterator of list[str]
+
+        :return: iterator of (str, date) pairs
+
+        """
+        parse_date = HDataManager.parse_date
+        for line_number, row in enumerate(rows):
+            if not row:
+                continue
+            if len(row) != 2:
+                yield None, None
+                continue
+            name, text = row
+            try:
+                yield name, parse_date(text.strip())
+            except ValueError:
+                # the header line is not a check-off
+                if line_number == 0 and text.strip().lower() == "date":
+                    continue
+                yield name, None
+
+    @staticmethod
+    def _ndjson_check_offs(lines) \
+            -> Iterator[tuple[Optional[str], Optional[date]]]:
+        """Reads check-offs from ndjson lines
+
+        :param lines: json objects one per line
+        :type lines: iterator of str
+
+        :return: iterator of (str, date) pairs
+
+        """
+        parse_date = HDataManager.parse_date
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                name = record["name"]
+            except (ValueError, KeyError, TypeError):
+                yield None, None
+                continue
+            try:
+                yield name, parse_date(record.get("date"))
+            except (ValueError, TypeError):
+                yield name, None
+
+    @staticmethod
+    def read_habits(stream: TextIO, record_format: str = None) \
+            -> Iterator[Optional[Habit]]:
+        """Reads habits one by one
+
+        ndjson lines are habits as in the json database, the streak,
+        on_track and struggle values are optional. csv lines are
+        "name,starting_date,periodicity,date" with one line per
+        check-off, the lines of a habit follow each other, a habit
+        without check-offs has one line with an empty date. A line
+        which can't be read gives None, so the caller can count it.
+
+        :param stream: open text file or stdin
+        :type stream: TextIO
+        :param record_format: "csv" or "ndjson", detected from the first
+                              line if not given
+        :type record_format: str
+
+        :return: iterator of Habit
+
+        """
+        first_line = stream.readline()
+        if not first_line:
+            return
+        if record_format is None:
+            record_format = HRecords.detect_format("", first_line)
+        if record_format == "ndjson":
+            lines = HRecords._chain(first_line, stream)
+            yield from HRecords._ndjson_habits(lines)
+        else:
+            rows = csv.reader(HRecords._chain(first_line, stream))
+            yield from HRecords._csv_habits(rows)
+
+    @staticmethod
+    def write_habits(habits: Iterable[Habit], stream: TextIO,
+                     record_format: str) -> int:
+        """Writes habits one by one in the format read_habits reads
+
+        :param habits: habits
+        :type habits: iterable of Habit
+        :param stream: open text file or stdout
+        :type stream: TextIO
+        :param record_format: "csv" or "ndjson"
+        :type record_format: str
+
+        :return: int number of habits written
+
+        """
+        count = 0
+        if record_format == "ndjson":
+            for habit in habits:
+                stream.write(
+                    json.dumps(HDataManager.habit_to_json(habit)) + "\n"
+                )
+                count += 1
+            return count
+        writer = csv.writer(stream, lineterminator="\n")
+        writer.writerow(HABIT_CSV_HEADER)
+        for habit in habits:
+            head = [habit.name, str(habit.starting_date), habit.periodicity]
+            if habit.check_off_count:
+                writer.writerows(head + [str(event)]
+                                 for event in habit.check_offs)
+            else:
+                writer.writerow(head + [""])
+            count += 1
+        return count
+
+    @staticmethod
+    def write_summaries(habits: Iterable[HabitSummary], stream: TextIO,
+                        record_format: str) -> int:
+        """Writes the values of the habits of a habit list one by one,
+        as they come, e.g. from a ranking
+
+        :param habits: habits or habit summaries
+        :type habits: iterable of HabitSummary
+        :param stream: open text file or stdout
+        :type stream: TextIO
+        :param record_format: "json", "ndjson" or "csv"
+        :type record_format: str
+
+        :return: int number of habits written
+
+        """
+        return HRecords._write_rows(
+            ((habit.name, habit.starting_date.isoformat(),
+              int(habit.periodicity), int(habit.check_off_count),
+              int(habit.streak), float(habit.on_track),
+              int(habit.struggle)) for habit in habits),
+            SUMMARY_FIELDS, stream, record_format
+        )
+
+    @staticmethod
+    def write_check_offs(habit: Habit, stream: TextIO,
+                         record_format: str) -> int:
+        """Writes the check-offs of a habit one by one, in the format
+        read_check_offs reads
+
+        :param habit: the habit
+        :type habit: Habit
+        :param stream: open text file or stdout
+        :type stream: TextIO
+        :param record_format: "json", "ndjson" or "csv"
+        :type record_format: str
+
+        :return: int number of check-offs written
+
+        """
+        return HRecords._write_rows(
+            ((habit.name, check_off_date.isoformat())
+             for check_off_date in habit.check_offs),
+            CHECK_OFF_FIELDS, stream, record_format
+        )
+
+    @staticmethod
+    def _write_rows(rows: Iterable[tuple], fields: list[str],
+                    stream: TextIO, record_format: str) -> int:
+        """Writes rows of values as records, one at a time
+
+        json is one array of objects, written item by item, ndjson one
+        object per line and csv one row per line after a header
+
+        :param rows: values in the order of the fields
+        :type rows: iterable of tuple
+        :param fields: names of the values
+        :type fields: list[str]
+        :param stream: open text file or stdout
+        :type stream: TextIO
+        :param record_format: "json", "ndjson" or "csv"
+        :type record_format: str
+
+        :return: int number of rows written
+
+        """
+        count = 0
+        if record_format == "csv":
+            writer = csv.writer(stream, lineterminator="\n")
+            writer.writerow(fields)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+            return count
+        # the object of a row is filled in the same template, strings
+        # are escaped like json.dumps does, the numbers are written as
+        # their repr
+        quote = json.encoder.encode_basestring_ascii
+        template = "{" + ", ".join(quote(field) + ": %s"
+                                   for field in fields) + "}"
+        objects = (template % tuple([
+            quote(value) if value.__class__ is str else repr(value)
+            for value in row
+        ]) for row in rows)
+        if record_format == "ndjson":
+            for json_object in objects:
+                stream.write(json_object + "\n")
+                count += 1
+            return count
+        # one json array, its items are written as they come
+        for json_object in objects:
+            stream.write(",\n" if count else "[\n")
+            stream.write(json_object)
+            count += 1
+        stream.write("\n]\n" if count else "[]\n")
+        return count
+
+    @staticmethod
+    def _ndjson_habits(lines) -> Iterator[Optional[Habit]]:
+        """Reads habits from ndjson lines
+
+        :param lines: json objects one per line
+        :type lines: iterator of str
+
+        :return: iterator of Habit
+
+        """
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                habit = HDataManager.json_to_habit(
+                    {**_DERIVED_DEFAULTS, **record}
+                )
+            except (ValueError, KeyError, TypeError):
+                yield None
+                continue
+            yield habit if HRecords._valid_periodicity(habit) else None
+
+    @staticmethod
+    def _csv_habits(rows) -> Iterator[Optional[Habit]]:
+        """Reads habits from long-form csv rows, the check-offs of a
+        habit are collected till the next habit starts
+
+        :param rows: csv reader
+        :type rows: iterator of list[str]
+
+        :return: iterator of Habit
+
+        """
+        parse_date = HDataManager.parse_date
+        habit = None
+        habit_key = None
+        check_offs = []
+        for line_number, row in enumerate(rows):
+            if not row or line_number == 0 and \
+                    [cell.strip().lower() for cell in row] == \
+                    HABIT_CSV_HEADER:
+                continue
+            try:
+                name, starting_date, periodicity, check_off = row
+                if (name, starting_date, periodicity) != habit_key:
+                    new = new_habit(name, parse_date(starting_date),
+                                    int(periodicity))
+                    if not HRecords._valid_periodicity(new):
+                        raise ValueError("Periodicity is not positive")
+                    if habit is not None:
+                        habit.check_offs = check_offs
+                        yield habit
+                    habit = new
+                    habit_key = (name, starting_date, periodicity)
+                    check_offs = []
+                if check_off.strip():
+                    check_offs.append(parse_date(check_off.strip()))
+            except ValueError:
+                yield None
+        if habit is not None:
+            habit.check_offs = check_offs
+            yield habit
+
+    @staticmethod
+    def _valid_periodicity(habit: Habit) -> bool:
+        """Checks that the periodicity is a positive number of days
+
+        :param habit: Habit
+
+        :return: bool
+
+        """
+        return isinstance(habit.periodicity, int) and \
+            habit.periodicity > 0
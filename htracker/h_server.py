@@ -0,0 +1,535 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+HServer daemon to keep a habits database in memory and serve the
+commands of many short-lived CLI processes over a Unix socket, and the
+HClient proxy the CLI talks to it through
+
+a command sent to the daemon only imports click and this module, the
+HTracker and the storage modules are only loaded by the daemon
+
+"""
+import io
+import os
+import pickle
+import socket
+import socketserver
+import struct
+import threading
+import time
+from contextlib import redirect_stdout
+from typing import Optional
+
+import click
+
+from htracker import FLUSH_INTERVAL, HErrorCode, SERVER_TIMEOUT
+
+# the socket is created next to the database
+SOCKET_SUFFIX = ".sock"
+
+# a frame is its length followed by the pickled message
+_LENGTH = struct.Struct("!Q")
+
+# HTracker methods which are not forwarded to the daemon
+_LOCAL_METHODS = frozenset(["unit_of_work"])
+
+# HTracker methods which take an iterable of records as the first
+# argument, the records follow the call in frames of _BATCH_RECORDS
+_STREAMED_METHODS = frozenset(["check_off_many", "import_habits"])
+_BATCH_RECORDS = 1024
+
+# display output is sent back in frames of about this many characters
+# while the call runs, e.g. the records of an export
+_OUTPUT_CHUNK = 65536
+
+
+def _write_frame(stream, message) -> None:
+    """Writes one message to a socket stream
+
+    :param stream: writable binary stream
+    :param message: any picklable object
+
+    """
+    data = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    stream.write(_LENGTH.pack(len(data)) + data)
+    stream.flush()
+
+
+def _read_frame(stream):
+    """Reads one message from a socket stream
+
+    :param stream: readable binary stream
+
+    :return: the message
+
+    """
+    header = stream.read(_LENGTH.size)
+    if len(header) != _LENGTH.size:
+        raise ConnectionError("Connection closed by the other side")
+    size = _LENGTH.unpack(header)[0]
+    data = stream.read(size)
+    if len(data) != size:
+        raise ConnectionError("Connection closed by the other side")
+    return pickle.loads(data)
+
+
+class _TerminalOutput(io.StringIO):
+    """ Captured display output of a request.
+
+    click keeps the colors only for a terminal, the client strips
+    them again when its own output is not one.
+
+    """
+
+    def isatty(self) -> bool:
+        return True
+
+
+class _StreamedOutput(_TerminalOutput):
+    """ Captured display output which is sent to the client in frames
+    of _OUTPUT_CHUNK characters while the request runs, the rest goes
+    with the answer. """
+
+    def __init__(self, stream):
+        """Output of a request
+
+        :param stream: writable binary stream of the connection
+
+        """
+        super().__init__()
+        self._stream = stream
+
+    def write(self, text: str) -> int:
+        written = super().write(text)
+        if self.tell() >= _OUTPUT_CHUNK:
+            _write_frame(self._stream, self.getvalue())
+            self.seek(0)
+            self.truncate()
+        return written
+
+
+class _Records:
+    """ Stands for the records argument of a streamed call, the records
+    come after the call in frames of lists, an empty list ends them. """
+
+
+def _read_records(stream):
+    """Reads the records of a streamed call one by one
+
+    :param stream: readable binary stream
+
+    :return: iterator of the records
+
+    """
+    while True:
+        batch = _read_frame(stream)
+        if not batch:
+            return
+        yield from batch
+
+
+class _HRequestHandler(socketserver.StreamRequestHandler):
+    """ One connection is one HTracker method call.
+
+    A client which stops sending or reading is dropped after the
+    timeout, so it can't hold its thread forever.
+
+    """
+
+    timeout = SERVER_TIMEOUT
+
+    def handle(self) -> None:
+        try:
+            name, args, kwargs = _read_frame(self.rfile)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return
+        records = None
+        if args and isinstance(args[0], _Records):
+            records = _read_records(self.rfile)
+            args = (records,) + tuple(args[1:])
+        answer = self.server.execute(name, args, kwargs, self.wfile)
+        if answer is None:
+            # the daemon is stopping, the call was not run
+            return
+        try:
+            if records is not None:
+                # the records the method did not read, so the client
+                # gets to read the answer
+                for _ in records:
+                    pass
+            _write_frame(self.wfile, answer)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            pass
+
+
+class HServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ Daemon over one habits database.
+
+    The database is loaded once and kept in an HTracker unit of work:
+    the changes of the clients are applied to the habits in memory and
+    written to disk together every flush_interval seconds, and when the
+    daemon stops. Every connection has its own thread, so a client
+    which is slow to send its call does not hold up the others, but
+    the calls and the flushes run one at a time under a lock, so the
+    writes of the clients never interleave.
+
+        server = HServer(path)
+        server.serve()
+
+    """
+
+    # a connection left open by a client does not delay the stop
+    daemon_threads = True
+
+    def __init__(self, path: str, flush_interval: float = FLUSH_INTERVAL):
+        """Binds the socket of a database
+
+        :param path: database path
+        :type path: str
+        :param flush_interval: seconds between two writes to disk
+        :type flush_interval: float
+
+        :raises FileExistsError: a daemon already serves the database
+
+        """
+        self.path = str(path)
+        self.flush_interval = flush_interval
+        self.session = None
+        # one call or flush at a time on the session
+        self._lock = threading.Lock()
+        address = HServer.socket_path(self.path)
+        if HClient.running(self.path):
+            raise FileExistsError(address)
+        if os.path.exists(address):
+            # left behind by a daemon which was killed
+            os.remove(address)
+        # only the owner of the database may connect
+        umask = os.umask(0o177)
+        try:
+            super().__init__(address, _HRequestHandler)
+        finally:
+            os.umask(umask)
+        from htracker.h_tracker import HTracker
+        self.tracker = HTracker(self.path)
+        self.session = self.tracker.unit_of_work()
+        self.session.__enter__()
+        self._flushed = time.monotonic()
+
+    @staticmethod
+    def socket_path(path: str) -> str:
+        """Path of the daemon socket of a database
+
+        :param path: database path
+        :type path: str
+
+        :return: str
+
+        """
+        return str(path) + SOCKET_SUFFIX
+
+    def serve(self) -> None:
+        """Serves the clients until the process is interrupted, then
+        writes the pending changes and removes the socket
+
+        """
+        try:
+            self.serve_forever(poll_interval=min(self.flush_interval, 0.5))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.server_close()
+
+    def server_close(self) -> None:
+        super().server_close()
+        with self._lock:
+            # the session is only opened after the socket was bound
+            if self.session is None:
+                return
+            # the last changes are written before the socket goes away
+            self.session.__exit__(None, None, None)
+            self.session = None
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+    def service_actions(self) -> None:
+        """Writes the pending changes on schedule, called by
+        serve_forever between the requests
+
+        """
+        if time.monotonic() - self._flushed >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> HErrorCode:
+        """Writes the pending changes to disk
+
+        :return: HErrorCode
+
+        """
+        self._flushed = time.monotonic()
+        with self._lock:
+            if self.session is None:
+                return HErrorCode.SUCCESS
+            return self.session.flush()
+
+    def execute(self, name: str, args: tuple, kwargs: dict,
+                stream=None) -> tuple:
+        """Calls an HTracker method and captures what it displays
+
+        :param name: HTracker method name
+        :type name: str
+        :param args: positional arguments
+        :type args: tuple
+        :param kwargs: keyword arguments
+        :type kwargs: dict
+        :param stream: connection to send the output to while the
+                       method runs, default all of it in the answer
+        :type stream: writable binary stream
+
+        :return: (the method raised, result or exception, output), None
+                 if the daemon is stopping
+
+        """
+        with self._lock:
+            if self.session is None:
+                return None
+            return self._execute(name, args, kwargs, stream)
+
+    def _execute(self, name: str, args: tuple, kwargs: dict,
+                 stream) -> tuple:
+        """Calls an HTracker method while the lock is held, see execute
+
+        :return: (the method raised, result or exception, output)
+
+        """
+        output = _TerminalOutput() if stream is None \
+            else _StreamedOutput(stream)
+        try:
+            if name.startswith("_") or name in _LOCAL_METHODS:
+                raise AttributeError(f"{name} can't be called remotely")
+            method = getattr(self.tracker, name)
+            with redirect_stdout(output):
+                if name == "export_habits":
+                    # the records come back as the output
+                    args = (output,) + tuple(args[1:])
+                result = method(*args, **kwargs)
+        except Exception as error:
+            return True, error, output.getvalue()
+        return False, result, output.getvalue()
+
+
+class HClient:
+    """ HTracker proxy of a CLI process while a daemon is running.
+
+    Every method call is sent to the daemon over the socket, on a new
+    connection, and what the daemon displayed for it is printed here.
+    The records of check_off_many and import_habits follow the call in
+    batches, and the output of the daemon, e.g. the records of an
+    export, comes back in chunks, so neither side holds all of them.
+    If the daemon is gone, the calls fall back to an HTracker
+    which works on the database file directly. If it goes away or stops
+    answering after a call was sent, the call is not run again, it
+    fails with SERVER_LOST, as the daemon may have applied it already.
+
+    """
+
+    def __init__(self, path: str):
+        """Proxy of the daemon of a database
+
+        :param path: database path
+        :type path: str
+
+        """
+        self.path = str(path)
+        self._tracker = None
+
+    @staticmethod
+    def connect(path: str) -> Optional["HClient"]:
+        """Gives back a proxy if a daemon socket exists for the database
+
+        :param path: database path
+        :type path: str
+
+        :return: HClient or None
+
+        """
+        if not hasattr(socket, "AF_UNIX") or \
+                not os.path.exists(HServer.socket_path(path)):
+            return None
+        return HClient(path)
+
+    @staticmethod
+    def running(path: str) -> bool:
+        """Checks if a daemon answers on the socket of the database
+
+        :param path: database path
+        :type path: str
+
+        :return: bool
+
+        """
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(HServer.socket_path(path))
+        except OSError:
+            return False
+        return True
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or name in _LOCAL_METHODS:
+            raise AttributeError(name)
+
+        def method(*args, **kwargs):
+            return self._call(name, args, kwargs)
+
+        method.__name__ = name
+        return method
+
+    def import_database(self, path: str):
+        """HTracker.import_database, the daemon has its own working
+        directory"""
+        return self._call("import_database", (os.path.abspath(path),), {})
+
+    def migrate_database(self, target: str):
+        """HTracker.migrate_database, the daemon has its own working
+        directory"""
+        return self._call("migrate_database", (os.path.abspath(target),),
+                          {})
+
+    def export_habits(self, stream, record_format: str):
+        """HTracker.export_habits, the daemon sends back the records"""
+        return self._call("export_habits", (None, record_format), {},
+                          stream)
+
+    def _call(self, name: str, args: tuple, kwargs: dict, stream=None):
+        """Runs a method in the daemon, or locally without a daemon
+
+        :param name: HTracker method name
+        :type name: str
+        :param args: positional arguments
+        :type args: tuple
+        :param kwargs: keyword arguments
+        :type kwargs: dict
+        :param stream: where the output goes, default stdout
+        :type stream: TextIO
+
+        :raises click.ClickException: SERVER_LOST, the daemon closed
+                the connection or timed out after the call was sent
+
+        :return: the result of the method
+
+        """
+        if self._tracker is None:
+            request = (name, args, kwargs)
+            if name in _STREAMED_METHODS:
+                request = (name, (_Records(),) + tuple(args[1:]), kwargs)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection = sock.makefile("rwb")
+            try:
+                try:
+                    sock.settimeout(SERVER_TIMEOUT)
+                    sock.connect(HServer.socket_path(self.path))
+                    _write_frame(connection, request)
+                except OSError:
+                    # the daemon stopped, the database is up-to-date
+                    from htracker.h_tracker import HTracker
+                    self._tracker = HTracker(self.path)
+                else:
+                    if name in _STREAMED_METHODS:
+                        HClient._send_records(connection, args[0])
+                    return HClient._receive(connection, stream)
+            finally:
+                for closed in (connection, sock):
+                    try:
+                        closed.close()
+                    except OSError:
+                        pass
+        if stream is not None:
+            args = (stream,) + tuple(args[1:])
+        return getattr(self._tracker, name)(*args, **kwargs)
+
+    @staticmethod
+    def _send_records(connection, records) -> None:
+        """Sends the records of a streamed call in batches
+
+        :param connection: writable binary stream of the connection
+        :param records: records of the call
+        :type records: iterable
+
+        :raises click.ClickException: SERVER_LOST
+
+        """
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) == _BATCH_RECORDS:
+                HClient._exchange(_write_frame, connection, batch)
+                batch = []
+        if batch:
+            HClient._exchange(_write_frame, connection, batch)
+        HClient._exchange(_write_frame, connection, [])
+
+    @staticmethod
+    def _receive(connection, stream=None):
+        """Prints the output of the daemon as it comes, then gives back
+        the result of the call
+
+        :param connection: readable binary stream of the connection
+        :param stream: where the output goes, default stdout
+        :type stream: TextIO
+
+        :raises click.ClickException: SERVER_LOST
+
+        :return: the result of the method
+
+        """
+        answer = HClient._exchange(_read_frame, connection)
+        while isinstance(answer, str):
+            HClient._echo(answer, stream)
+            answer = HClient._exchange(_read_frame, connection)
+        raised, result, output = answer
+        if output:
+            HClient._echo(output, stream)
+        if raised:
+            raise result
+        return result
+
+    @staticmethod
+    def _exchange(operation, connection, *args):
+        """Reads or writes a frame after the call was sent
+
+        :param operation: _read_frame or _write_frame
+        :param connection: binary stream of the connection
+
+        :raises click.ClickException: SERVER_LOST, the daemon closed
+                the connection or timed out, it may have applied the
+                call already, so running it here as well could apply a
+                write twice
+
+        :return: what the operation gives back
+
+        """
+        try:
+            return operation(connection, *args)
+        except (OSError, EOFError, ValueError,
+                pickle.UnpicklingError) as error:
+            raise click.ClickException(
+                HErrorCode.SERVER_LOST.value
+            ) from error
+
+    @staticmethod
+    def _echo(output: str, stream=None) -> None:
+        """Prints the output of the daemon
+
+        :param output: displayed text, with colors
+        :type output: str
+        :param stream: text stream, default stdout
+        :type stream: TextIO
+
+        """
+        click.echo(output, file=stream, nl=False)
@@ -0,0 +1,426 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+HSession class to keep the loaded habits database in memory and share
+it between the HTracker methods
+
+"""
+from datetime import date
+from typing import Callable, Iterable, Iterator
+
+from htracker import HErrorCode
+from htracker.h_data import Habit, HabitSummary
+from htracker.h_data_manager import HDataManager
+from htracker.h_lock import HStoreLock
+from htracker.h_query import HQuery
+from htracker.h_summary_index import HSummaryIndex
+
+
+class HSession:
+    """ Unit of work over one habits database.
+
+    The database is parsed once and served from memory for as long as
+    the file's modification time and size stay the same. Commands which
+    need one habit only load that habit, see load_habit, and the habit
+    lists only read the summary values, see load_summaries. Changes are
+    written through right away, or collected and flushed once at the
+    end when the session is used as a context manager:
+
+        with h_tracker.unit_of_work():
+            h_tracker.check_off(...)
+            h_tracker.check_off(...)
+
+    Every write holds the lock of the database, so writers in other
+    processes wait for it. If one of them wrote the database since the
+    habits were loaded, the database is loaded again and the pending
+    changes are applied on it before the write, see HStoreLock.
+
+    """
+
+    def __init__(self, path: str,
+                 recalculate: Callable[[Iterable[Habit]],
+                                       Iterator[Habit]] = None):
+        """Session over a habits database
+
+        :param path: database path
+        :type path: str
+        :param recalculate: calculates the stored values of habits
+                            from their check-offs, used on habits
+                            checked-off by another process as well
+        :type recalculate: callable
+
+        """
+        self.path = path
+        self._recalculate = recalculate
+        self._habits = None
+        # the habits hold the whole database, not only single habits
+        self._complete = False
+        self._error_code = None
+        self._stamp = None
+        # version of the database the habits were loaded from
+        self._version = None
+        # nesting depth of the unit of work and its pending changes
+        self._depth = 0
+        self._changes = []
+        # query indexes and the stamp of the database they were built of
+        self._query = None
+        self._query_stamp = None
+
+    def __enter__(self):
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if self._depth == 0:
+            self.flush()
+
+    @property
+    def pending(self) -> int:
+        """Number of changes not written to the database yet
+
+        :return: int
+
+        """
+        return len(self._changes)
+
+    def load(self) -> (HErrorCode, dict[Habit]):
+        """Gives back the habits, loads them only if the database
+        changed on disk since the last load
+
+        :return HErrorCode, dict[Habit] :
+                            HErrorCode Enum, user-friendly
+                            error codes defined in __init__,
+                            dictionary {name(str):Habit} storing name
+                            and habit class objects pairs
+
+        """
+        # pending changes are only in memory, disk is not up-to-date
+        if self._changes:
+            return self._error_code, self._habits
+        stamp = HDataManager.database_stamp(self.path)
+        if not self._complete or stamp != self._stamp:
+            self._version = HStoreLock.read_version(self.path)
+            self._error_code, self._habits = \
+                HDataManager.load_database(self.path)
+            self._complete = True
+            # a corrupted database is read again next time
+            self._stamp = None if \
+                self._error_code == HErrorCode.JSON_ERROR else stamp
+        return self._error_code, self._habits
+
+    def load_summaries(self) -> (HErrorCode, dict[HabitSummary]):
+        """Gives back the summary values of the habits, from memory if
+        the whole database is loaded and up-to-date, otherwise from the
+        summary index, without decoding the check-offs
+
+        :return HErrorCode, dict[HabitSummary] :
+                            HErrorCode Enum, user-friendly
+                            error codes defined in __init__,
+                            dictionary {name(str):HabitSummary} in
+                            database order
+
+        """
+        if self._changes or self._complete and \
+                HDataManager.database_stamp(self.path) == self._stamp:
+            error_code, habits = self.load()
+            return error_code, {name: HSummaryIndex.summarise(habit)
+                                for name, habit in habits.items()}
+        return HDataManager.load_summaries(self.path)
+
+    def query(self) -> (HErrorCode, HQuery):
+        """Gives back the query engine over the habit summaries, its
+        indexes are built again only if the database changed
+
+        :return HErrorCode, HQuery:
+
+        """
+        stamp = HDataManager.database_stamp(self.path)
+        if self._changes or self._query is None or \
+                stamp != self._query_stamp:
+            error_code, summaries = self.load_summaries()
+            if error_code != HErrorCode.SUCCESS:
+                return error_code, HQuery([])
+            self._query = HQuery(summaries.values())
+            # pending changes are not in the database, no reuse
+            self._query_stamp = None if self._changes else stamp
+        return HErrorCode.SUCCESS, self._query
+
+    def load_habit(self, name: str) -> (HErrorCode, Habit):
+        """Gives back one habit, without loading the other habits if
+        they are not loaded yet
+
+        in a unit of work the whole database is loaded, as the changes
+        are flushed together
+
+        :param name: habit name
+        :type name: str
+
+        :return HErrorCode, Habit: the habit is None if there is no
+                                   habit with the name
+
+        """
+        if self._depth or self._changes:
+            error_code, habits = self.load()
+            return error_code, habits.get(name)
+        stamp = HDataManager.database_stamp(self.path)
+        if self._habits is None or stamp != self._stamp:
+            self._habits = {}
+            self._complete = False
+            self._error_code = None
+            self._stamp = stamp
+            self._version = HStoreLock.read_version(self.path)
+        if self._complete or name in self._habits:
+            return self._error_code, self._habits.get(name)
+        error_code, habit = HDataManager.load_habit(name, self.path)
+        if error_code != HErrorCode.JSON_ERROR and habit is not None:
+            self._habits[name] = habit
+            self._error_code = error_code
+        return error_code, habit
+
+    def insert_habit(self, habit: Habit) -> HErrorCode:
+        """Adds a new habit to the loaded habits and stores it
+
+        :param habit: the new habit
+        :type habit: Habit
+
+        :return: HErrorCode
+
+        """
+        if self._habits is None:
+            self._habits = {}
+        self._habits[habit.name] = habit
+        return self._write(("add", habit))
+
+    def delete_habit(self, name: str) -> HErrorCode:
+        """Removes a habit from the loaded habits and stores it
+
+        :param name: name of the removed habit
+        :type name: str
+
+        :return: HErrorCode
+
+        """
+        if self._habits is not None:
+            self._habits.pop(name, None)
+        return self._write(("remove", name))
+
+    def insert_check_off(self, name: str,
+                         check_off_date: date) -> HErrorCode:
+        """Stores a check-off already added to one of the loaded habits
+
+        :param name: name of the checked-off habit
+        :type name: str
+        :param check_off_date: date of the new check-off
+        :type check_off_date: date
+
+        :return: HErrorCode
+
+        """
+        return self._write(("check_off", name, check_off_date))
+
+    def save(self, changes: list[tuple] = None) -> HErrorCode:
+        """Writes the whole loaded database at once, including the
+        pending changes
+
+        for changes too many to store one by one, e.g. a bulk check-off
+
+        :param changes: the changes already made on the loaded habits,
+                        applied again if another process wrote the
+                        database since it was loaded
+        :type changes: list[tuple]
+
+        :return: HErrorCode
+
+        """
+        if not self._complete:
+            return HErrorCode.ABORTED
+        changes, self._changes = self._changes + (changes or []), []
+        return self._store(changes, lambda _: self._written(
+            HDataManager.save_database(self._habits, self.path)
+        ))
+
+    def flush(self) -> HErrorCode:
+        """Writes the pending changes to the database
+
+        :return: HErrorCode
+
+        """
+        if not self._changes:
+            return HErrorCode.SUCCESS
+        changes, self._changes = self._changes, []
+        return self._store(changes, self._apply)
+
+    def replace(self, write: Callable[[], HErrorCode]) -> HErrorCode:
+        """Replaces the whole database under its lock, e.g. with an
+        import, the loaded habits and the pending changes are dropped
+
+        :param write: writes the database
+        :type write: callable
+
+        :return: HErrorCode
+
+        """
+        self.invalidate()
+        lock = HStoreLock(self.path)
+        error_code = lock.acquire()
+        if error_code != HErrorCode.SUCCESS:
+            return error_code
+        try:
+            error_code = write()
+            if error_code == HErrorCode.SUCCESS:
+                lock.bump()
+            return error_code
+        finally:
+            lock.release()
+
+    def invalidate(self) -> None:
+        """Drops the loaded habits, next load reads the database again
+
+        """
+        self._habits = None
+        self._complete = False
+        self._stamp = None
+        self._version = None
+        self._changes = []
+        self._query = None
+
+    def _apply(self, changes: list[tuple]) -> HErrorCode:
+        """Writes changes made on the loaded habits to the database
+
+        :param changes: ("add", habit), ("remove", name) or
+                        ("check_off", name, date) tuples in order
+        :type changes: list[tuple]
+
+        :return: HErrorCode
+
+        """
+        if self._complete:
+            return self._written(HDataManager.apply_changes(
+                self._habits, changes, self.path
+            ))
+        # single habits only, they are stored one by one
+        for change in changes:
+            error_code = self._written(HDataManager.apply_changes(
+                self._habits, [change], self.path
+            ))
+            if error_code != HErrorCode.SUCCESS:
+                return error_code
+        return HErrorCode.SUCCESS
+
+    def _store(self, changes: list[tuple],
+               write: Callable[[list[tuple]], HErrorCode]) -> HErrorCode:
+        """Writes changes while the database is locked, on the database
+        as the other writers left it
+
+        :param changes: the changes made on the loaded habits
+        :type changes: list[tuple]
+        :param write: writes the changes of the loaded habits
+        :type write: callable
+
+        :return: HErrorCode
+
+        """
+        lock = HStoreLock(self.path)
+        error_code = lock.acquire()
+        if error_code != HErrorCode.SUCCESS:
+            # memory holds changes the disk does not have
+            self.invalidate()
+            return error_code
+        try:
+            if lock.version != self._version:
+                error_code, changes = self._merge(changes)
+                if error_code != HErrorCode.SUCCESS:
+                    self.invalidate()
+                    return error_code
+            error_code = write(changes)
+            if error_code == HErrorCode.SUCCESS:
+                self._version = lock.bump()
+            return error_code
+        finally:
+            lock.release()
+
+    def _merge(self, changes: list[tuple]) -> (HErrorCode, list[tuple]):
+        """Loads the habits written by another process again and applies
+        the changes on them, while the database is locked
+
+        a check-off of a habit removed in the meantime is dropped, the
+        other changes win over the ones of the other process
+
+        :param changes: the changes made on the loaded habits
+        :type changes: list[tuple]
+
+        :return HErrorCode, list[tuple]: the changes still to write
+
+        """
+        if self._complete:
+            error_code, habits = HDataManager.load_database(self.path)
+        else:
+            error_code, habits = HErrorCode.SUCCESS, {}
+            for change in changes:
+                name = change[1].name if change[0] == "add" else change[1]
+                if name in habits:
+                    continue
+                error_code, habit = HDataManager.load_habit(name,
+                                                            self.path)
+                if error_code == HErrorCode.JSON_ERROR:
+                    break
+                if habit is not None:
+                    habits[name] = habit
+        if error_code == HErrorCode.JSON_ERROR:
+            return error_code, []
+        merged = []
+        checked_off = {}
+        for change in changes:
+            if change[0] == "add":
+                habits[change[1].name] = change[1]
+            elif change[0] == "remove":
+                habits.pop(change[1], None)
+            else:
+                habit = habits.get(change[1])
+                if habit is None:
+                    continue
+                if not habit.has_check_off(change[2]):
+                    habit.insert_check_off(change[2])
+                checked_off[change[1]] = habit
+            merged.append(change)
+        if self._recalculate is not None:
+            # the streaks run over the check-offs of both processes
+            list(self._recalculate(checked_off.values()))
+        self._habits = habits
+        return HErrorCode.SUCCESS, merged
+
+    def _write(self, change: tuple) -> HErrorCode:
+        """Writes a change through or keeps it for the flush
+
+        :param change: operation name and its arguments
+        :type change: tuple
+
+        :return: HErrorCode
+
+        """
+        if self._depth:
+            self._changes.append(change)
+            return HErrorCode.SUCCESS
+        return self._store([change], self._apply)
+
+    def _written(self, error_code: HErrorCode) -> HErrorCode:
+        """Updates the cache key after the session wrote the database
+
+        :param error_code: result of the write
+        :type error_code: HErrorCode
+
+        :return: HErrorCode
+
+        """
+        if error_code == HErrorCode.SUCCESS:
+            self._error_code = HErrorCode.SUCCESS
+            self._stamp = HDataManager.database_stamp(self.path)
+        else:
+            # memory holds changes the disk does not have
+            self.invalidate()
+        return error_code
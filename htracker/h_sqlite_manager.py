@@ -0,0 +1,355 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+HSQLiteManager class to store the habits in a SQLite database:
+one row per habit and one row per check-off
+
+"""
+import os
+import sqlite3
+from contextlib import closing
+from datetime import date
+from typing import Iterable, Iterator
+
+from htracker import HErrorCode
+from htracker.h_data import Habit, new_habit
+
+# file extensions handled by the SQLite storage engine
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# habits keep their insertion order through the implicit rowid
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS habits (
+    name TEXT PRIMARY KEY,
+    starting_date TEXT NOT NULL,
+    periodicity INTEGER NOT NULL,
+    streak INTEGER NOT NULL,
+    on_track REAL NOT NULL,
+    struggle INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS check_offs (
+    habit TEXT NOT NULL,
+    day TEXT NOT NULL,
+    PRIMARY KEY (habit, day)
+) WITHOUT ROWID;
+"""
+
+
+class HSQLiteManager:
+    """ SQLite storage engine for the habits.
+
+    Offers the same load and save surface as HDataManager, plus single
+    row operations, so one check-off does not rewrite the database.
+
+    """
+
+    @staticmethod
+    def is_sqlite_path(path) -> bool:
+        """Checks if the database path belongs to the SQLite engine
+
+        :param path: database path
+        :type path: str
+
+        :return: bool
+
+        """
+        return os.path.splitext(str(path))[1].lower() in SQLITE_SUFFIXES
+
+    @staticmethod
+    def load_database(path) -> (HErrorCode, dict[Habit]):
+        """Loads habits database from a SQLite file
+
+        :param path: load database path
+        :type path: str
+
+        :return HErrorCode, dict[Habit] :
+                            HErrorCode Enum, user-friendly
+                            error codes defined in __init__,
+                            dictionary {name(str):Habit} storing name
+                            and habit class objects pairs
+
+        """
+        new_habits = {}
+        check_offs = {}
+        # sqlite would create an empty file on connect
+        if not os.path.isfile(path):
+            return HErrorCode.FILE_READ, new_habits
+        try:
+            with closing(HSQLiteManager._connect(path)) as connection:
+                for row in connection.execute(
+                        "SELECT name, starting_date, periodicity, streak, "
+                        "on_track, struggle FROM habits ORDER BY rowid"
+                ):
+                    check_offs[row[0]] = []
+                    new_habits[row[0]] = new_habit(
+                        row[0],
+                        date.fromisoformat(row[1]),
+                        row[2],
+                        None,
+                        row[3],
+                        row[4],
+                        row[5]
+                    )
+                # the primary key index gives the check-offs sorted
+                for name, day in connection.execute(
+                        "SELECT habit, day FROM check_offs "
+                        "ORDER BY habit, day"
+                ):
+                    if name in check_offs:
+                        check_offs[name].append(date.fromisoformat(day))
+            for name, habit in new_habits.items():
+                habit.check_offs = check_offs[name]
+            return HErrorCode.SUCCESS, new_habits
+        except (sqlite3.DatabaseError, ValueError):
+            return HErrorCode.JSON_ERROR, {}
+
+    @staticmethod
+    def load_habit(name: str, path) -> (HErrorCode, Habit):
+        """Loads one habit from a SQLite file
+
+        :param name: habit name
+        :type name: str
+        :param path: load database path
+        :type path: str
+
+        :return HErrorCode, Habit: the habit is None if there is no
+                                   habit with the name
+
+        """
+        if not os.path.isfile(path):
+            return HErrorCode.FILE_READ, None
+        try:
+            with closing(HSQLiteManager._connect(path)) as connection:
+                row = connection.execute(
+                    "SELECT name, starting_date, periodicity, streak, "
+                    "on_track, struggle FROM habits WHERE name = ?",
+                    (name,)
+                ).fetchone()
+                if row is None:
+                    return HErrorCode.SUCCESS, None
+                return HErrorCode.SUCCESS, new_habit(
+                    row[0],
+                    date.fromisoformat(row[1]),
+                    row[2],
+                    [date.fromisoformat(day) for (day,) in
+                     connection.execute(
+                         "SELECT day FROM check_offs WHERE habit = ? "
+                         "ORDER BY day", (name,)
+                     )],
+                    row[3],
+                    row[4],
+                    row[5]
+                )
+        except (sqlite3.DatabaseError, ValueError):
+            return HErrorCode.JSON_ERROR, None
+
+    @staticmethod
+    def iter_habits(path) -> Iterator[Habit]:
+        """Reads the habits one by one, only one habit is in memory
+
+        :param path: load database path
+        :type path: str
+
+        :raise FileNotFoundError: no database
+        :raise ValueError: database is corrupted
+
+        :return: iterator of Habit
+
+        """
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        try:
+            with closing(HSQLiteManager._connect(path)) as connection:
+                for row in connection.execute(
+                        "SELECT name, starting_date, periodicity, streak, "
+                        "on_track, struggle FROM habits ORDER BY rowid"
+                ):
+                    yield new_habit(
+                        row[0],
+                        date.fromisoformat(row[1]),
+                        row[2],
+                        [date.fromisoformat(day) for (day,) in
+                         connection.execute(
+                             "SELECT day FROM check_offs WHERE habit = ? "
+                             "ORDER BY day", (row[0],)
+                         )],
+                        row[3],
+                        row[4],
+                        row[5]
+                    )
+        except sqlite3.DatabaseError as error:
+            raise ValueError(str(error))
+
+    @staticmethod
+    def save_database(habits: dict[Habit], path) -> HErrorCode:
+        """Replaces the whole SQLite database with the habits
+
+        :param habits: storing name and habit pairs
+        :type habits: dictionary of {name(str):Habit} pairs
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        return HSQLiteManager.write_habits(habits.values(), path)
+
+    @staticmethod
+    def write_habits(habits: Iterable[Habit], path) -> HErrorCode:
+        """Replaces the whole SQLite database with the habits in one
+        transaction, the habits can come one by one from a generator
+
+        :param habits: habits with unique names
+        :type habits: iterable of Habit
+        :param path: save database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        try:
+            with closing(HSQLiteManager._connect(path)) as connection:
+                with connection:
+                    connection.execute("DELETE FROM check_offs")
+                    connection.execute("DELETE FROM habits")
+                    for habit in habits:
+                        HSQLiteManager._insert_habit_rows(
+                            connection, habit
+                        )
+            return HErrorCode.SUCCESS
+        except sqlite3.Error:
+            return HErrorCode.FILE_WRITE
+
+    @staticmethod
+    def insert_habit(habit: Habit, path) -> HErrorCode:
+        """Adds or replaces one habit with its check-offs
+
+        :param habit: Habit to be stored
+        :type habit: Habit
+        :param path: database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        try:
+            with closing(HSQLiteManager._connect(path)) as connection:
+                with connection:
+                    HSQLiteManager._delete_habit_rows(
+                        connection, habit.name
+                    )
+                    HSQLiteManager._insert_habit_rows(connection, habit)
+            return HErrorCode.SUCCESS
+        except sqlite3.Error:
+            return HErrorCode.FILE_WRITE
+
+    @staticmethod
+    def delete_habit(name: str, path) -> HErrorCode:
+        """Removes one habit with its check-offs
+
+        :param name: name of the habit to be removed
+        :type name: str
+        :param path: database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        try:
+            with closing(HSQLiteManager._connect(path)) as connection:
+                with connection:
+                    HSQLiteManager._delete_habit_rows(connection, name)
+            return HErrorCode.SUCCESS
+        except sqlite3.Error:
+            return HErrorCode.FILE_WRITE
+
+    @staticmethod
+    def insert_check_off(habit: Habit, check_off_date: date,
+                         path) -> HErrorCode:
+        """Stores one check-off and the recalculated habit values
+
+        a single row insert plus an update of the derived columns
+
+        :param habit: habit already updated with the check-off
+        :type habit: Habit
+        :param check_off_date: date of the new check-off
+        :type check_off_date: date
+        :param path: database path
+        :type path: str
+
+        :return: HErrorCode
+
+        """
+        try:
+            with closing(HSQLiteManager._connect(path)) as connection:
+                with connection:
+                    connection.execute(
+                        "INSERT OR IGNORE INTO check_offs (habit, day) "
+                        "VALUES (?, ?)",
+                        (habit.name, str(check_off_date))
+                    )
+                    connection.execute(
+                        "UPDATE habits SET streak = ?, on_track = ?, "
+                        "struggle = ? WHERE name = ?",
+                        (habit.streak, habit.on_track, habit.struggle,
+                         habit.name)
+                    )
+            return HErrorCode.SUCCESS
+        except sqlite3.Error:
+            return HErrorCode.FILE_WRITE
+
+    @staticmethod
+    def _connect(path) -> sqlite3.Connection:
+        """Opens the database and makes sure the tables exist
+
+        :param path: database path
+        :type path: str
+
+        :return: sqlite3.Connection
+
+        """
+        connection = sqlite3.connect(path)
+        connection.executescript(_SCHEMA)
+        return connection
+
+    @staticmethod
+    def _insert_habit_rows(connection: sqlite3.Connection,
+                           habit: Habit) -> None:
+        """Inserts the habit row and all of its check-off rows
+
+        :param connection: open database connection
+        :type connection: sqlite3.Connection
+        :param habit: Habit to be inserted
+        :type habit: Habit
+
+        """
+        connection.execute(
+            "INSERT INTO habits (name, starting_date, periodicity, "
+            "streak, on_track, struggle) VALUES (?, ?, ?, ?, ?, ?)",
+            (habit.name, str(habit.starting_date), habit.periodicity,
+             habit.streak, habit.on_track, habit.struggle)
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO check_offs (habit, day) "
+            "VALUES (?, ?)",
+            [(habit.name, str(event)) for event in habit.check_offs]
+        )
+
+    @staticmethod
+    def _delete_habit_rows(connection: sqlite3.Connection,
+                           name: str) -> None:
+        """Deletes the habit row and all of its check-off rows
+
+        :param connection: open database connection
+        :type connection: sqlite3.Connection
+        :param name: name of the habit
+        :type name: str
+
+        """
+        connection.execute("DELETE FROM check_offs WHERE habit = ?",
+                           (name,))
+        connection.execute("DELETE FROM habits WHERE name = ?", (name,))
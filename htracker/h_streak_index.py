@@ -0,0 +1,329 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+HStreakIndex class to keep the streaks and breaks of one habit
+up-to-date while check-offs are added one by one
+
+"""
+import bisect
+import heapq
+from collections import Counter
+
+# most run starts in one block of _RunStarts, a full block is split
+_BLOCK_SIZE = 512
+
+
+class _RunStarts:
+    """ Sorted run starts, kept in blocks.
+
+    The blocks are sorted lists of at most _BLOCK_SIZE starts, with the
+    last start of every block in a separate list. A bisect over those
+    finds the block, so a lookup is O(log n), and an insert or removal
+    only moves the starts of its block instead of the whole list. A
+    full block is split in two, an empty one is dropped.
+
+    """
+
+    def __init__(self, starts: list):
+        """Blocks of the sorted run starts, half full to leave room
+
+        :param starts: sorted run starts
+        :type starts: list[int]
+
+        """
+        size = _BLOCK_SIZE // 2
+        self._blocks = [starts[idx:idx + size]
+                        for idx in range(0, len(starts), size)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._count = len(starts)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def first(self) -> int:
+        """The smallest start, None without starts
+
+        :return: int
+
+        """
+        return self._blocks[0][0] if self._blocks else None
+
+    def last(self) -> int:
+        """The largest start, None without starts
+
+        :return: int
+
+        """
+        return self._maxes[-1] if self._maxes else None
+
+    def floor(self, value: int) -> int:
+        """The largest start up to value, None if there is none
+
+        :param value: day ordinal
+        :type value: int
+
+        :return: int
+
+        """
+        idx = bisect.bisect_left(self._maxes, value)
+        if idx < len(self._blocks):
+            block = self._blocks[idx]
+            pos = bisect.bisect_right(block, value)
+            if pos:
+                return block[pos - 1]
+        return self._maxes[idx - 1] if idx else None
+
+    def higher(self, value: int) -> int:
+        """The smallest start after value, None if there is none
+
+        :param value: day ordinal
+        :type value: int
+
+        :return: int
+
+        """
+        idx = bisect.bisect_right(self._maxes, value)
+        if idx == len(self._blocks):
+            return None
+        block = self._blocks[idx]
+        return block[bisect.bisect_right(block, value)]
+
+    def add(self, value: int) -> None:
+        """Inserts a start which is not there yet
+
+        :param value: day ordinal
+        :type value: int
+
+        """
+        self._count += 1
+        if not self._blocks:
+            self._blocks.append([value])
+            self._maxes.append(value)
+            return
+        idx = min(bisect.bisect_left(self._maxes, value),
+                  len(self._blocks) - 1)
+        block = self._blocks[idx]
+        bisect.insort(block, value)
+        self._maxes[idx] = block[-1]
+        if len(block) > _BLOCK_SIZE:
+            half = len(block) // 2
+            self._blocks.insert(idx + 1, block[half:])
+            del block[half:]
+            self._maxes.insert(idx, block[-1])
+
+    def remove(self, value: int) -> None:
+        """Removes a start which is there
+
+        :param value: day ordinal
+        :type value: int
+
+        """
+        self._count -= 1
+        idx = bisect.bisect_left(self._maxes, value)
+        block = self._blocks[idx]
+        del block[bisect.bisect_left(block, value)]
+        if block:
+            self._maxes[idx] = block[-1]
+        else:
+            del self._blocks[idx]
+            del self._maxes[idx]
+
+
+class HStreakIndex:
+    """ Streak runs of one habit's check-offs.
+
+    The sorted check-off dates are split into runs, where every date is
+    exactly one period after the previous one. A run from start to end
+    holds a streak of (end - start) / periodicity, so the longest streak
+    is the longest run, the current streak is the last run and the
+    breaks are the gaps between the runs. Dates are day ordinals, see
+    date.toordinal().
+
+    A new check-off only changes the runs next to it: it extends, joins
+    or splits them, so an insert needs a lookup in the blocked run
+    starts and a few dictionary updates instead of a full rescan, about
+    O(log n) for n runs.
+
+    Building the index is a pass over all the check-offs. That is paid
+    once per habit and tracker: a one-shot CLI command pays it like it
+    pays loading the habit, which reads every check-off as well, while
+    a tracker which stays alive (shell, serve, AsyncHTracker) pays it
+    once and then only the incremental cost per check-off.
+
+    """
+
+    def __init__(self, ordinals, periodicity: int):
+        """Builds the runs from the sorted check-off ordinals
+
+        :param ordinals: sorted check-off dates as day ordinals
+        :type ordinals: iterable of int
+        :param periodicity: the reoccurring period in days
+        :type periodicity: int
+
+        """
+        self.periodicity = int(periodicity)
+        # run start -> run end
+        self._ends = {}
+        # number of runs per streak length, with a lazy max-heap of the
+        # lengths to find the longest streak after a run is split
+        self._lengths = Counter()
+        self._heap = []
+        self._count = 0
+        starts = []
+        previous = None
+        for ordinal in ordinals:
+            if previous is not None and \
+                    ordinal - previous == self.periodicity:
+                self._ends[starts[-1]] = ordinal
+            else:
+                starts.append(ordinal)
+                self._ends[ordinal] = ordinal
+            previous = ordinal
+            self._count += 1
+        for start in starts:
+            self._add_run(start, self._ends[start])
+        # sorted run starts
+        self._starts = _RunStarts(starts)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, ordinal: int) -> bool:
+        start = self._starts.floor(ordinal)
+        if start is None:
+            return False
+        return ordinal <= self._ends[start] and \
+            (ordinal - start) % self.periodicity == 0
+
+    @property
+    def first(self) -> int:
+        """The first check-off, None without check-offs
+
+        :return: int
+
+        """
+        return self._starts.first()
+
+    @property
+    def longest_streak(self) -> int:
+        """The longest streak of the habit
+
+        :return: int
+
+        """
+        while self._heap and self._lengths[-self._heap[0]] == 0:
+            heapq.heappop(self._heap)
+        return -self._heap[0] if self._heap else 0
+
+    @property
+    def current_streak(self) -> int:
+        """The streak ending with the last check-off
+
+        :return: int
+
+        """
+        start = self._starts.last()
+        if start is None:
+            return 0
+        return (self._ends[start] - start) // self.periodicity
+
+    @property
+    def breaks(self) -> int:
+        """Number of breaks between the streak runs
+
+        :return: int
+
+        """
+        return max(len(self._starts) - 1, 0)
+
+    def insert(self, ordinal: int) -> bool:
+        """Adds a check-off and updates the runs next to it
+
+        the check-off can be older than the last one (backdated)
+
+        :param ordinal: check-off date as day ordinal
+        :type ordinal: int
+
+        :return: bool, False if the date was already checked-off
+
+        """
+        if ordinal in self:
+            return False
+        self._count += 1
+        left = self._starts.floor(ordinal)
+        if left is not None and ordinal < self._ends[left]:
+            # inside a run, between two dates one period apart: the
+            # run is split into three
+            start = left
+            end = self._ends[start]
+            left = start + (ordinal - start) // self.periodicity \
+                * self.periodicity
+            right = left + self.periodicity
+            self._remove_run(start, end)
+            self._ends[start] = left
+            self._add_run(start, left)
+            self._new_run(ordinal, ordinal)
+            self._new_run(right, end)
+            return True
+        # between two runs, the new date can extend or join them
+        right = self._starts.higher(ordinal)
+        join_left = left is not None and \
+            ordinal - self._ends[left] == self.periodicity
+        join_right = right is not None and \
+            right - ordinal == self.periodicity
+        start = left if join_left else ordinal
+        end = self._ends[right] if join_right else ordinal
+        if join_left:
+            self._remove_run(left, self._ends[left])
+        if join_right:
+            self._remove_run(right, self._ends[right])
+            del self._ends[right]
+            self._starts.remove(right)
+        if join_left:
+            self._ends[start] = end
+            self._add_run(start, end)
+        else:
+            self._new_run(start, end)
+        return True
+
+    def _new_run(self, start: int, end: int) -> None:
+        """Registers a run which is not in the run starts yet
+
+        :param start: first date of the run
+        :type start: int
+        :param end: last date of the run
+        :type end: int
+
+        """
+        self._starts.add(start)
+        self._ends[start] = end
+        self._add_run(start, end)
+
+    def _add_run(self, start: int, end: int) -> None:
+        """Counts the streak length of a run
+
+        :param start: first date of the run
+        :type start: int
+        :param end: last date of the run
+        :type end: int
+
+        """
+        length = (end - start) // self.periodicity
+        self._lengths[length] += 1
+        if self._lengths[length] == 1:
+            heapq.heappush(self._heap, -length)
+
+    def _remove_run(self, start: int, end: int) -> None:
+        """Stops counting the streak length of a run
+
+        :param start: first date of the run
+        :type start: int
+        :param end: last date of the run
+        :type end: int
+
+        """
+        self._lengths[(end - start) // self.periodicity] -= 1
@@ -0,0 +1,219 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+"""
+HSummaryIndex class to keep the per-habit summary values of a database
+in a small sidecar file, for the habit lists
+
+"""
+import json
+import os
+from datetime import date
+from typing import Optional
+
+from htracker.h_data import Habit, HabitSummary
+
+# suffix added to the database path
+SUMMARY_SUFFIX = ".summary.json"
+
+
+class HSummaryIndex:
+    """ Summary index of a habits database.
+
+    The index file next to the database stores the name, starting date,
+    periodicity, number of check-offs, streak, on-track and struggle of
+    every habit, together with the stamp of the database files it
+    belongs to (see HDataManager.database_stamp). It is written with the
+    database, and a single habit change updates its entry. An index
+    with another stamp is stale: the database was changed by someone
+    else, and it is rebuilt from the database.
+
+    """
+
+    @staticmethod
+    def summary_path(path) -> str:
+        """Path of the summary index that belongs to a database
+
+        :param path: database path
+        :type path: str
+
+        :return: str
+
+        """
+        return str(path) + SUMMARY_SUFFIX
+
+    @staticmethod
+    def summarise(habit: Habit) -> HabitSummary:
+        """Summary values of a habit
+
+        :param habit: habit object storing attributes of a habit
+        :type habit: Habit
+
+        :return: HabitSummary
+
+        """
+        return HabitSummary(
+            habit.name,
+            habit.starting_date,
+            habit.periodicity,
+            habit.check_off_count,
+            habit.streak,
+            habit.on_track,
+            habit.struggle
+        )
+
+    @staticmethod
+    def load(path, stamp: tuple) -> Optional[dict]:
+        """Reads the summaries of the database
+
+        :param path: database path
+        :type path: str
+        :param stamp: current stamp of the database
+        :type stamp: tuple
+
+        :return: dict of {name(str): HabitSummary} in database order,
+                 None if the index is missing or stale
+
+        """
+        index = HSummaryIndex._read(path)
+        if index is None or \
+                index["stamp"] != HSummaryIndex._stamp_list(stamp):
+            return None
+        return HSummaryIndex._summaries(index)
+
+    @staticmethod
+    def write(path, summaries: dict, stamp: tuple) -> None:
+        """Writes the summaries with the stamp of the database
+
+        a failed write leaves no index behind, it is rebuilt next time
+
+        :param path: database path
+        :type path: str
+        :param summaries: {name(str): HabitSummary} in database order
+        :type summaries: dict
+        :param stamp: stamp of the database just written
+        :type stamp: tuple
+
+        """
+        summary_path = HSummaryIndex.summary_path(path)
+        try:
+            # readers see the old or the new index, never a half one
+            with open(summary_path + ".tmp", "w") as write_file:
+                json.dump({
+                    "stamp": HSummaryIndex._stamp_list(stamp),
+                    "habits": {
+                        name: [str(summary.starting_date),
+                               summary.periodicity,
+                               summary.check_off_count,
+                               summary.streak,
+                               summary.on_track,
+                               summary.struggle]
+                        for name, summary in summaries.items()
+                    }
+                }, write_file)
+            os.replace(summary_path + ".tmp", summary_path)
+        except OSError:
+            HSummaryIndex.remove(path)
+
+    @staticmethod
+    def update(path, old_stamp: tuple, new_stamp: tuple,
+               name: str, habit: Optional[Habit]) -> None:
+        """Updates the entry of one habit after the habit was written
+
+        :param path: database path
+        :type path: str
+        :param old_stamp: stamp of the database before the write
+        :type old_stamp: tuple
+        :param new_stamp: stamp of the database after the write
+        :type new_stamp: tuple
+        :param name: habit name
+        :type name: str
+        :param habit: the written habit, None if it was removed
+        :type habit: Habit
+
+        """
+        index = HSummaryIndex._read(path)
+        stamp = index["stamp"] if index is not None else None
+        summaries = HSummaryIndex._summaries(index) \
+            if stamp == HSummaryIndex._stamp_list(old_stamp) else None
+        if summaries is None:
+            if stamp != HSummaryIndex._stamp_list(new_stamp):
+                # missing or stale already, rebuilt on the next read
+                HSummaryIndex.remove(path)
+            # else the write rewrote the whole index already
+            return
+        if habit is None:
+            summaries.pop(name, None)
+        else:
+            summaries[name] = HSummaryIndex.summarise(habit)
+        HSummaryIndex.write(path, summaries, new_stamp)
+
+    @staticmethod
+    def remove(path) -> None:
+        """Deletes the summary index of a database
+
+        :param path: database path
+        :type path: str
+
+        """
+        try:
+            os.remove(HSummaryIndex.summary_path(path))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _read(path) -> Optional[dict]:
+        """Reads the index file
+
+        :param path: database path
+        :type path: str
+
+        :return: dict with the stamp and the habits, None if there is
+                 no readable index
+
+        """
+        try:
+            with open(HSummaryIndex.summary_path(path), "r") as read_file:
+                index = json.load(read_file)
+            if isinstance(index, dict) and "stamp" in index and \
+                    isinstance(index.get("habits"), dict):
+                return index
+        except (OSError, ValueError):
+            pass
+        return None
+
+    @staticmethod
+    def _summaries(index: dict) -> Optional[dict]:
+        """Creates the summaries of the index entries
+
+        :param index: index file content
+        :type index: dict
+
+        :return: dict of {name(str): HabitSummary}, None if an entry is
+                 not valid
+
+        """
+        try:
+            return {
+                name: HabitSummary(name, date.fromisoformat(values[0]),
+                                   *values[1:])
+                for name, values in index["habits"].items()
+            }
+        except (ValueError, TypeError, IndexError):
+            return None
+
+    @staticmethod
+    def _stamp_list(stamp: tuple) -> list:
+        """The stamp the way it looks after a json round trip
+
+        :param stamp: database stamp
+        :type stamp: tuple
+
+        :return: list
+
+        """
+        return [list(part) if part is not None else None
+                for part in stamp]
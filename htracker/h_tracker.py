@@ -8,27 +8,64 @@
 HTracker main logic to handle other components
 
 """
-from datetime import date, timedelta
+import copy
+import weakref
+from collections import Counter
+from datetime import date
+from itertools import islice
+from typing import Iterable, Iterator, Optional, TextIO
 
 from htracker import HDisplayCategory, HErrorCode
 from htracker.__init__ import FILE_PATH
-from htracker.h_data import Habit
+from htracker.h_analytics import HAnalytics
+from htracker.h_data import BitmapHabit, Habit
 from htracker.h_data_manager import HDataManager
 from htracker.h_display import HDisplay
+from htracker.h_query import HQuery
+from htracker.h_records import HRecords
+from htracker.h_session import HSession
+from htracker.h_streak_index import HStreakIndex
 
 
 class HTracker:
 
-    def __init__(self):
-        pass
+    def __init__(self, path: str = FILE_PATH):
+        """Habit tracker over one habits database
 
-    def load_habits_database(self, path: str = FILE_PATH) -> \
+        :param path: database path, the storage engine is picked by its
+                     file extension
+        :type path: str
+
+        """
+        # every method works on the same in-memory habits database
+        self.session = HSession(path, self._recalculate_habits)
+        # streak runs of the checked-off habits, kept while the habit
+        # object is alive, so more check-offs don't rescan the dates
+        self._streak_indexes = weakref.WeakKeyDictionary()
+
+    def unit_of_work(self) -> HSession:
+        """Context manager to flush the changes of many operations once
+
+        :return: HSession
+
+        """
+        return self.session
+
+    def load_habits_database(self, path: str = None) -> \
             (HErrorCode, dict[Habit]):
         """Loads habits from database
 
+        the habits database is served by the session, other paths are
+        read from disk
+
+        :param path: database path, default the tracked database
+        :type path: str
+
         :return dict[Habit]: dictionary of {name(str):Habit} pairs
 
         """
+        if path is None or path == self.session.path:
+            return self.session.load()
         return HDataManager.load_database(path)
 
     def delete_habit_database(self) -> HErrorCode:
@@ -39,12 +76,96 @@ class HTracker:
         :return: HErrorCode
 
         """
-        return HDataManager.delete_database()
+        return self.session.replace(
+            lambda: HDataManager.delete_database(self.session.path)
+        )
 
     def import_database(self, path: str) -> HErrorCode:
         error_code, habits = self.load_habits_database(path)
         if error_code == HErrorCode.SUCCESS:
-            return HDataManager.save_database(habits)
+            return self.session.replace(
+                lambda: HDataManager.save_database(habits,
+                                                   self.session.path)
+            )
+
+    def import_habits(self, habits: Iterable[Optional[Habit]]) \
+            -> (HErrorCode, Counter):
+        """Replaces the database with habits coming one by one, e.g.
+        read from a dump file, without holding them in memory
+
+        the streak, on_track and struggle values are calculated from the
+        check-offs, the values of the source are not trusted
+
+        :param habits: habits, None for a record which couldn't be read
+        :type habits: iterable of Habit
+
+        :return HErrorCode, Counter: number of habits per result,
+                                     SUCCESS for the imported ones
+
+        """
+        results = Counter()
+
+        def checked_habits():
+            names = set()
+            for habit in habits:
+                if habit is None:
+                    results[HErrorCode.ROW_FORMAT_ERROR] += 1
+                elif habit.name in names:
+                    results[HErrorCode.NAME_EXISTS] += 1
+                else:
+                    names.add(habit.name)
+                    results[HErrorCode.SUCCESS] += 1
+                    yield habit
+
+        # pending changes of the replaced database are dropped
+        error_code = self.session.replace(
+            lambda: HDataManager.write_habits(
+                self._recalculate_habits(checked_habits()),
+                self.session.path
+            )
+        )
+        return error_code, results
+
+    def export_habits(self, stream: TextIO,
+                      record_format: str) -> (HErrorCode, int):
+        """Writes the habits one by one to a csv or ndjson file
+
+        :param stream: open text file or stdout
+        :type stream: TextIO
+        :param record_format: "csv" or "ndjson"
+        :type record_format: str
+
+        :return HErrorCode, int: number of exported habits
+
+        """
+        error_code = self.session.flush()
+        if error_code != HErrorCode.SUCCESS:
+            return error_code, 0
+        try:
+            return HErrorCode.SUCCESS, HRecords.write_habits(
+                HDataManager.iter_habits(self.session.path),
+                stream,
+                record_format
+            )
+        except FileNotFoundError:
+            return HErrorCode.FILE_READ, 0
+        except ValueError:
+            return HErrorCode.JSON_ERROR, 0
+
+    def migrate_database(self, target: str) -> HErrorCode:
+        """Copies the habits database into a new database file
+
+        the target storage engine is picked by its file extension, so
+        this is the way to move the json database over to SQLite
+
+        :param target: path of the new database
+        :type target: str
+
+        :return: HErrorCode
+
+        """
+        self.session.flush()
+        return HDataManager.migrate_database(self.session.path, target)
 
     def check_habit_name_exists(self, name) -> HErrorCode:
         """Checks if the input habit name exists in the database
@@ -55,9 +176,10 @@ class HTracker:
         :return: HErrorCode
 
         """
-        error_code, loaded_habits = HDataManager.load_database()
+        # only the habit itself is read from the database
+        error_code, habit = self.session.load_habit(name)
         if error_code == HErrorCode.SUCCESS:
-            if name in loaded_habits:
+            if habit is not None:
                 return HErrorCode.NAME_EXISTS
             else:
                 return HErrorCode.NAME_ERROR
@@ -73,11 +195,10 @@ class HTracker:
         :return: HErrorCode
 
         """
-        error_code, habits = HDataManager.load_database()
+        error_code, _ = self.session.load_habit(habit.name)
         if (error_code == HErrorCode.SUCCESS) or \
                 (error_code == HErrorCode.FILE_READ):
-            habits[habit.name] = habit
-            return HDataManager.save_database(habits)
+            return self.session.insert_habit(habit)
         else:
             return error_code
 
@@ -90,10 +211,9 @@ class HTracker:
         :return HErrorCode:
 
         """
-        error_code, habits = self.load_habits_database()
-        if error_code == HErrorCode.SUCCESS:
-            habits.pop(name)
-            HDataManager.save_database(habits)
+        error_code, habit = self.session.load_habit(name)
+        if error_code == HErrorCode.SUCCESS and habit is not None:
+            self.session.delete_habit(name)
         return error_code
 
     def check_off(self, name: str, in_date: date) -> HErrorCode:
@@ -107,194 +227,419 @@ class HTracker:
         :return: HErrorCode
 
         """
-        error_code, habits = self.load_habits_database()
-        if error_code == HErrorCode.SUCCESS:
-            # not expecting KeyError as it was checked in h_cli
-            habit = habits[name]
-            name_error = self._check_off_date_valid(
-                habit,
-                in_date
-            )
-            if name_error != HErrorCode.SUCCESS:
-                return name_error
-            habit.check_offs.append(in_date)
-            # for querying is better to have this list shorted
-            # longest_streak, current_streak
-            habit.check_offs.sort()
-            # store longest streak in db for display
-            streaks = \
-                self._count_streaks(habit)
-            habit.streak = streaks[0]
+        error_code, current_streak = self.add_check_off(name, in_date)
+        if current_streak is not None:
             # give user feedback on current streaks
-            HDisplay.print_streak(streaks[1])
-            habit.on_track = \
-                self._calc_on_track(habit)
-            # store breaks in db for display
-            habit.struggle = self._count_struggle(
-                habit,
-                habit.starting_date
-            )
-            return HDataManager.save_database(habits)
-        else:
-            return error_code
+            HDisplay.print_streak(current_streak)
+        return error_code
+
+    def add_check_off(self, name: str, in_date: date) -> (HErrorCode, int):
+        """Adds a check-off date to a habit without displaying anything
+
+        :param name: habit name
+        :type name: str
+        :param in_date: date of check-off
+        :type in_date: date
 
-    def analyse_streak(self, name) -> HErrorCode:
+        :return HErrorCode, int: the current streak, None if the date
+                                 was not added
+
+        """
+        error_code, habit = self.session.load_habit(name)
+        if error_code != HErrorCode.SUCCESS:
+            return error_code, None
+        # not expecting a missing habit as it was checked in h_cli
+        if habit is None:
+            return HErrorCode.NAME_ERROR, None
+        name_error = self._check_off_date_valid(
+            habit,
+            in_date
+        )
+        if name_error != HErrorCode.SUCCESS:
+            return name_error, None
+        # only the streak runs next to the new date are updated
+        streak_index = self._streak_index(habit)
+        streak_index.insert(in_date.toordinal())
+        # for querying is better to have this list shorted
+        habit.insert_check_off(in_date)
+        self._update_habit_values(habit, streak_index)
+        return self.session.insert_check_off(name, in_date), \
+            streak_index.current_streak
+
+    def check_off_many(
+            self,
+            check_offs: Iterable[tuple[Optional[str], Optional[date]]]
+    ) -> (HErrorCode, Counter):
+        """Adds many check-off dates to many habits at once
+
+        every check-off is validated like a single check-off, the
+        valid dates are merged into the habits, the habit values are
+        calculated once per habit and the database is saved once
+
+        :param check_offs: (habit name, date) pairs, None for a row
+                           which couldn't be read
+        :type check_offs: iterable of (str, date)
+
+        :return HErrorCode, Counter: number of check-offs per result,
+                                     SUCCESS for the added ones
+
+        """
+        results = Counter()
+        error_code, habits = self.session.load()
+        if error_code != HErrorCode.SUCCESS:
+            return error_code, results
+        today = date.today()
+        added = 0
+        # ordinals checked-off already and the new ones per habit
+        checked_offs = {}
+        new_check_offs = {}
+        for name, check_off_date in check_offs:
+            if check_off_date is None:
+                results[HErrorCode.ROW_FORMAT_ERROR] += 1
+                continue
+            habit = habits.get(name)
+            if habit is None:
+                results[HErrorCode.NAME_ERROR] += 1
+                continue
+            checked_off = checked_offs.get(name)
+            if checked_off is None:
+                checked_off = checked_offs[name] = \
+                    set(habit.check_off_ordinals)
+                new_check_offs[name] = []
+            check_off_error = self._check_off_date_valid(
+                habit, check_off_date, checked_off, today
+            )
+            if check_off_error is HErrorCode.SUCCESS:
+                ordinal = check_off_date.toordinal()
+                checked_off.add(ordinal)
+                new_check_offs[name].append(ordinal)
+                added += 1
+            else:
+                results[check_off_error] += 1
+        if not added:
+            return HErrorCode.SUCCESS, results
+        results[HErrorCode.SUCCESS] = added
+        # applied again if another process wrote the database meanwhile
+        changes = []
+        for name, ordinals in new_check_offs.items():
+            if not ordinals:
+                continue
+            habit = habits[name]
+            # both lists are sorted runs, timsort merges them in one go
+            ordinals.sort()
+            ordinals = list(habit.check_off_ordinals) + ordinals
+            ordinals.sort()
+            changes.extend(("check_off", name, date.fromordinal(ordinal))
+                           for ordinal in new_check_offs[name])
+            habit.check_offs = [date.fromordinal(ordinal)
+                                for ordinal in ordinals]
+            self._update_habit_values(habit, self._streak_index(habit))
+        return self.session.save(changes), results
+
+    def analyse_streak(self, name, limit: int = None, offset: int = 0,
+                       output_format: str = "table") -> HErrorCode:
         """calculates the streak of habit with a given name or all
         habits
 
         :param name: name of habit
         :type name: str
+        :param limit: number of habits to show, default all
+        :type limit: int
+        :param offset: number of top habits to skip
+        :type offset: int
+        :param output_format: "table", or records in "json", "ndjson"
+                              or "csv"
+        :type output_format: str
 
         :return: HErrorCode
 
         """
-        error_code, habits = self.load_habits_database()
-        if error_code == HErrorCode.SUCCESS:
-            if name:
-                filtered_habits = [habits[name]]
-                HDisplay.display_habits(
-                    HDisplayCategory.STREAK,
-                    filtered_habits
-                )
-            else:
-                shorted_habits = sorted(
-                    habits.items(),
-                    key=lambda item: item[1].streak,
-                    reverse=True
-                )
-                HDisplay.display_habits(
-                    HDisplayCategory.STREAK,
-                    [habit[1] for habit in shorted_habits]
-                )
-            return HErrorCode.SUCCESS
-        else:
+        if name:
+            # one habit is read without decoding the others
+            error_code, habit = self.session.load_habit(name)
+            if error_code == HErrorCode.SUCCESS and habit is not None:
+                HDisplay.display_habits(HDisplayCategory.STREAK, [habit],
+                                        output_format)
             return error_code
+        # the stored values are enough, the check-offs are not decoded
+        error_code, habits = self.session.load_summaries()
+        if error_code == HErrorCode.SUCCESS:
+            HDisplay.display_habits(
+                HDisplayCategory.STREAK,
+                HQuery.rank(habits.values(),
+                            lambda habit: habit.streak,
+                            True, limit, offset),
+                output_format
+            )
+        return error_code
 
-    def analyse_periodicity(self, period) -> HErrorCode:
+    def analyse_periodicity(self, period,
+                            output_format: str = "table") -> HErrorCode:
         """Makes a list of all habits with the given periodicity
 
         :param period: number of days for periodicity
         :type period: int
+        :param output_format: "table", or records in "json", "ndjson"
+                              or "csv"
+        :type output_format: str
 
         :return: HErrorCode
 
         """
-        error_code, habits = self.load_habits_database()
+        # the periodicity index gives the habits without a scan
+        error_code, query = self.session.query()
         if error_code == HErrorCode.SUCCESS:
-            filtered_habits = []
-            for habit in habits:
-                if habits[habit].periodicity == period:
-                    filtered_habits.append(habits[habit])
             HDisplay.display_habits(
                 HDisplayCategory.PERIODICITY,
-                filtered_habits
+                query.select(periodicity=period),
+                output_format
             )
         return error_code
 
-    def analyse_on_track(self, sort: str) -> HErrorCode:
+    def query_habits(self, **predicates) -> (HErrorCode, list):
+        """Finds the habits matching the predicates through the indexes
+        of the summary values
+
+        e.g. h_tracker.query_habits(periodicity=1, streak=(10, None),
+        order_by="on_track", descending=True, limit=10)
+
+        :param predicates: keyword arguments of HQuery.select
+        :type predicates: dict
+
+        :raise ValueError: unknown sort attribute
+
+        :return HErrorCode, list[HabitSummary]: the matching habits
+
+        """
+        error_code, query = self.session.query()
+        if error_code != HErrorCode.SUCCESS:
+            return error_code, []
+        return error_code, list(query.select(**predicates))
+
+    def analyse_query(self, output_format: str = "table",
+                      **predicates) -> HErrorCode:
+        """Prints the habits matching the predicates
+
+        :param output_format: "table", or records in "json", "ndjson"
+                              or "csv"
+        :type output_format: str
+        :param predicates: keyword arguments of HQuery.select
+        :type predicates: dict
+
+        :return: HErrorCode
+
+        """
+        error_code, query = self.session.query()
+        if error_code == HErrorCode.SUCCESS:
+            HDisplay.display_habits(HDisplayCategory.QUERY,
+                                    query.select(**predicates),
+                                    output_format)
+        return error_code
+
+    def analyse_on_track(self, sort: str, limit: int = None,
+                         offset: int = 0,
+                         output_format: str = "table") -> HErrorCode:
         """Makes a list of all habits based on order of on-track
 
         :param sort: ascending or descending order
         :type sort: str
+        :param limit: number of habits to show, default all
+        :type limit: int
+        :param offset: number of top habits to skip
+        :type offset: int
+        :param output_format: "table", or records in "json", "ndjson"
+                              or "csv"
+        :type output_format: str
 
         :return: HErrorCode
 
         """
-        error_code, habits = self.load_habits_database()
+        error_code, habits = self.session.load_summaries()
 
         if error_code == HErrorCode.SUCCESS:
-            if sort == "a":
-                shorted_habits = sorted(
-                    habits.items(),
-                    key=lambda item: item[1].on_track,
-                    reverse=False
-                )
-                HDisplay.display_habits(
-                    HDisplayCategory.STREAK,
-                    [habit[1] for habit in shorted_habits]
-                )
-            elif sort == "d":
-                shorted_habits = sorted(
-                    habits.items(),
-                    key=lambda item: item[1].on_track,
-                    reverse=True
-                )
+            if sort in ("a", "d"):
                 HDisplay.display_habits(
                     HDisplayCategory.STREAK,
-                    [habit[1] for habit in shorted_habits]
+                    HQuery.rank(habits.values(),
+                                lambda habit: habit.on_track,
+                                sort == "d", limit, offset),
+                    output_format
                 )
             return HErrorCode.SUCCESS
         else:
             return error_code
 
-    def analyse_struggle(self, in_date: date) -> HErrorCode:
+    def analyse_struggle(self, in_date: date, limit: int = None,
+                         offset: int = 0,
+                         output_format: str = "table") -> HErrorCode:
         """Makes an ordered list from the habits based on struggle value
         the start time range is given by the user and capped today.
 
         :param in_date: filter start date to today
         :type in_date: date
+        :param limit: number of habits to show, default all
+        :type limit: int
+        :param offset: number of top habits to skip
+        :type offset: int
+        :param output_format: "table", or records in "json", "ndjson"
+                              or "csv"
+        :type output_format: str
 
         :return: HErrorCode
 
         """
+        error_code, ranked = self.rank_struggle(in_date, limit, offset)
+        HDisplay.display_habits(HDisplayCategory.STRUGGLE, ranked,
+                                output_format)
+        return HErrorCode.SUCCESS
 
-        error_code, habits = self.load_habits_database()
-        for habit in habits:
-            breaks_db = self._count_struggle(habits[habit], in_date)
-            breaks_time = self._count_missing_check_offs(habits[habit],
-                                                         in_date)
-            habits[habit].struggle = (breaks_db + breaks_time)
-        shorted_habits = sorted(
-            habits.items(),
-            key=lambda item: item[1].struggle,
-            reverse=True
-        )
-        HDisplay.display_habits(
-            HDisplayCategory.STRUGGLE,
-            [habit[1] for habit in shorted_habits]
+    def rank_struggle(self, in_date: date, limit: int = None,
+                      offset: int = 0) -> (HErrorCode, Iterator[Habit]):
+        """Ranks the habits by their breaks from in_date till today
+
+        :param in_date: filter start date to today
+        :type in_date: date
+        :param limit: number of habits to give back, default all
+        :type limit: int
+        :param offset: number of top habits to skip
+        :type offset: int
+
+        :return HErrorCode, Iterator[Habit]: copies of the habits with
+                                             the struggle of the window
+
+        """
+        error_code, loaded_habits = self.load_habits_database()
+        habits = list(loaded_habits.values())
+        # breaks and missing check-offs of all habits in one pass
+        analytics = HAnalytics(habits)
+        breaks_db = analytics.breaks_since(in_date)
+        breaks_time = analytics.missing_since(in_date)
+        struggles = [int(breaks_db[idx] + breaks_time[idx])
+                     for idx in range(len(habits))]
+        return error_code, self._with_struggle(
+            habits, struggles,
+            HQuery.rank(range(len(habits)),
+                        struggles.__getitem__,
+                        True, limit, offset)
         )
-        return HErrorCode.SUCCESS
 
-    def list_all_habits(self) -> HErrorCode:
-        error_code, habits = self.load_habits_database()
+    def list_all_habits(self, output_format: str = "table") -> HErrorCode:
+        """Prints all habits in database order
+
+        :param output_format: "table", or records in "json", "ndjson"
+                              or "csv"
+        :type output_format: str
+
+        :return: HErrorCode
+
+        """
+        error_code, habits = self.session.load_summaries()
         if error_code == HErrorCode.SUCCESS:
-            if habits:
+            # an empty record list is still a valid document
+            if habits or output_format != "table":
                 HDisplay.display_habits(
                     HDisplayCategory.ALL,
-                    list(habits.values())
+                    habits.values(),
+                    output_format
                 )
         return error_code
 
-    def list_all_check_off(self, name: str) -> HErrorCode:
-        """
+    def list_all_check_off(self, name: str,
+                           output_format: str = "table") -> HErrorCode:
+        """Prints the check-offs of a habit
+
+        :param name: habit name
+        :type name: str
+        :param output_format: "table", or records in "json", "ndjson"
+                              or "csv"
+        :type output_format: str
+
+        :return: HErrorCode
 
-        :param name:
-        :return:
         """
-        name_error_code = self.check_habit_name_exists(name)
-        if name_error_code == HErrorCode.NAME_EXISTS:
-            error_code, habits = self.load_habits_database()
-            if error_code == HErrorCode.SUCCESS:
+        error_code, habit = self.session.load_habit(name)
+        if error_code == HErrorCode.SUCCESS:
+            if habit is not None:
                 HDisplay.print_check_offs(HDisplayCategory.CHECK_OFFS,
-                                          habits[name]
+                                          habit,
+                                          output_format
                                           )
-            else:
-                return error_code
+        else:
+            return error_code
         return HErrorCode.SUCCESS
 
+    @staticmethod
+    def _with_struggle(habits: list[Habit], struggles: list[int],
+                       ranks: Iterable[int]) -> Iterator[Habit]:
+        """Copies of the ranked habits with the struggle of the window
+
+        the struggle in the window is only for display, the loaded
+        habits must keep their stored struggle value
+
+        :param habits: loaded habits
+        :type habits: list[Habit]
+        :param struggles: struggle of every habit in the window
+        :type struggles: list[int]
+        :param ranks: habit positions in rank order
+        :type ranks: iterable of int
+
+        :return: iterator of Habit
+
+        """
+        for idx in ranks:
+            habit = copy.copy(habits[idx])
+            habit.struggle = struggles[idx]
+            yield habit
+
+    def _streak_index(self, habit: Habit) -> HStreakIndex:
+        """Gives back the streak runs of a habit, builds them once
+
+        the build reads all check-offs, like loading the habit did, so
+        a one-shot CLI check-off stays O(n); the index is kept for the
+        tracker, the next check-offs of a shell, a daemon or an
+        AsyncHTracker only update it
+
+        :param habit: habit object storing attributes of a habit
+        :type habit: habit
+
+        :return: HStreakIndex
+
+        """
+        streak_index = self._streak_indexes.get(habit)
+        # the check-offs could be changed by someone else
+        if streak_index is None or \
+                len(streak_index) != habit.check_off_count or \
+                streak_index.periodicity != habit.periodicity:
+            # timsort only checks an already sorted list
+            ordinals = sorted(habit.check_off_ordinals)
+            if ordinals != list(habit.check_off_ordinals):
+                habit.check_offs = [date.fromordinal(ordinal)
+                                    for ordinal in ordinals]
+            streak_index = HStreakIndex(ordinals, habit.periodicity)
+            self._streak_indexes[habit] = streak_index
+        return streak_index
+
     def _check_off_date_valid(
             self,
             habit: Habit,
-            check_off_date: date
+            check_off_date: date,
+            checked_off: set[int] = None,
+            today: date = None
     ) -> HErrorCode:
         """Utility method to check if the given date is valid:
             - not set before starting date
             - not a duplicated check-off date
+            - not in the future
 
         :param habit: habit object storing attributes of a habit
         :type habit: habit
         :param check_off_date: date the habit is checked-off
         :type check_off_date: date
+        :param checked_off: day ordinals of the habit's check-offs, to
+                            look up many dates fast
+        :type checked_off: set[int]
+        :param today: date of today, default date.today()
+        :type today: date
 
         :return: HErrorCode
 
@@ -303,13 +648,76 @@ class HTracker:
         if habit.starting_date > check_off_date:
             return HErrorCode.START_DATE_ERROR
         # from design, we don't allow duplicated entry
-        if check_off_date in habit.check_offs:
+        if habit.has_check_off(check_off_date) if checked_off is None \
+                else check_off_date.toordinal() in checked_off:
             return HErrorCode.SAME_DATE_ERROR
         # no way to put future dated in as input
-        if date.today() < check_off_date:
+        if (today or date.today()) < check_off_date:
             return HErrorCode.FUTURE_DATE_ERROR
         return HErrorCode.SUCCESS
 
+    def _recalculate_habits(self, habits: Iterable[Habit],
+                            batch_size: int = 1024) -> Iterator[Habit]:
+        """Calculates the stored values of habits from their check-offs
+        only, the check-offs are sorted and duplicates dropped
+
+        the habits are calculated in batches with HAnalytics, only one
+        batch is in memory
+
+        :param habits: habits
+        :type habits: iterable of Habit
+        :param batch_size: number of habits calculated together
+        :type batch_size: int
+
+        :return: iterator of Habit
+
+        """
+        habits = iter(habits)
+        while True:
+            batch = list(islice(habits, batch_size))
+            if not batch:
+                return
+            for habit in batch:
+                ordinals = sorted(set(habit.check_off_ordinals))
+                if ordinals != list(habit.check_off_ordinals):
+                    habit.check_offs = [date.fromordinal(ordinal)
+                                        for ordinal in ordinals]
+            analytics = HAnalytics(batch)
+            for habit, streak, on_track in zip(
+                    batch, analytics.streaks()[0], analytics.on_track()
+            ):
+                habit.streak = int(streak)
+                habit.on_track = float(on_track)
+                habit.struggle = self._count_struggle(
+                    habit,
+                    habit.starting_date
+                )
+                yield habit
+
+    def _update_habit_values(self, habit: Habit,
+                             streak_index: HStreakIndex) -> None:
+        """Calculates the stored values of a habit after check-offs
+
+        :param habit: habit object storing attributes of a habit
+        :type habit: habit
+        :param streak_index: streak runs of the habit's check-offs
+        :type streak_index: HStreakIndex
+
+        """
+        # store longest streak in db for display
+        habit.streak = streak_index.longest_streak
+        habit.on_track = \
+            self._calc_on_track(habit)
+        # store breaks in db for display, every gap between the
+        # runs is a break when no date is before the starting date
+        if streak_index.first >= habit.starting_date.toordinal():
+            habit.struggle = streak_index.breaks
+        else:
+            habit.struggle = self._count_struggle(
+                habit,
+                habit.starting_date
+            )
+
     def _count_struggle(self, habit: Habit, in_date: date) -> int:
         """Count the streak breaks in the habit check-off date list
         starting from in_date
@@ -322,43 +730,42 @@ class HTracker:
         :return: int
 
         """
-        periodicity: int = habit.periodicity
-        habit_break = 0
-        # as we shift the idx by +1 we need to have one less idx
-        for idx in range(len(habit.check_offs) - 1):
-            if habit.check_offs[idx] < in_date:
-                continue
-            # need to compare the previous and the current idx date
-            if (
-                    habit.check_offs[idx + 1] - habit.check_offs[idx]
-            ).days != periodicity:
-                habit_break += 1
-        return habit_break
-
-    def _count_missing_check_offs(self, habit: Habit,
-                                  in_date: date) -> int:
+        if isinstance(habit, BitmapHabit):
+            return habit.count_breaks(in_date.toordinal())
+        # the check-offs before in_date are skipped with a bisect
+        return HAnalytics.count_breaks(habit.check_off_ordinals,
+                                       habit.periodicity,
+                                       in_date.toordinal())
+
+    def _count_missing_check_offs(self, habit: Habit, in_date: date,
+                                  today: date = None) -> int:
         """Count missing check-offs from the last check-off to in_date
 
         :param habit: habit object storing attributes of a habit
         :type habit: habit
         :param in_date: a habit entry
         :type in_date: date
+        :param today: end of the window, default today
+        :type today: date
 
         :return: int
 
         """
-        delta_periodicity = timedelta(days=int(habit.periodicity))
-        habit_break = 0
-        last_date = habit.check_offs[-1]
-        # step forward with the periodicity till today
-        while last_date < date.today():
-            last_date += delta_periodicity
-            if last_date < in_date:
-                continue
-            # if no check-off for today we will have breaks = 1
-            # let's count for every skipped period
-            habit_break += 1
-        return habit_break
+        if isinstance(habit, BitmapHabit):
+            last = habit.last_check_off
+        else:
+            check_offs = habit.check_off_ordinals
+            last = check_offs[-1] if len(check_offs) else None
+        if last is None:
+            return 0
+        # if no check-off for today we will have breaks = 1, every
+        # skipped period is counted, without stepping through them
+        return HAnalytics.count_missing(
+            last,
+            int(habit.periodicity),
+            in_date.toordinal(),
+            (today or date.today()).toordinal()
+        )
 
     def _count_streaks(self, habit: Habit) -> int():
         """Count the longest and the actual streaks for a habit
@@ -370,13 +777,14 @@ class HTracker:
         :return: int(longest_streak, current_streak)
 
         """
+        if isinstance(habit, BitmapHabit):
+            return habit.streaks()
         periodicity: int = habit.periodicity
+        check_offs = habit.check_off_ordinals
         longest_streak = 0
         current_streak = 0
-        for idx in range(len(habit.check_offs) - 1):
-            if (
-                    habit.check_offs[idx + 1] - habit.check_offs[idx]
-            ).days == periodicity:
+        for idx in range(len(check_offs) - 1):
+            if check_offs[idx + 1] - check_offs[idx] == periodicity:
                 current_streak += 1
             else:
                 current_streak = 0
@@ -396,11 +804,9 @@ class HTracker:
         # need to reduce the check-offs by 1 to exclude the start date
         # of the habit we can't count streak on just one date
         # we have to add the missing check-off till today
-        return habit.streak / (
-                len(habit.check_offs)
-                - 1
-                + self._count_missing_check_offs(
-                                habit,
-                                habit.starting_date
-                                )
-                            )
+        periods = habit.check_off_count - 1 + \
+            self._count_missing_check_offs(habit, habit.starting_date)
+        # only the first period is checked-off, nothing is missed yet
+        if periods == 0:
+            return 1.0
+        return habit.streak / periods
@@ -7,5 +7,6 @@ setup(
     author='KarolY Molnar',
     author_email='mr_karesz_molnar@gmail.com',
     packages=['htracker'],
-    install_requires=["pytest", "click"]
+    install_requires=["pytest", "click"],
+    extras_require={"analytics": ["numpy"]}
 )
\ No newline at end of file
@@ -0,0 +1,120 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import random
+import pytest
+from datetime import date, timedelta
+
+from htracker import h_analytics
+from htracker.h_analytics import HAnalytics
+from htracker.h_data import Habit
+from htracker.h_tracker import HTracker
+
+
+def loop_breaks(habit, in_date):
+    # the breaks counted one check-off at a time from the first one
+    check_offs = habit.check_offs
+    return sum(1 for idx in range(len(check_offs) - 1)
+               if check_offs[idx] >= in_date and
+               (check_offs[idx + 1] - check_offs[idx]).days !=
+               habit.periodicity)
+
+
+def loop_missing(habit, in_date, today):
+    # one period at a time from the last check-off till today
+    missing = 0
+    last_date = habit.check_offs[-1]
+    while last_date < today:
+        last_date += timedelta(days=habit.periodicity)
+        if last_date >= in_date:
+            missing += 1
+    return missing
+
+
+@pytest.fixture(params=["numpy", "python"])
+def engine(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(h_analytics, "numpy", None)
+    return request.param
+
+
+@pytest.fixture
+def habits():
+    shuffled = random.Random(5)
+    habits = []
+    for idx in range(40):
+        periodicity = shuffled.choice((1, 2, 7))
+        start = date(2023, 1, 1) + timedelta(days=shuffled.randrange(300))
+        days = {0}
+        for _ in range(shuffled.randrange(30)):
+            step = shuffled.choice((1, periodicity))
+            days.add(shuffled.randrange(0, 200, step))
+        habits.append(Habit(f"habit{idx}", start, periodicity,
+                            [start + timedelta(days=day)
+                             for day in sorted(days)]))
+    # edge cases: one check-off and a check-off today
+    habits.append(Habit("single", date(2023, 3, 1), 1, [date(2023, 3, 1)]))
+    habits.append(Habit("today", date.today(), 1, [date.today()]))
+    return habits
+
+
+def test_streaks(engine, habits):
+    longest, current = HAnalytics(habits).streaks()
+    tracker = HTracker()
+    for idx, habit in enumerate(habits):
+        assert (longest[idx], current[idx]) == \
+            tracker._count_streaks(habit)
+
+
+def test_struggle_window(engine, habits):
+    analytics = HAnalytics(habits)
+    tracker = HTracker()
+    for in_date in (date(2022, 1, 1), date(2023, 6, 1), date.today()):
+        breaks = analytics.breaks_since(in_date)
+        missing = analytics.missing_since(in_date)
+        for idx, habit in enumerate(habits):
+            assert breaks[idx] == tracker._count_struggle(habit, in_date)
+            assert missing[idx] == \
+                tracker._count_missing_check_offs(habit, in_date)
+
+
+def test_on_track(engine, habits):
+    values = HAnalytics(habits).on_track()
+    tracker = HTracker()
+    for idx, habit in enumerate(habits[:-1]):
+        habit.streak = tracker._count_streaks(habit)[0]
+        assert values[idx] == pytest.approx(tracker._calc_on_track(habit))
+    # nothing to compare for a habit started today
+    assert values[-1] == 1.0
+
+
+def test_struggle_window_matches_loops(habits):
+    tracker = HTracker()
+    today = date.today()
+    for in_date in (date(2022, 1, 1), date(2023, 2, 10), date(2023, 6, 1),
+                    today, today + timedelta(days=30)):
+        for habit in habits:
+            expected = (loop_breaks(habit, in_date),
+                        loop_missing(habit, in_date, today))
+            assert HAnalytics.struggle_window(habit, in_date, today) == \
+                expected
+            assert tracker._count_struggle(habit, in_date) == expected[0]
+            assert tracker._count_missing_check_offs(habit, in_date) == \
+                expected[1]
+
+
+def test_struggle_window_fixed_today():
+    habit = Habit("weekly", date(2023, 1, 1), 7,
+                  [date(2023, 1, 1), date(2023, 1, 8), date(2023, 1, 20)])
+    # 2023-01-27 .. 2023-03-03 are missed, the first one before the window
+    assert HAnalytics.struggle_window(habit, date(2023, 1, 28),
+                                      date(2023, 3, 3)) == (0, 5)
+    assert HAnalytics.struggle_window(habit, date(2023, 1, 1),
+                                      date(2023, 3, 3)) == (1, 6)
+    assert HAnalytics.struggle_window(Habit("empty", date(2023, 1, 1), 1),
+                                      date(2023, 1, 1)) == (0, 0)
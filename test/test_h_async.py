@@ -0,0 +1,132 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import asyncio
+import pytest
+from datetime import date
+
+from htracker import HErrorCode
+from htracker.h_async import AsyncHTracker
+from htracker.h_data import Habit
+from htracker.h_data_manager import HDataManager
+
+HABITS = 100
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "habits.json"
+    HDataManager.save_database({
+        f"habit {idx}": Habit(f"habit {idx}", date(2023, 1, 1), 1,
+                              [date(2023, 1, 1)])
+        for idx in range(HABITS)
+    }, path)
+    return path
+
+
+@pytest.fixture
+def counted_calls(monkeypatch):
+    calls = {"load": 0, "write": 0}
+    load, apply_changes = HDataManager.load_database, \
+        HDataManager.apply_changes
+
+    def counted_load(*args):
+        calls["load"] += 1
+        return load(*args)
+
+    def counted_apply_changes(*args):
+        calls["write"] += 1
+        return apply_changes(*args)
+
+    monkeypatch.setattr(HDataManager, "load_database", counted_load)
+    monkeypatch.setattr(HDataManager, "apply_changes",
+                        counted_apply_changes)
+    return calls
+
+
+def test_concurrent_check_offs_batched(database, counted_calls, capsys):
+    async def check_offs():
+        async with AsyncHTracker(database) as tracker:
+            return await asyncio.gather(*(
+                tracker.check_off(f"habit {idx % HABITS}",
+                                  date(2023, 1, 2 + idx // HABITS))
+                for idx in range(3 * HABITS)
+            ))
+
+    results = asyncio.run(check_offs())
+    assert results == [(HErrorCode.SUCCESS, 1 + idx // HABITS)
+                       for idx in range(3 * HABITS)]
+    # one batch, maybe a second one for the requests of a late task
+    assert counted_calls["write"] <= 2
+    assert capsys.readouterr().out == ""
+    _, habits = HDataManager.load_database(database)
+    assert all(habit.check_off_count == 4 for habit in habits.values())
+
+
+def test_concurrent_reads_coalesced(database, counted_calls):
+    async def reads():
+        async with AsyncHTracker(database) as tracker:
+            return await asyncio.gather(*(tracker.load_habits()
+                                          for _ in range(50)))
+
+    results = asyncio.run(reads())
+    assert counted_calls["load"] == 1
+    assert all(result == results[0] for result in results)
+    assert len(results[0][1]) == HABITS
+
+
+def test_writes_seen_by_later_reads(database):
+    async def session():
+        async with AsyncHTracker(database) as tracker:
+            same_day = await asyncio.gather(
+                tracker.check_off("habit 1", date(2023, 1, 2)),
+                tracker.check_off("habit 1", date(2023, 1, 2)),
+                tracker.check_off("missing", date(2023, 1, 2))
+            )
+            added = await tracker.add_habit(
+                Habit("new", date(2023, 1, 1), 7, [])
+            )
+            again = await tracker.add_habit(
+                Habit("new", date(2023, 1, 1), 7, [])
+            )
+            removed = await tracker.remove_habit("habit 0")
+            missing = await tracker.remove_habit("habit 0")
+            _, matches = await tracker.query(periodicity=7)
+            _, ranked = await tracker.rank_struggle(date(2023, 1, 1),
+                                                    limit=1)
+            _, habit = await tracker.load_habit("habit 1")
+            return same_day, added, again, removed, missing, matches, \
+                ranked, habit
+
+    same_day, added, again, removed, missing, matches, ranked, habit = \
+        asyncio.run(session())
+    assert same_day == [(HErrorCode.SUCCESS, 1),
+                        (HErrorCode.SAME_DATE_ERROR, None),
+                        (HErrorCode.NAME_ERROR, None)]
+    assert (added, again) == (HErrorCode.SUCCESS, HErrorCode.NAME_EXISTS)
+    assert (removed, missing) == (HErrorCode.SUCCESS, HErrorCode.NAME_ERROR)
+    assert [summary.name for summary in matches] == ["new"]
+    assert len(ranked) == 1
+    assert habit.check_off_count == 2
+
+
+def test_read_habits_detached(database):
+    async def session():
+        async with AsyncHTracker(database) as tracker:
+            _, habit = await tracker.load_habit("habit 1")
+            _, habits = await tracker.load_habits()
+            _, ranked = await tracker.rank_struggle(date(2023, 1, 1))
+            await tracker.check_off("habit 1", date(2023, 1, 2))
+            _, checked_off = await tracker.load_habit("habit 1")
+            return habit, habits, ranked, checked_off
+
+    habit, habits, ranked, checked_off = asyncio.run(session())
+    # the batch changed the habit of the session, not the ones read
+    assert habit.check_offs == [date(2023, 1, 1)]
+    assert habits["habit 1"].check_offs == [date(2023, 1, 1)]
+    assert all(ranked_habit.check_offs == [date(2023, 1, 1)]
+               for ranked_habit in ranked)
+    assert checked_off.check_offs == [date(2023, 1, 1), date(2023, 1, 2)]
@@ -0,0 +1,71 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import json
+import pytest
+from datetime import date
+
+from htracker import HErrorCode, TEST_FILE_PATH
+from htracker.h_batch import HBatchAnalytics
+from htracker.h_data_manager import HDataManager
+from htracker.h_tracker import HTracker
+
+
+@pytest.fixture
+def stores(tmp_path):
+    # one database per user, in every storage format
+    for idx, suffix in enumerate([".json", ".hbin", ".db"]):
+        HDataManager.migrate_database(TEST_FILE_PATH,
+                                      tmp_path / f"user{idx}{suffix}")
+    (tmp_path / "broken.json").write_text("{")
+    (tmp_path / "notes.txt").write_text("not a database")
+    return tmp_path
+
+
+def test_find_stores(stores):
+    names = [path.rsplit("/", 1)[-1]
+             for path in HBatchAnalytics.find_stores(str(stores))]
+    # the index files of the json databases are skipped
+    assert names == ["broken.json", "user0.json", "user1.hbin", "user2.db"]
+
+
+def test_analyse_store_matches_single_database(stores):
+    since = date(2023, 5, 1)
+    result = HBatchAnalytics.analyse_store(str(stores / "user1.hbin"),
+                                           since)
+    assert result["error"] is None
+    _, habits = HDataManager.load_database(TEST_FILE_PATH)
+    assert [habit["name"] for habit in result["habits"]] == list(habits)
+    tracker = HTracker(TEST_FILE_PATH)
+    for habit in result["habits"]:
+        loaded = habits[habit["name"]]
+        assert habit["longest_streak"] == tracker._count_streaks(loaded)[0]
+        assert habit["struggle"] == tracker._count_struggle(loaded, since) \
+            + tracker._count_missing_check_offs(loaded, since)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_writes_one_report(stores, workers):
+    report_path = stores / "report.json"
+    error_code, summary = HBatchAnalytics.run(
+        str(stores), str(report_path), date(2023, 5, 1), workers
+    )
+    assert error_code == HErrorCode.SUCCESS
+    report = json.loads(report_path.read_text())
+    assert report["summary"] == summary
+    assert summary["stores"] == 4
+    assert summary["failed_stores"] == 1
+    assert [store["error"] is None for store in report["stores"]] == \
+        [False, True, True, True]
+    # the same habits in every database give the same values
+    assert report["stores"][1]["habits"] == report["stores"][2]["habits"] \
+        == report["stores"][3]["habits"]
+    assert summary["habits"] == 3 * len(report["stores"][1]["habits"])
+    # the report is not picked up as a database next time
+    error_code, summary = HBatchAnalytics.run(
+        str(stores), str(report_path), date(2023, 5, 1), workers
+    )
+    assert summary["stores"] == 4
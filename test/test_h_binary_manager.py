@@ -0,0 +1,97 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import json
+import os
+import pytest
+from datetime import date
+
+from htracker import HErrorCode, TEST_FILE_PATH
+from htracker import h_binary_manager
+from htracker.h_binary_manager import HBinaryManager
+from htracker.h_data import BitmapHabit, Habit
+from htracker.h_data_manager import HDataManager
+
+
+@pytest.fixture
+def binary_path(tmp_path):
+    path = tmp_path / "habits.hbin"
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    return path
+
+
+def test_round_trip_to_same_json(binary_path, tmp_path):
+    json_path = tmp_path / "habits.json"
+    assert HDataManager.migrate_database(binary_path, json_path) == \
+        HErrorCode.SUCCESS
+    with open(TEST_FILE_PATH, "r") as read_file:
+        expected = json.dumps(json.load(read_file), indent=4)
+    with open(json_path, "r") as read_file:
+        assert read_file.read() == expected
+    assert os.path.getsize(binary_path) < os.path.getsize(json_path) / 4
+
+
+def test_unusual_values_round_trip(tmp_path):
+    path = tmp_path / "habits.hbin"
+    habit = Habit("unsorted ü", date(2023, 3, 1), 400,
+                  [date(2023, 2, 1), date(2024, 6, 1), date(2023, 3, 2)],
+                  -1, 0, 2 ** 40)
+    assert HBinaryManager.save_database({habit.name: habit}, path) == \
+        HErrorCode.SUCCESS
+    _, habits = HDataManager.load_database(path)
+    loaded = habits[habit.name]
+    if isinstance(loaded, BitmapHabit):
+        # a bitset of days has no order of its own
+        assert loaded.check_offs == sorted(habit.check_offs)
+    else:
+        assert loaded.check_offs == habit.check_offs
+    assert (loaded.periodicity, loaded.streak, loaded.struggle) == \
+        (400, -1, 2 ** 40)
+    assert loaded.on_track == 0 and isinstance(loaded.on_track, int)
+
+
+def test_insert_check_off_keeps_other_habits(binary_path):
+    _, habits = HDataManager.load_database(binary_path)
+    habits["AA Meeting"].insert_check_off(date(2023, 5, 19))
+    habits["AA Meeting"].streak = 5
+    error_code = HDataManager.insert_check_off(
+        habits, "AA Meeting", date(2023, 5, 19), binary_path
+    )
+    assert error_code == HErrorCode.SUCCESS
+    _, reloaded = HDataManager.load_database(binary_path)
+    assert list(reloaded) == list(habits)
+    error_code, habit = HDataManager.load_habit("AA Meeting", binary_path)
+    assert error_code == HErrorCode.SUCCESS
+    assert habit.check_offs[-1] == date(2023, 5, 19)
+    assert habit.streak == 5
+
+
+def test_add_and_remove_habit(binary_path):
+    new_habit = Habit("jogging", date(2023, 7, 1), 7, [date(2023, 7, 1)])
+    HDataManager.insert_habit({}, new_habit, binary_path)
+    HDataManager.delete_habit({}, "AA Meeting", binary_path)
+    _, habits = HDataManager.load_database(binary_path)
+    assert "AA Meeting" not in habits
+    assert habits["jogging"].check_offs == [date(2023, 7, 1)]
+
+
+def test_corrupted_database(binary_path):
+    with open(binary_path, "rb") as read_file:
+        data = read_file.read()
+    with open(binary_path, "wb") as write_file:
+        write_file.write(data[:-3])
+    error_code, habits = HDataManager.load_database(binary_path)
+    assert error_code == HErrorCode.JSON_ERROR
+    assert habits == {}
+
+
+def test_format_setting(tmp_path, monkeypatch):
+    monkeypatch.setattr(h_binary_manager, "DATABASE_FORMAT", "binary")
+    assert HBinaryManager.is_binary_path(tmp_path / "habits")
+    assert not HBinaryManager.is_binary_path(tmp_path / "habits.json")
+    assert not HBinaryManager.is_binary_path(tmp_path / "habits.db")
+    monkeypatch.setattr(h_binary_manager, "DATABASE_FORMAT", "json")
+    assert not HBinaryManager.is_binary_path(tmp_path / "habits")
@@ -4,10 +4,18 @@
 #  date: 2023
 #
 
+import csv
+import io
+import json
 import pytest
+import subprocess
+import sys
+from datetime import date
 
-from htracker import HErrorCode
+from htracker import HErrorCode, TEST_FILE_PATH
+from htracker.h_data_manager import HDataManager
 from htracker.h_cli import main_menu
+from htracker.h_records import HRecords
 from htracker import __app_name__, __version__
 
 
@@ -109,4 +117,88 @@ def test_habit_exists(get_runner):
     _ = get_runner.invoke(main_menu, ["add-habit", "-n", "repeathabit", "-p", "3", "-d", "1980-03-04"])
     result = get_runner.invoke(main_menu, ["add-habit", "-n", "repeathabit", "-p", "3", "-d", "1980-03-04"])
     assert result.exit_code == 0
-    assert HErrorCode.NAME_EXISTS.value in result.output
\ No newline at end of file
+    assert HErrorCode.NAME_EXISTS.value in result.output
+
+@pytest.mark.parametrize("args", [["about"], ["--help"]])
+def test_startup_lazy_imports(args):
+    # the import time budget is checked by benchmark/bench_startup.py
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "htracker"] + args,
+        capture_output=True, text=True, check=True
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:"):
+            modules.add(line.split("|")[2].strip())
+    assert "htracker.h_cli" in modules
+    for heavy in ("htracker.h_tracker", "htracker.h_data_manager",
+                  "numpy", "sqlite3", "concurrent.futures"):
+        assert heavy not in modules
+
+
+def test_shell_writes_changes_in_batches(get_runner, tmp_path,
+                                         monkeypatch):
+    path = str(tmp_path / "habits.json")
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    writes = []
+    apply_changes = HDataManager.apply_changes
+
+    def counted_apply_changes(habits, changes, path):
+        writes.append(len(changes))
+        return apply_changes(habits, changes, path)
+
+    monkeypatch.setattr(HDataManager, "apply_changes",
+                        counted_apply_changes)
+    result = get_runner.invoke(main_menu, [
+        "--database", path, "shell", "-w", "2"
+    ], input="check-off -n 'AA Meeting' -d 2023-05-19\n"
+             "check-off -n 'AA Meeting' -d 2023-05-26\n"
+             "check-off -n 'AA Meeting' -d 2023-06-02\n"
+             "list-check-offs -n 'AA Meeting'\n"
+             "check-off --bogus\n"
+             "exit\n")
+    assert result.exit_code == 0
+    assert "2023-06-02" in result.output
+    assert "No such option" in result.output
+    # two changes after the threshold, the last one on exit
+    assert writes == [2, 1]
+    _, habits = HDataManager.load_database(path)
+    assert habits["AA Meeting"].has_check_off(date(2023, 6, 2))
+
+
+@pytest.mark.parametrize("output_format", ["json", "ndjson", "csv"])
+def test_list_habits_records(get_runner, tmp_path, output_format):
+    path = str(tmp_path / "habits.json")
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    result = get_runner.invoke(main_menu, [
+        "--database", path, "--format", output_format, "list-habits"
+    ])
+    assert result.exit_code == 0
+    # the result message does not mix into the records
+    assert result.stderr.strip() == HErrorCode.SUCCESS.value
+    if output_format == "json":
+        records = json.loads(result.stdout)
+    elif output_format == "ndjson":
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+    else:
+        records = list(csv.DictReader(io.StringIO(result.stdout)))
+    _, habits = HDataManager.load_database(path)
+    assert [record["name"] for record in records] == list(habits)
+    assert str(records[0]["streak"]) == str(habits[records[0]["name"]].streak)
+
+
+def test_check_off_records_read_back(get_runner, tmp_path):
+    path = str(tmp_path / "habits.json")
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    result = get_runner.invoke(main_menu, [
+        "--database", path, "--format", "csv", "list-check-offs",
+        "-n", "AA Meeting"
+    ])
+    _, habits = HDataManager.load_database(path)
+    assert list(HRecords.read_check_offs(io.StringIO(result.stdout))) == \
+        [("AA Meeting", day) for day in habits["AA Meeting"].check_offs]
+    result = get_runner.invoke(main_menu, [
+        "--database", path, "--format", "json", "analyse", "query",
+        "--periodicity", "99"
+    ])
+    assert json.loads(result.stdout) == []
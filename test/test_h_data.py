@@ -0,0 +1,84 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import pytest
+from datetime import date
+
+from htracker.h_data import BitmapHabit, CompactHabit, Habit
+from htracker.h_tracker import HTracker
+
+CHECK_OFFS = [date(2023, 1, 1), date(2023, 1, 8), date(2023, 1, 15),
+              date(2023, 2, 1), date(2023, 2, 8)]
+
+
+@pytest.mark.parametrize("habit_class", [Habit, CompactHabit, BitmapHabit])
+def test_insert_check_off_sorted(habit_class):
+    habit = habit_class("test", date(2023, 1, 1), 7, list(CHECK_OFFS))
+    habit.insert_check_off(date(2023, 1, 22))
+    assert habit.check_offs == sorted(CHECK_OFFS + [date(2023, 1, 22)])
+    assert habit.check_off_count == 6
+    assert habit.has_check_off(date(2023, 1, 22))
+    assert not habit.has_check_off(date(2023, 1, 23))
+
+
+@pytest.mark.parametrize("habit_class", [CompactHabit, BitmapHabit])
+def test_compact_habit_same_analytics(habit_class):
+    tracker = HTracker()
+    habit = Habit("test", date(2023, 1, 1), 7, list(CHECK_OFFS))
+    compact = habit_class("test", date(2023, 1, 1), 7, list(CHECK_OFFS))
+    assert not hasattr(compact, "__dict__")
+    assert tracker._count_streaks(compact) == tracker._count_streaks(habit)
+    assert tracker._count_struggle(compact, date(2023, 1, 8)) == \
+        tracker._count_struggle(habit, date(2023, 1, 8))
+
+
+@pytest.mark.parametrize("habit_class", [Habit, CompactHabit, BitmapHabit])
+def test_revision_counts_changes(habit_class):
+    habit = habit_class("test", date(2023, 1, 1), 7, list(CHECK_OFFS))
+    revision = habit.revision
+    habit.streak = 3
+    assert habit.revision > revision
+    revision = habit.revision
+    habit.insert_check_off(date(2023, 1, 22))
+    assert habit.revision > revision
+
+
+def test_bitmap_habit_streaks():
+    tracker = HTracker()
+    check_offs = [date(2022, 12, 30)] + \
+        [date(2023, 1, day) for day in (1, 2, 3, 5, 6, 7, 8, 9, 10, 20)] + \
+        [date(2023, 1, 21), date(2023, 1, 22)]
+    habit = Habit("test", date(2023, 1, 1), 1, list(check_offs))
+    bitmap = BitmapHabit("test", date(2023, 1, 1), 1, list(check_offs))
+    assert bitmap.streaks() == (5, 2)
+    assert bitmap.streaks() == tracker._count_streaks(habit)
+    for day in (1, 4, 9, 30):
+        in_date = date(2023, 1, day)
+        assert tracker._count_struggle(bitmap, in_date) == \
+            tracker._count_struggle(habit, in_date)
+    # the check-off before the starting date moved the base
+    assert bitmap.check_off_base == date(2022, 12, 30).toordinal()
+    assert bitmap.check_off_ordinals == [
+        check_off.toordinal() for check_off in check_offs
+    ]
+
+
+def test_bitmap_habit_windows():
+    habit = BitmapHabit("test", date(2023, 1, 8), 7, list(CHECK_OFFS))
+    assert habit.count_check_offs(date(2023, 1, 8).toordinal()) == 4
+    assert habit.count_check_offs(date(2023, 1, 2).toordinal(),
+                                  date(2023, 2, 1).toordinal()) == 3
+    assert habit.count_check_offs(0, date(2022, 1, 1).toordinal()) == 0
+    assert habit.last_check_off == date(2023, 2, 8).toordinal()
+    # an earlier date shifts the bits
+    habit.insert_check_off(date(2022, 12, 1))
+    assert habit.check_offs[0] == date(2022, 12, 1)
+    assert habit.check_off_count == 6
+    # a day is only checked-off once
+    habit.insert_check_off(date(2022, 12, 1))
+    assert habit.check_off_count == 6
+    assert BitmapHabit("test", date(2023, 1, 1)).streaks() == (0, 0)
+    assert BitmapHabit("test", date(2023, 1, 1)).last_check_off is None
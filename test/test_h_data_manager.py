@@ -0,0 +1,56 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import json
+import pytest
+from datetime import date
+
+from htracker import HErrorCode, TEST_FILE_PATH
+from htracker.h_data_manager import HDataManager
+
+
+def write_database(path, events):
+    with open(path, "w") as write_file:
+        json.dump({"test": {
+            "name": "test",
+            "starting_date": "2023-01-01",
+            "periodicity": 1,
+            "events": events,
+            "streak": 0,
+            "on_track": 1.0,
+            "struggle": 0
+        }}, write_file)
+
+
+@pytest.mark.parametrize("bad_date", ["2023-02-30", "2023/01/02", "x", 5])
+def test_bad_date_is_json_error(tmp_path, bad_date):
+    write_database(tmp_path / "habits.json", ["2023-01-01", bad_date])
+    error_code, _ = HDataManager.load_database(tmp_path / "habits.json")
+    assert error_code == HErrorCode.JSON_ERROR
+
+
+def test_not_padded_date(tmp_path):
+    write_database(tmp_path / "habits.json", ["2023-01-01", "2023-1-5"])
+    error_code, habits = HDataManager.load_database(tmp_path / "habits.json")
+    assert error_code == HErrorCode.SUCCESS
+    assert habits["test"].check_offs == [date(2023, 1, 1), date(2023, 1, 5)]
+
+
+def test_save_encodes_changed_habits_only(tmp_path, monkeypatch):
+    path = tmp_path / "habits.json"
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    _, habits = HDataManager.load_database(path)
+    encoded = []
+    to_json = HDataManager.habit_to_json
+    monkeypatch.setattr(HDataManager, "habit_to_json", staticmethod(
+        lambda habit: encoded.append(habit.name) or to_json(habit)
+    ))
+    habits["AA Meeting"].insert_check_off(date(2023, 5, 19))
+    assert HDataManager.save_database(habits, path) == HErrorCode.SUCCESS
+    assert encoded == ["AA Meeting"]
+    _, reloaded = HDataManager.load_database(path)
+    assert list(reloaded) == list(habits)
+    assert reloaded["AA Meeting"].check_offs[-1] == date(2023, 5, 19)
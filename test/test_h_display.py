@@ -0,0 +1,81 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import io
+import click
+import pytest
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+
+from htracker import HDisplayCategory
+from htracker.h_data import Habit
+from htracker.h_display import HDisplay, _CHUNK_ROWS
+
+ROWS = 2 * _CHUNK_ROWS + 1
+
+
+class Terminal(io.StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+@pytest.fixture
+def counted_writes(monkeypatch):
+    writes = []
+    echo = click.echo
+
+    def counted_echo(message=None, *args, **kwargs):
+        writes.append(message)
+        return echo(message, *args, **kwargs)
+
+    monkeypatch.setattr(click, "echo", counted_echo)
+    return writes
+
+
+def habits(count):
+    return (Habit(f"habit {idx}", date(2023, 1, 1), 1, [date(2023, 1, 1)])
+            for idx in range(count))
+
+
+def test_habit_rows_written_in_chunks(counted_writes):
+    output = io.StringIO()
+    with redirect_stdout(output):
+        HDisplay.display_habits(HDisplayCategory.ALL, habits(ROWS))
+    lines = output.getvalue().splitlines()
+    # title, column names, separator and the rows
+    assert len(lines) == 3 + ROWS
+    assert lines[1].startswith(f"{'Habit name:':^50}|")
+    assert len(lines[2]) == len(lines[1]) == 138
+    assert lines[3].split("|")[0].strip() == "habit 0"
+    assert lines[-1].split("|")[-2].strip() == "100%"
+    # one write for the header and one per chunk of rows
+    assert len(counted_writes) == 1 + 3
+    assert "\x1b[" not in output.getvalue()
+
+
+def test_check_offs_written_in_chunks(counted_writes):
+    habit = Habit("daily", date(2000, 1, 1), 1,
+                  [date(2000, 1, 1) + timedelta(days=day)
+                   for day in range(ROWS)])
+    output = io.StringIO()
+    with redirect_stdout(output):
+        HDisplay.print_check_offs(HDisplayCategory.CHECK_OFFS, habit)
+    lines = output.getvalue().splitlines()
+    assert lines[0] == HDisplayCategory.CHECK_OFFS.value + " daily"
+    assert lines[3] == f"{'2000-01-01':^18}|"
+    assert len(lines) == 3 + ROWS
+    assert len(counted_writes) == 1 + 3
+
+
+def test_colour_on_terminal_only():
+    terminal = Terminal()
+    with redirect_stdout(terminal):
+        HDisplay.display_habits(HDisplayCategory.ALL, habits(2))
+    styled = terminal.getvalue()
+    # the column names and one colour code around the rows of a chunk
+    assert styled.count("\x1b[37m") == 2
+    assert click.unstyle(styled).splitlines()[3].split("|")[0].strip() == \
+        "habit 0"
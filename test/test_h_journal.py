@@ -0,0 +1,70 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import os
+import pytest
+from datetime import date
+
+from htracker import HErrorCode, TEST_FILE_PATH
+from htracker import h_data_manager
+from htracker.h_data import Habit
+from htracker.h_data_manager import HDataManager
+from htracker.h_journal import HJournal
+
+
+@pytest.fixture
+def journal_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(h_data_manager, "JOURNAL_MODE", True)
+    path = tmp_path / "habits.json"
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    return path
+
+
+def test_check_off_appends_to_journal(journal_db):
+    snapshot = os.stat(journal_db)
+    _, habits = HDataManager.load_database(journal_db)
+    habits["AA Meeting"].insert_check_off(date(2023, 5, 19))
+    habits["AA Meeting"].streak = 5
+    error_code = HDataManager.insert_check_off(
+        habits, "AA Meeting", date(2023, 5, 19), journal_db
+    )
+    assert error_code == HErrorCode.SUCCESS
+    # the database itself was not rewritten
+    assert os.stat(journal_db).st_mtime_ns == snapshot.st_mtime_ns
+    _, reloaded = HDataManager.load_database(journal_db)
+    assert reloaded["AA Meeting"].check_offs[-1] == date(2023, 5, 19)
+    assert reloaded["AA Meeting"].streak == 5
+
+
+def test_add_and_remove_replayed(journal_db):
+    _, habits = HDataManager.load_database(journal_db)
+    new_habit = Habit("jogging", date(2023, 7, 1), 7, [date(2023, 7, 1)])
+    habits["jogging"] = new_habit
+    HDataManager.insert_habit(habits, new_habit, journal_db)
+    habits.pop("AA Meeting")
+    HDataManager.delete_habit(habits, "AA Meeting", journal_db)
+    _, reloaded = HDataManager.load_database(journal_db)
+    assert list(reloaded) == list(habits)
+
+
+def test_compaction_folds_journal(journal_db):
+    _, habits = HDataManager.load_database(journal_db)
+    habits["AA Meeting"].insert_check_off(date(2023, 5, 19))
+    HDataManager.insert_check_off(
+        habits, "AA Meeting", date(2023, 5, 19), journal_db
+    )
+    assert HDataManager.compact_journal(journal_db) == HErrorCode.SUCCESS
+    assert not HJournal.exists(journal_db)
+    _, snapshot = HDataManager._load_snapshot(journal_db)
+    assert snapshot["AA Meeting"].check_offs[-1] == date(2023, 5, 19)
+
+
+def test_torn_journal_line_ignored(journal_db):
+    with open(HJournal.journal_path(journal_db), "w") as journal_file:
+        journal_file.write('{"op": "remove", "na')
+    error_code, habits = HDataManager.load_database(journal_db)
+    assert error_code == HErrorCode.SUCCESS
+    assert "AA Meeting" in habits
@@ -0,0 +1,69 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import json
+import os
+import pytest
+from datetime import date
+
+from htracker import HErrorCode, TEST_FILE_PATH
+from htracker.h_data import Habit
+from htracker.h_data_manager import HDataManager
+from htracker.h_json_index import HJsonIndex
+
+
+@pytest.fixture
+def json_db(tmp_path):
+    path = tmp_path / "habits.json"
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    return path
+
+
+def test_same_output_as_json_dump(json_db):
+    with open(TEST_FILE_PATH, "r") as read_file:
+        expected = json.dumps(json.load(read_file), indent=4)
+    with open(json_db, "r") as read_file:
+        assert read_file.read() == expected
+
+
+def test_load_habit_through_index(json_db):
+    _, habits = HDataManager.load_database(json_db)
+    error_code, habit = HDataManager.load_habit("AA Meeting", json_db)
+    assert error_code == HErrorCode.SUCCESS
+    assert habit.check_offs == habits["AA Meeting"].check_offs
+    error_code, habit = HDataManager.load_habit("no such habit", json_db)
+    assert error_code == HErrorCode.SUCCESS
+    assert habit is None
+
+
+def test_stale_index_rebuilt(json_db):
+    with open(TEST_FILE_PATH, "r") as read_file:
+        habits_json = json.load(read_file)
+    habits_json.pop("AA Meeting")
+    with open(json_db, "w") as write_file:
+        json.dump(habits_json, write_file)
+    offsets = HJsonIndex.load_offsets(json_db)
+    assert list(offsets) == list(habits_json)
+    for name in habits_json:
+        assert HJsonIndex.read_fragment(json_db, name) == habits_json[name]
+
+
+def test_replace_keeps_other_habits(json_db):
+    _, habits = HDataManager.load_database(json_db)
+    new_habit = Habit("jogging", date(2023, 7, 1), 7, [date(2023, 7, 1)])
+    habits["jogging"] = new_habit
+    HDataManager.insert_habit(habits, new_habit, json_db)
+    habits.pop("AA Meeting")
+    HDataManager.delete_habit(habits, "AA Meeting", json_db)
+    _, reloaded = HDataManager.load_database(json_db)
+    assert list(reloaded) == list(habits)
+    assert reloaded["jogging"].check_offs == [date(2023, 7, 1)]
+
+
+def test_remove_index(json_db):
+    HJsonIndex.load_offsets(json_db)
+    HJsonIndex.remove(json_db)
+    assert not os.path.exists(HJsonIndex.index_path(json_db))
@@ -0,0 +1,101 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import subprocess
+import sys
+import pytest
+from datetime import date, timedelta
+
+from htracker import HErrorCode
+from htracker.h_data import Habit
+from htracker.h_data_manager import HDataManager
+from htracker.h_lock import HStoreLock
+from htracker.h_tracker import HTracker
+
+WRITERS = 12
+START = date(2023, 1, 1)
+
+
+@pytest.fixture(params=["habits.json", "habits.hbin", "habits.db"])
+def database(tmp_path, request):
+    path = tmp_path / request.param
+    HDataManager.save_database({
+        name: Habit(name, START, 1, []) for name in ("even", "odd")
+    }, path)
+    return path
+
+
+def test_version_bumped_under_lock(tmp_path):
+    path = tmp_path / "habits.json"
+    assert HStoreLock.read_version(path) == 0
+    lock = HStoreLock(path)
+    assert lock.acquire() == HErrorCode.SUCCESS
+    try:
+        assert lock.version == 0
+        assert lock.bump() == 1
+        # a second writer waits and gives up after its timeout
+        assert HStoreLock(path, timeout=0.05).acquire() == \
+            HErrorCode.FILE_WRITE
+    finally:
+        lock.release()
+    assert HStoreLock.read_version(path) == 1
+    other = HStoreLock(path)
+    assert other.acquire() == HErrorCode.SUCCESS
+    assert other.version == 1
+    other.release()
+
+
+def test_stale_session_merges(database):
+    first, second = HTracker(database), HTracker(database)
+    # both load the database before the other writes it
+    first.check_habit_name_exists("even")
+    second.check_habit_name_exists("even")
+    first.load_habits_database()
+    second.load_habits_database()
+    assert first.add_check_off("even", START)[0] == HErrorCode.SUCCESS
+    assert second.add_check_off("even", START + timedelta(days=1))[0] \
+        == HErrorCode.SUCCESS
+    assert second.add_habit_to_database(Habit("new", START, 7, [])) == \
+        HErrorCode.SUCCESS
+    _, habits = HDataManager.load_database(database)
+    assert sorted(habits["even"].check_offs) == \
+        [START, START + timedelta(days=1)]
+    # calculated from both check-offs, like in one process
+    assert habits["even"].streak == 1
+    assert "new" in habits
+
+
+def test_stale_bulk_check_off_merges(database):
+    first, second = HTracker(database), HTracker(database)
+    first.load_habits_database()
+    second.load_habits_database()
+    first.check_off_many([("odd", START)])
+    second.check_off_many([("odd", START + timedelta(days=2)),
+                           ("even", START)])
+    _, habits = HDataManager.load_database(database)
+    assert sorted(habits["odd"].check_offs) == \
+        [START, START + timedelta(days=2)]
+    assert habits["odd"].struggle == 1
+    assert habits["even"].check_off_count == 1
+
+
+def test_parallel_check_off_processes(database):
+    processes = [subprocess.Popen(
+        [sys.executable, "-m", "htracker", "--database", str(database),
+         "check-off", "-n", ("even", "odd")[writer % 2],
+         "-d", str(START + timedelta(days=writer // 2))],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    ) for writer in range(WRITERS)]
+    for process in processes:
+        output, _ = process.communicate(timeout=120)
+        assert process.returncode == 0, output
+        assert HErrorCode.SUCCESS.value in output
+    # no check-off of a writer was overwritten by another one
+    _, habits = HDataManager.load_database(database)
+    for name in ("even", "odd"):
+        assert sorted(habits[name].check_offs) == \
+            [START + timedelta(days=day) for day in range(WRITERS // 2)]
+        assert habits[name].streak == WRITERS // 2 - 1
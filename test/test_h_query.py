@@ -0,0 +1,120 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import random
+import pytest
+from datetime import date, timedelta
+
+from htracker import HErrorCode, TEST_FILE_PATH
+from htracker.h_data import Habit, HabitSummary
+from htracker.h_data_manager import HDataManager
+from htracker.h_query import HQuery
+from htracker.h_tracker import HTracker
+
+
+@pytest.fixture
+def summaries():
+    shuffled = random.Random(7)
+    return [HabitSummary(
+        shuffled.choice(["run ", "read ", "swim "]) + str(idx),
+        date(2023, 1, 1) + timedelta(days=shuffled.randrange(60)),
+        shuffled.choice((1, 2, 7)),
+        shuffled.randrange(50),
+        shuffled.randrange(10),
+        shuffled.choice((0.0, 0.25, 0.5, 1.0)),
+        shuffled.randrange(5)
+    ) for idx in range(300)]
+
+
+def in_range(value, bounds):
+    return bounds is None or (bounds[0] is None or value >= bounds[0]) \
+        and (bounds[1] is None or value <= bounds[1])
+
+
+@pytest.mark.parametrize("predicates", [
+    {},
+    {"periodicity": 7},
+    {"periodicity": 3},
+    {"name_prefix": "re"},
+    {"name_prefix": "run 1", "streak": (2, None)},
+    {"started": (date(2023, 1, 10), date(2023, 1, 20)), "periodicity": 1},
+    {"on_track": (None, 0.25), "struggle": (1, 3)},
+    {"streak": (9, 9), "on_track": (1.0, None), "name_prefix": "swim"},
+    {"streak": (5, 2)}
+])
+def test_select_matches_scan(summaries, predicates):
+    expected = [habit for habit in summaries
+                if (predicates.get("periodicity") is None or
+                    habit.periodicity == predicates["periodicity"])
+                and habit.name.startswith(predicates.get("name_prefix", ""))
+                and in_range(habit.starting_date, predicates.get("started"))
+                and in_range(habit.streak, predicates.get("streak"))
+                and in_range(habit.on_track, predicates.get("on_track"))
+                and in_range(habit.struggle, predicates.get("struggle"))]
+    query = HQuery(summaries)
+    assert list(query.select(**predicates)) == expected
+    for field in ("streak", "on_track", "name", "periodicity"):
+        for descending in (False, True):
+            ranked = sorted(expected, key=lambda habit: getattr(habit, field),
+                            reverse=descending)
+            assert list(query.select(**predicates, order_by=field,
+                                     descending=descending)) == ranked
+            assert list(query.select(**predicates, order_by=field,
+                                     descending=descending,
+                                     limit=7, offset=3)) == ranked[3:10]
+
+
+def test_select_unknown_field(summaries):
+    with pytest.raises(ValueError):
+        HQuery(summaries).select(order_by="events")
+
+
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("limit, offset", [(None, 0), (3, 0), (3, 4),
+                                           (5, 18), (1, 30)])
+def test_rank_pages(descending, limit, offset):
+    # many ties, every page must be a slice of the stable full sort
+    values = [(idx, idx * 7 % 5) for idx in range(20)]
+    ranked = sorted(values, key=lambda item: item[1], reverse=descending)
+    page = HQuery.rank(values, lambda item: item[1], descending, limit,
+                       offset)
+    end = None if limit is None else offset + limit
+    assert list(page) == ranked[offset:end]
+
+
+@pytest.mark.parametrize("limit, offset", [(1, 0), (2, 1), (None, 3)])
+def test_analyse_struggle_page(tmp_path, capsys, limit, offset):
+    path = tmp_path / "habits.json"
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    tracker = HTracker(path)
+    _, ranked = tracker.rank_struggle(date(2023, 1, 8))
+    ranked = [habit.name for habit in ranked]
+    assert tracker.analyse_struggle(date(2023, 1, 8), limit, offset) == \
+        HErrorCode.SUCCESS
+    # category, header and separator before the habit rows
+    rows = capsys.readouterr().out.splitlines()[3:]
+    end = None if limit is None else offset + limit
+    assert [row.split("|")[0].strip() for row in rows] == \
+        ranked[offset:end]
+    assert len(rows) == (limit or len(ranked) - offset)
+
+
+def test_tracker_query(tmp_path):
+    path = tmp_path / "habits.json"
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    tracker = HTracker(path)
+    error_code, habits = tracker.query_habits(streak=(3, None),
+                                              order_by="streak")
+    assert error_code == HErrorCode.SUCCESS
+    assert [habit.name for habit in habits] == \
+        ["Trainspotting", "AA Meeting", "Curling"]
+    _, query = tracker.session.query()
+    # the indexes are kept while the database is the same
+    assert tracker.session.query()[1] is query
+    tracker.add_habit_to_database(Habit("Reading", date(2023, 1, 1), 3))
+    _, habits = tracker.query_habits(periodicity=3)
+    assert [habit.name for habit in habits] == ["Trainspotting", "Reading"]
+    assert tracker.session.query()[1] is not query
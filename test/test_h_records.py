@@ -0,0 +1,121 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import io
+import pytest
+from datetime import date
+
+from htracker import HErrorCode, TEST_FILE_PATH
+from htracker.h_data_manager import HDataManager
+from htracker.h_records import HRecords
+from htracker.h_session import HSession
+from htracker.h_tracker import HTracker
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    path = tmp_path / "habits.json"
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    h_tracker = HTracker()
+    h_tracker.session = HSession(path)
+    return h_tracker
+
+
+def test_read_csv_with_header():
+    stream = io.StringIO("name,date\nAA Meeting,2023-05-19\nx,bad\na,b,c\n")
+    assert list(HRecords.read_check_offs(stream)) == [
+        ("AA Meeting", date(2023, 5, 19)), ("x", None), (None, None)
+    ]
+
+
+def test_read_ndjson():
+    stream = io.StringIO('{"name": "AA Meeting", "date": "2023-05-19"}\n'
+                         '\n{"name": "x"}\n[1]\n')
+    assert list(HRecords.read_check_offs(stream)) == [
+        ("AA Meeting", date(2023, 5, 19)), ("x", None), (None, None)
+    ]
+
+
+def test_check_off_many(tracker):
+    check_offs = [
+        ("AA Meeting", date(2023, 5, 26)),
+        ("AA Meeting", date(2023, 5, 19)),
+        # duplicate in the same batch and in the database
+        ("AA Meeting", date(2023, 5, 19)),
+        ("AA Meeting", date(2023, 1, 8)),
+        ("AA Meeting", date(2022, 1, 1)),
+        ("AA Meeting", date(2999, 1, 1)),
+        ("no such habit", date(2023, 5, 19)),
+        ("AA Meeting", None)
+    ]
+    error_code, results = tracker.check_off_many(check_offs)
+    assert error_code == HErrorCode.SUCCESS
+    assert results == {
+        HErrorCode.SUCCESS: 2,
+        HErrorCode.SAME_DATE_ERROR: 2,
+        HErrorCode.START_DATE_ERROR: 1,
+        HErrorCode.FUTURE_DATE_ERROR: 1,
+        HErrorCode.NAME_ERROR: 1,
+        HErrorCode.ROW_FORMAT_ERROR: 1
+    }
+    _, habits = HDataManager.load_database(tracker.session.path)
+    habit = habits["AA Meeting"]
+    assert habit.check_offs[-2:] == [date(2023, 5, 19), date(2023, 5, 26)]
+    # the same values as checking off the dates one by one
+    assert habit.streak == tracker._count_streaks(habit)[0]
+    assert habit.struggle == tracker._count_struggle(
+        habit, habit.starting_date
+    )
+
+
+@pytest.mark.parametrize("record_format", ["ndjson", "csv"])
+def test_export_import_round_trip(tracker, record_format):
+    _, habits = HDataManager.load_database(tracker.session.path)
+    stream = io.StringIO()
+    error_code, count = tracker.export_habits(stream, record_format)
+    assert error_code == HErrorCode.SUCCESS
+    assert count == len(habits)
+    stream.seek(0)
+    error_code, results = tracker.import_habits(
+        HRecords.read_habits(stream)
+    )
+    assert error_code == HErrorCode.SUCCESS
+    assert results == {HErrorCode.SUCCESS: len(habits)}
+    _, imported = HDataManager.load_database(tracker.session.path)
+    assert list(imported) == list(habits)
+    for name, habit in habits.items():
+        assert imported[name].check_offs == habit.check_offs
+        assert imported[name].periodicity == habit.periodicity
+
+
+def test_import_recalculates_values(tracker):
+    stream = io.StringIO(
+        '{"name": "a", "starting_date": "2023-01-01", "periodicity": 1, '
+        '"events": ["2023-01-03", "2023-01-01", "2023-01-02", '
+        '"2023-01-02"], "streak": 99}\n'
+        '{"name": "a", "starting_date": "2023-01-01", "periodicity": 1, '
+        '"events": []}\n'
+        '{"name": "b", "starting_date": "2023-01-01", "periodicity": 0, '
+        '"events": []}\n'
+    )
+    error_code, results = tracker.import_habits(HRecords.read_habits(stream))
+    assert error_code == HErrorCode.SUCCESS
+    assert results == {HErrorCode.SUCCESS: 1, HErrorCode.NAME_EXISTS: 1,
+                       HErrorCode.ROW_FORMAT_ERROR: 1}
+    _, habits = HDataManager.load_database(tracker.session.path)
+    assert habits["a"].check_offs == [date(2023, 1, 1), date(2023, 1, 2),
+                                      date(2023, 1, 3)]
+    assert habits["a"].streak == 2
+    assert habits["a"].struggle == 0
+
+
+@pytest.mark.parametrize("suffix", [".json", ".hbin", ".db"])
+def test_iter_habits(tmp_path, suffix):
+    path = tmp_path / ("habits" + suffix)
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    _, habits = HDataManager.load_database(path)
+    assert [habit.name for habit in HDataManager.iter_habits(path)] == \
+        list(habits)
@@ -0,0 +1,206 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import click
+import io
+import os
+import socket
+import threading
+import pytest
+from datetime import date
+
+from htracker import HErrorCode, TEST_FILE_PATH
+from htracker import h_server
+from htracker.h_data import Habit
+from htracker.h_data_manager import HDataManager
+from htracker.h_server import HClient, HServer, _read_frame
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"),
+                                reason="Unix sockets only")
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "habits.json"
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    return str(path)
+
+
+@pytest.fixture
+def server(database):
+    server = HServer(database, flush_interval=3600)
+    thread = threading.Thread(target=server.serve)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+
+
+def test_client_needs_socket(database):
+    assert HClient.connect(database) is None
+
+
+def test_changes_kept_in_memory_till_flush(server, database):
+    client = HClient.connect(database)
+    assert client is not None
+    assert client.check_off("AA Meeting", date(2023, 5, 19)) == \
+        HErrorCode.SUCCESS
+    # the daemon serves the change, the file does not have it yet
+    error_code, habits = client.load_habits_database()
+    assert habits["AA Meeting"].has_check_off(date(2023, 5, 19))
+    _, on_disk = HDataManager.load_database(database)
+    assert not on_disk["AA Meeting"].has_check_off(date(2023, 5, 19))
+    assert server.flush() == HErrorCode.SUCCESS
+    _, on_disk = HDataManager.load_database(database)
+    assert on_disk["AA Meeting"].has_check_off(date(2023, 5, 19))
+
+
+def test_output_and_errors_forwarded(server, database, capsys):
+    client = HClient.connect(database)
+    assert client.list_all_habits() == HErrorCode.SUCCESS
+    assert "AA Meeting" in capsys.readouterr().out
+    with pytest.raises(AttributeError):
+        client.unknown_method()
+    records = io.StringIO()
+    error_code, count = client.export_habits(records, "ndjson")
+    assert error_code == HErrorCode.SUCCESS
+    assert len(records.getvalue().splitlines()) == count
+
+
+@pytest.fixture
+def frames(monkeypatch):
+    # small batches and output chunks, and the frames of both sides
+    monkeypatch.setattr(h_server, "_BATCH_RECORDS", 2)
+    monkeypatch.setattr(h_server, "_OUTPUT_CHUNK", 256)
+    sent = []
+    write_frame = h_server._write_frame
+
+    def counted_write(stream, message):
+        sent.append(type(message).__name__)
+        write_frame(stream, message)
+
+    monkeypatch.setattr(h_server, "_write_frame", counted_write)
+    return sent
+
+
+def test_check_offs_and_export_streamed(server, database, frames):
+    client = HClient.connect(database)
+    check_offs = ((name, date(2023, 5, 20)) for name in
+                  ("AA Meeting", "Curling", "Trainspotting", "unknown"))
+    error_code, results = client.check_off_many(check_offs)
+    assert error_code == HErrorCode.SUCCESS
+    assert results[HErrorCode.NAME_ERROR] == 1
+    assert sum(results.values()) == 4
+    # the call, two batches and the end of the records, then the answer
+    assert frames == ["tuple", "list", "list", "list", "tuple"]
+    frames.clear()
+    records = io.StringIO()
+    error_code, count = client.export_habits(records, "ndjson")
+    assert error_code == HErrorCode.SUCCESS
+    assert len(records.getvalue().splitlines()) == count == 3
+    # the records came back in chunks before the answer
+    assert frames[0] == "tuple" and frames[-1] == "tuple"
+    assert frames.count("str") > 1
+
+
+def test_import_streamed(server, database, frames):
+    client = HClient.connect(database)
+    habits = (Habit(f"habit {idx}", date(2023, 1, 1), 1,
+                    [date(2023, 1, 1), date(2023, 1, 2)])
+              for idx in range(5))
+    error_code, results = client.import_habits(habits)
+    assert error_code == HErrorCode.SUCCESS
+    assert results[HErrorCode.SUCCESS] == 5
+    assert frames == ["tuple", "list", "list", "list", "list", "tuple"]
+    _, habits = HDataManager.load_database(database)
+    assert sorted(habits) == [f"habit {idx}" for idx in range(5)]
+    assert habits["habit 4"].streak == 1
+
+
+def test_second_server_refused(server, database):
+    with pytest.raises(FileExistsError):
+        HServer(database)
+
+
+def test_stop_flushes_and_falls_back(database):
+    server = HServer(database, flush_interval=3600)
+    thread = threading.Thread(target=server.serve)
+    thread.start()
+    client = HClient.connect(database)
+    client.check_off("AA Meeting", date(2023, 5, 19))
+    server.shutdown()
+    thread.join()
+    assert not os.path.exists(HServer.socket_path(database))
+    # the client works on the file directly from now on
+    assert client.check_off("AA Meeting", date(2023, 5, 26)) == \
+        HErrorCode.SUCCESS
+    _, habits = HDataManager.load_database(database)
+    assert habits["AA Meeting"].has_check_off(date(2023, 5, 19))
+    assert habits["AA Meeting"].has_check_off(date(2023, 5, 26))
+
+
+@pytest.mark.parametrize("answer", ["close", "hang"])
+def test_server_lost_mid_call(database, monkeypatch, answer):
+    monkeypatch.setattr(h_server, "SERVER_TIMEOUT", 0.2)
+    # a daemon which dies, or stops answering, once it read the call
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(HServer.socket_path(database))
+    listener.listen()
+    requests = []
+    release = threading.Event()
+
+    def serve_one():
+        connection, _ = listener.accept()
+        with connection, connection.makefile("rb") as stream:
+            requests.append(_read_frame(stream))
+            if answer == "hang":
+                release.wait(5)
+        listener.close()
+
+    thread = threading.Thread(target=serve_one)
+    thread.start()
+    client = HClient.connect(database)
+    try:
+        with pytest.raises(click.ClickException) as error:
+            client.check_off("AA Meeting", date(2023, 5, 19))
+    finally:
+        release.set()
+        thread.join()
+    assert error.value.message == HErrorCode.SERVER_LOST.value
+    assert requests[0][0] == "check_off"
+    # the call was delivered, so it was not run on the file as well
+    _, habits = HDataManager.load_database(database)
+    assert not habits["AA Meeting"].has_check_off(date(2023, 5, 19))
+    # nothing listens on the socket any more, the next call runs locally
+    assert client.check_off("AA Meeting", date(2023, 5, 26)) == \
+        HErrorCode.SUCCESS
+    _, habits = HDataManager.load_database(database)
+    assert habits["AA Meeting"].has_check_off(date(2023, 5, 26))
+
+
+def test_silent_connection_does_not_block(database, monkeypatch):
+    monkeypatch.setattr(h_server, "SERVER_TIMEOUT", 5)
+    server = HServer(database, flush_interval=0.1)
+    thread = threading.Thread(target=server.serve)
+    thread.start()
+    # connected, but the call never comes
+    silent = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    silent.connect(HServer.socket_path(database))
+    try:
+        client = HClient.connect(database)
+        assert client.check_off("AA Meeting", date(2023, 5, 19)) == \
+            HErrorCode.SUCCESS
+        # the scheduled flush still runs
+        for _ in range(50):
+            _, on_disk = HDataManager.load_database(database)
+            if on_disk["AA Meeting"].has_check_off(date(2023, 5, 19)):
+                break
+            threading.Event().wait(0.1)
+        assert on_disk["AA Meeting"].has_check_off(date(2023, 5, 19))
+    finally:
+        silent.close()
+        server.shutdown()
+        thread.join()
@@ -0,0 +1,76 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import pytest
+from datetime import date
+
+from htracker import HErrorCode, TEST_FILE_PATH
+from htracker import h_data_manager
+from htracker.h_data_manager import HDataManager
+from htracker.h_session import HSession
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    # whole database writes, the journal is tested in test_h_journal
+    monkeypatch.setattr(h_data_manager, "JOURNAL_MODE", False)
+    path = tmp_path / "habits.json"
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    return HSession(path)
+
+
+@pytest.fixture
+def counted_calls(monkeypatch):
+    calls = {"load": 0, "save": 0}
+    load, save = HDataManager.load_database, HDataManager.save_database
+
+    def counted_load(*args):
+        calls["load"] += 1
+        return load(*args)
+
+    def counted_save(*args):
+        calls["save"] += 1
+        return save(*args)
+
+    monkeypatch.setattr(HDataManager, "load_database", counted_load)
+    monkeypatch.setattr(HDataManager, "save_database", counted_save)
+    return calls
+
+
+def test_database_parsed_once(session, counted_calls):
+    for _ in range(3):
+        error_code, habits = session.load()
+    assert error_code == HErrorCode.SUCCESS
+    assert "AA Meeting" in habits
+    assert counted_calls["load"] == 1
+
+
+def test_reload_after_external_write(session, counted_calls):
+    _, habits = session.load()
+    HDataManager.save_database({}, session.path)
+    _, habits = session.load()
+    assert habits == {}
+    assert counted_calls["load"] == 2
+
+
+def test_own_write_keeps_cache(session, counted_calls):
+    _, habits = session.load()
+    habits["AA Meeting"].insert_check_off(date(2023, 5, 19))
+    session.insert_check_off("AA Meeting", date(2023, 5, 19))
+    session.load()
+    assert counted_calls["load"] == 1
+
+
+def test_unit_of_work_flushes_once(session, counted_calls):
+    with session:
+        _, habits = session.load()
+        for day in (19, 26):
+            habits["AA Meeting"].insert_check_off(date(2023, 5, day))
+            session.insert_check_off("AA Meeting", date(2023, 5, day))
+        assert counted_calls["save"] == 0
+    assert counted_calls["save"] == 1
+    _, reloaded = HDataManager.load_database(session.path)
+    assert reloaded["AA Meeting"].check_offs[-1] == date(2023, 5, 26)
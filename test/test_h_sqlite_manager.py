@@ -0,0 +1,58 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import pytest
+from datetime import date
+
+from htracker import HErrorCode, TEST_FILE_PATH
+from htracker.h_data_manager import HDataManager
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    path = tmp_path / "habits.db"
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    return path
+
+
+def test_migrate_round_trip(sqlite_path):
+    _, json_habits = HDataManager.load_database(TEST_FILE_PATH)
+    error_code, sqlite_habits = HDataManager.load_database(sqlite_path)
+    assert error_code == HErrorCode.SUCCESS
+    assert list(sqlite_habits) == list(json_habits)
+    for name, habit in json_habits.items():
+        loaded = sqlite_habits[name]
+        for attribute in ("name", "starting_date", "periodicity",
+                          "check_offs", "streak", "on_track", "struggle"):
+            assert getattr(loaded, attribute) == getattr(habit, attribute)
+
+
+def test_insert_check_off(sqlite_path):
+    _, habits = HDataManager.load_database(sqlite_path)
+    habit = habits["AA Meeting"]
+    habit.insert_check_off(date(2023, 5, 19))
+    habit.streak = 5
+    error_code = HDataManager.insert_check_off(
+        habits, "AA Meeting", date(2023, 5, 19), sqlite_path
+    )
+    assert error_code == HErrorCode.SUCCESS
+    _, reloaded = HDataManager.load_database(sqlite_path)
+    assert reloaded["AA Meeting"].check_offs[-1] == date(2023, 5, 19)
+    assert reloaded["AA Meeting"].streak == 5
+
+
+def test_delete_habit(sqlite_path):
+    _, habits = HDataManager.load_database(sqlite_path)
+    habits.pop("AA Meeting")
+    HDataManager.delete_habit(habits, "AA Meeting", sqlite_path)
+    _, reloaded = HDataManager.load_database(sqlite_path)
+    assert "AA Meeting" not in reloaded
+
+
+def test_missing_database(tmp_path):
+    error_code, habits = HDataManager.load_database(tmp_path / "no.db")
+    assert error_code == HErrorCode.FILE_READ
+    assert habits == {}
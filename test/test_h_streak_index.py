@@ -0,0 +1,69 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import random
+import pytest
+from datetime import date
+
+from htracker import h_streak_index
+from htracker.h_data import Habit
+from htracker.h_streak_index import HStreakIndex
+from htracker.h_tracker import HTracker
+
+
+@pytest.mark.parametrize("periodicity, seed", [(1, 1), (3, 2), (7, 3)])
+def test_insert_matches_full_scan(periodicity, seed):
+    shuffled = random.Random(seed)
+    start = date(2020, 1, 1).toordinal()
+    # mostly on period dates with some in between, in random order
+    ordinals = [start + i * periodicity for i in range(60)] + \
+        [start + shuffled.randrange(60 * periodicity) for _ in range(20)]
+    shuffled.shuffle(ordinals)
+    streak_index = HStreakIndex([], periodicity)
+    inserted = []
+    for ordinal in ordinals:
+        assert streak_index.insert(ordinal) == (ordinal not in inserted)
+        if ordinal not in inserted:
+            inserted.append(ordinal)
+        habit = Habit("test", date.fromordinal(min(inserted)),
+                      periodicity,
+                      [date.fromordinal(o) for o in sorted(inserted)])
+        tracker = HTracker()
+        longest, current = tracker._count_streaks(habit)
+        assert streak_index.longest_streak == longest
+        assert streak_index.current_streak == current
+        assert streak_index.breaks == \
+            tracker._count_struggle(habit, habit.starting_date)
+
+
+def test_contains():
+    streak_index = HStreakIndex([10, 17, 24, 30], 7)
+    assert 17 in streak_index
+    assert 20 not in streak_index
+    assert 31 not in streak_index
+
+
+def test_blocked_run_starts(monkeypatch):
+    # small blocks, so the runs are split over many of them
+    monkeypatch.setattr(h_streak_index, "_BLOCK_SIZE", 4)
+    shuffled = random.Random(4)
+    ordinals = list(range(1000, 1600))
+    shuffled.shuffle(ordinals)
+    streak_index = HStreakIndex(sorted(ordinals[:100]), 1)
+    for count, ordinal in enumerate(ordinals[100:], 101):
+        streak_index.insert(ordinal)
+        if count % 50 == 0:
+            rebuilt = HStreakIndex(sorted(ordinals[:count]), 1)
+            assert streak_index.longest_streak == rebuilt.longest_streak
+            assert streak_index.current_streak == \
+                rebuilt.current_streak
+            assert streak_index.breaks == rebuilt.breaks
+            assert streak_index.first == min(ordinals[:count])
+            assert all(ordinal in streak_index
+                       for ordinal in ordinals[:count])
+    # the runs are joined into one again
+    assert len(streak_index._starts) == 1
+    assert streak_index.longest_streak == 599
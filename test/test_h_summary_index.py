@@ -0,0 +1,121 @@
+#  iu International University of Applied Science
+#  name: Karoly Molnar
+#  matriculation: 92113786
+#  date: 2023
+#
+
+import json
+import pytest
+from datetime import date
+
+from htracker import HErrorCode, TEST_FILE_PATH
+from htracker import h_data_manager
+from htracker.h_data import Habit
+from htracker.h_data_manager import HDataManager
+from htracker.h_session import HSession
+from htracker.h_summary_index import HSummaryIndex
+from htracker.h_tracker import HTracker
+
+
+def summary_values(summaries: dict) -> dict:
+    return {name: (str(summary.starting_date), summary.periodicity,
+                   summary.check_off_count, summary.streak,
+                   summary.on_track, summary.struggle)
+            for name, summary in summaries.items()}
+
+
+def assert_up_to_date(path):
+    # the index belongs to the current database and has its values
+    summaries = HSummaryIndex.load(path, HDataManager.database_stamp(path))
+    assert summaries is not None
+    _, habits = HDataManager.load_database(path)
+    assert list(summaries) == list(habits)
+    assert summary_values(summaries) == summary_values({
+        name: HSummaryIndex.summarise(habit)
+        for name, habit in habits.items()
+    })
+
+
+@pytest.fixture(params=[".json", ".hbin", ".db"])
+def database(tmp_path, request):
+    path = tmp_path / ("habits" + request.param)
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    return path
+
+
+def test_save_writes_summary(database):
+    assert_up_to_date(database)
+
+
+def test_single_habit_writes_update_summary(database):
+    _, habits = HDataManager.load_database(database)
+    habits["AA Meeting"].insert_check_off(date(2023, 5, 19))
+    habits["AA Meeting"].streak = 9
+    HDataManager.insert_check_off(habits, "AA Meeting", date(2023, 5, 19),
+                                  database)
+    assert_up_to_date(database)
+    new_habit = Habit("Reading", date(2023, 1, 1), 1)
+    habits["Reading"] = new_habit
+    HDataManager.insert_habit(habits, new_habit, database)
+    assert_up_to_date(database)
+    habits.pop("Curling")
+    HDataManager.delete_habit(habits, "Curling", database)
+    assert_up_to_date(database)
+
+
+def test_journal_writes_update_summary(tmp_path, monkeypatch):
+    monkeypatch.setattr(h_data_manager, "JOURNAL_MODE", True)
+    path = tmp_path / "habits.json"
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    _, habits = HDataManager.load_database(path)
+    habits["AA Meeting"].insert_check_off(date(2023, 5, 19))
+    HDataManager.insert_check_off(habits, "AA Meeting", date(2023, 5, 19),
+                                  path)
+    assert_up_to_date(path)
+    assert HDataManager.compact_journal(path) == HErrorCode.SUCCESS
+    assert_up_to_date(path)
+
+
+def test_stale_summary_is_rebuilt(tmp_path):
+    path = tmp_path / "habits.json"
+    HDataManager.migrate_database(TEST_FILE_PATH, path)
+    # another program rewrites the database without the index
+    with open(TEST_FILE_PATH, "r") as read_file:
+        data = json.load(read_file)
+    data.pop("Curling")
+    with open(path, "w") as write_file:
+        json.dump(data, write_file)
+    error_code, summaries = HDataManager.load_summaries(path)
+    assert error_code == HErrorCode.SUCCESS
+    assert list(summaries) == list(data)
+    assert_up_to_date(path)
+
+
+def test_missing_database(tmp_path):
+    error_code, summaries = HDataManager.load_summaries(
+        tmp_path / "habits.json"
+    )
+    assert error_code == HErrorCode.FILE_READ
+    assert summaries == {}
+
+
+def test_lists_do_not_decode_check_offs(database, monkeypatch):
+    tracker = HTracker(database)
+
+    def no_load(path):
+        raise AssertionError("the database was decoded")
+
+    monkeypatch.setattr(HDataManager, "load_database", no_load)
+    assert tracker.list_all_habits() == HErrorCode.SUCCESS
+    assert tracker.analyse_streak("") == HErrorCode.SUCCESS
+    assert tracker.analyse_on_track("d") == HErrorCode.SUCCESS
+    assert tracker.analyse_periodicity(1) == HErrorCode.SUCCESS
+
+
+def test_session_summaries_include_pending_changes(database):
+    session = HSession(database)
+    with session:
+        _, habits = session.load()
+        session.insert_habit(Habit("Reading", date(2023, 1, 1), 1))
+        _, summaries = session.load_summaries()
+        assert "Reading" in summaries